@@ -13,22 +13,33 @@ import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 gi.require_version("Gdk", "4.0")
+gi.require_version("Graphene", "1.0")
+gi.require_version("Gsk", "4.0")
 
 import asyncio
 
-from gi.repository import Adw, Gdk, GLib, GObject, Gtk
+from gi.repository import Adw, Gdk, GLib, GObject, Graphene, Gsk, Gtk
 
 from waydroid_helper.compat_widget import PropertyAnimationTarget
 from waydroid_helper.controller.app.workspace_manager import WorkspaceManager
 from waydroid_helper.controller.core import (Event, EventType, KeyCombination,
-                                             Server, event_bus,
-                                             is_point_in_rect, key_registry)
-from waydroid_helper.controller.core.constants import APP_TITLE
+                                             Server, animation_scheduler,
+                                             cursor_tracker, event_bus,
+                                             is_point_in_rect, key_registry,
+                                             physical_key_cache)
+from waydroid_helper.controller.core.constants import (
+    APP_TITLE, LATENCY_TRACING_ENABLED, MAIN_LOOP_WATCHDOG_ENABLED,
+    MAIN_LOOP_WATCHDOG_INTERVAL, MAIN_LOOP_WATCHDOG_THRESHOLD,
+    MAPPING_OVERLAY_RENDERER, MOTION_DISPATCH_RATE)
 from waydroid_helper.controller.core.handler import (DefaultEventHandler,
                                                      InputEvent,
                                                      InputEventHandlerChain,
+                                                     InputEventType,
                                                      KeyMappingEventHandler,
+                                                     ModifierMask,
                                                      key_mapping_manager)
+from waydroid_helper.controller.core.latency import latency_tracer
+from waydroid_helper.controller.core.watchdog import MainLoopWatchdog
 from waydroid_helper.controller.ui.menus import ContextMenuManager
 from waydroid_helper.controller.ui.styles import StyleManager
 from waydroid_helper.controller.widgets.factory import WidgetFactory
@@ -36,7 +47,7 @@ from waydroid_helper.util.adb_helper import AdbHelper
 from waydroid_helper.util.log import logger
 
 if TYPE_CHECKING:
-    from waydroid_helper.controller.widgets.base import BaseWidget
+    from waydroid_helper.controller.widgets.base import BaseWidget, MappingHint
 
 
 Adw.init()
@@ -82,6 +93,72 @@ class CircleOverlay(Gtk.DrawingArea):
         cr.fill()
 
 
+class IndicatorOverlay(Gtk.Widget):
+    """Overlay for small animated indicators (e.g. the joystick dot in mapping mode)
+
+    Indicators live on their own layer so that moving one only invalidates this
+    widget; the render nodes of the mapping widgets underneath stay cached.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # owner -> (x, y, radius, color)
+        self._indicators: dict[object, tuple[float, float, float, Gdk.RGBA]] = {}
+
+    def set_indicator(self, owner, data):
+        """Shows/moves the indicator of owner, or hides it when data is None"""
+        if data is None:
+            if self._indicators.pop(owner, None) is not None:
+                self.queue_draw()
+            return
+
+        x, y = data["position"]
+        color = Gdk.RGBA()
+        color.red, color.green, color.blue, color.alpha = data["color"]
+        self._indicators[owner] = (x, y, data["radius"], color)
+        self.queue_draw()
+
+    def clear(self):
+        """Hides all indicators"""
+        if self._indicators:
+            self._indicators.clear()
+            self.queue_draw()
+
+    def do_snapshot(self, snapshot):
+        for x, y, radius, color in self._indicators.values():
+            snapshot.save()
+            snapshot.translate(Graphene.Point().init(x, y))
+            rect = Graphene.Rect().init(-radius, -radius, 2 * radius, 2 * radius)
+            snapshot.push_rounded_clip(Gsk.RoundedRect().init_from_rect(rect, radius))
+            snapshot.append_color(color, rect)
+            snapshot.pop()
+            snapshot.restore()
+
+
+class MappingOverlay(Gtk.Widget):
+    """Overlay that paints the hints of all widgets in mapping mode in one pass
+
+    Used instead of the per-widget drawing areas when MAPPING_OVERLAY_RENDERER is
+    enabled; the widgets themselves are hidden so GTK no longer measures,
+    allocates or snapshots them.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._hints: list["MappingHint"] = []
+
+    def set_hints(self, hints: list["MappingHint"]):
+        """Replaces the painted hints, an empty list clears the overlay"""
+        if hints or self._hints:
+            self._hints = hints
+            self.queue_draw()
+
+    def do_snapshot(self, snapshot):
+        for hint in self._hints:
+            bounds = Graphene.Rect().init(hint.x, hint.y, hint.width, hint.height)
+            snapshot.append_texture(hint.glyph, bounds)
+
+
 class TransparentWindow(Adw.Window):
     """Transparent window"""
 
@@ -107,6 +184,20 @@ class TransparentWindow(Adw.Window):
 
         self.connect("close-request", self._on_close_request)
 
+        # Report main loop stalls, they show up directly as input latency
+        self.watchdog = MainLoopWatchdog(
+            interval=MAIN_LOOP_WATCHDOG_INTERVAL,
+            threshold=MAIN_LOOP_WATCHDOG_THRESHOLD,
+        )
+        if MAIN_LOOP_WATCHDOG_ENABLED:
+            self.watchdog.start()
+
+        # Per-stage input latency, from the Gdk event time to the socket write
+        latency_tracer.enabled = LATENCY_TRACING_ENABLED
+
+        # Widget touch interpolations all advance on this window's frame clock
+        animation_scheduler.attach(self)
+
         self.set_title(APP_TITLE)
 
         # Create main container (Overlay)
@@ -117,6 +208,11 @@ class TransparentWindow(Adw.Window):
         self.fixed.set_name("mapping-widget")
         overlay.set_child(self.fixed)
 
+        # Single-pass renderer for widget hints in mapping mode (optional)
+        self.mapping_overlay = MappingOverlay()
+        self.mapping_overlay.set_can_target(False)  # Ignore mouse events
+        overlay.add_overlay(self.mapping_overlay)
+
         # Create mode switching hint
         self.notification_label = Gtk.Label.new("")
         self.notification_label.set_name("mode-notification-label")
@@ -155,8 +251,33 @@ class TransparentWindow(Adw.Window):
         self.circle_overlay.set_can_target(False)  # Ignore mouse events
         overlay.add_overlay(self.circle_overlay)
 
+        # Animated indicators, drawn above the widgets on a separate layer
+        self.indicator_overlay = IndicatorOverlay()
+        self.indicator_overlay.set_can_target(False)  # Ignore mouse events
+        overlay.add_overlay(self.indicator_overlay)
+        event_bus.subscribe(
+            EventType.INDICATOR_UPDATE,
+            lambda event: self.indicator_overlay.set_indicator(event.source, event.data),
+            subscriber=self,
+        )
+
         # Create global event handler chain
         self.event_handler_chain = InputEventHandlerChain()
+        # Physical keys currently held down, used to detect autorepeat
+        self._pressed_keycodes: set[int] = set()
+        # Releases of keys held while the window loses focus never arrive
+        self.connect("notify::is-active", self._on_active_changed)
+        # Shared cursor position / root size service
+        self.cursor_tracker = cursor_tracker
+
+        # Mouse motion batching: latest motion since the last dispatch
+        self.motion_dispatch_rate: int | None = MOTION_DISPATCH_RATE
+        self._pending_motion: (
+            tuple[Gtk.EventControllerMotion, float, float, Gdk.ModifierType, int]
+            | None
+        ) = None
+        self._motion_flush_id: int = 0
+        self._motion_flush_is_tick: bool = False
         # Import and add default handler
         self.server = Server("0.0.0.0", 10721)  # 使用单例模式
         self.adb_helper = AdbHelper()
@@ -336,7 +457,7 @@ class TransparentWindow(Adw.Window):
             confirm_button.add_css_class("suggested-action")
 
             def on_confirm_clicked(btn):
-                config_manager.emit("confirmed")
+                config_manager.confirm()
                 popover.popdown()
 
             confirm_button.connect("clicked", on_confirm_clicked)
@@ -354,6 +475,11 @@ class TransparentWindow(Adw.Window):
 
         popover.popup()
 
+    def _on_active_changed(self, window, pspec):
+        """Forgets held keys when the window is deactivated"""
+        if not self.is_active():
+            self._pressed_keycodes.clear()
+
     def _on_close_request(self, window):
         self.on_clear_widgets(None)
         self.close()
@@ -365,6 +491,13 @@ class TransparentWindow(Adw.Window):
             return
         self._is_closing = True
 
+        # Drop any batched mouse motion
+        self._cancel_motion_flush()
+        animation_scheduler.detach()
+        self.watchdog.stop()
+        if latency_tracer.enabled:
+            latency_tracer.log_report()
+
         # Clean up workspace manager first
         if hasattr(self, "workspace_manager"):
             self.workspace_manager.cleanup()
@@ -517,21 +650,26 @@ class TransparentWindow(Adw.Window):
 
         # Use event handler chain in mapping mode
         if self.current_mode == self.MAPPING_MODE:
+            # Button transitions must observe all motion that preceded them
+            self.flush_pending_motion()
 
             # Create Key object for mouse button
             mouse_key = key_registry.create_mouse_key(button)
 
             # Create input event
             event = InputEvent(
-                event_type="mouse_press",
+                event_type=InputEventType.MOUSE_PRESS,
                 key=mouse_key,
                 button=button,
                 position=(int(x), int(y)),
-                raw_data={"controller": controller, "n_press": n_press, "x": x, "y": y},
+                raw=(controller, n_press, x, y),
             )
 
             # Process with event handler chain
-            handled = self.event_handler_chain.process_event(event)
+            with latency_tracer.trace(
+                "mouse_press", controller.get_current_event_time()
+            ), self.server.batch():
+                handled = self.event_handler_chain.process_event(event)
             if handled:
                 return True
             return
@@ -553,40 +691,107 @@ class TransparentWindow(Adw.Window):
         elif button == Gdk.BUTTON_PRIMARY:  # Left click
             self.workspace_manager.handle_mouse_press(controller, n_press, x, y)
 
+    def do_size_allocate(self, width, height, baseline):
+        Adw.Window.do_size_allocate(self, width, height, baseline)
+        self.cursor_tracker.update_root_size(width, height)
+
     def on_window_mouse_motion(self, controller, x, y):
         """Window-level mouse motion event"""
+        # Widgets that only need the cursor position at trigger time read it from here
+        self.cursor_tracker.update_position(x, y)
+
         if self.current_mode == self.MAPPING_MODE:
-            event = controller.get_current_event()
-            state = event.get_modifier_state()
-            # FIXME This mouse_key should actually be None, this is just for compatibility.
-            # Right-click walking can be triggered when moving in the right-click down state.
-            mouse_key = None
-            button = None
-            if state & Gdk.ModifierType.BUTTON1_MASK:
-                mouse_key = key_registry.create_mouse_key(Gdk.BUTTON_PRIMARY)
-                button = Gdk.BUTTON_PRIMARY
-            elif state & Gdk.ModifierType.BUTTON2_MASK:
-                mouse_key = key_registry.create_mouse_key(Gdk.BUTTON_MIDDLE)
-                button = Gdk.BUTTON_MIDDLE
-            elif state & Gdk.ModifierType.BUTTON3_MASK:
-                mouse_key = key_registry.create_mouse_key(Gdk.BUTTON_SECONDARY)
-                button = Gdk.BUTTON_SECONDARY
+            state = controller.get_current_event().get_modifier_state()
+            event_time = controller.get_current_event_time()
+            if self.motion_dispatch_rate is None:
+                self._dispatch_mouse_motion(controller, x, y, state, event_time)
+                return
 
-            event = InputEvent(
-                event_type="mouse_motion",
-                position=(int(x), int(y)),
-                key=mouse_key,
-                button=button,
-                raw_data={"controller": controller, "x": x, "y": y},
-            )
-            # Skill casting and right-click walking
-            event_bus.emit(Event(EventType.MOUSE_MOTION, self, event))
-            self.event_handler_chain.process_event(event)
+            # Keep only the latest position, dispatch once per frame / tick
+            self._pending_motion = (controller, x, y, state, event_time)
+            self._schedule_motion_flush()
             return
 
         # In edit mode, delegate to workspace_manager
         self.workspace_manager.handle_mouse_motion(controller, x, y)
 
+    def set_motion_dispatch_rate(self, rate: int | None):
+        """Sets how mouse motion is dispatched in mapping mode
+
+        None dispatches every event, 0 batches per frame clock update,
+        a positive value batches at that rate in Hz.
+        """
+        self.flush_pending_motion()
+        self.motion_dispatch_rate = rate
+
+    def _schedule_motion_flush(self):
+        """Schedules dispatch of the pending motion if not already scheduled"""
+        if self._motion_flush_id:
+            return
+        if self.motion_dispatch_rate:
+            interval = max(1, int(1000 / self.motion_dispatch_rate))
+            self._motion_flush_id = GLib.timeout_add(interval, self._on_motion_flush)
+            self._motion_flush_is_tick = False
+        else:
+            self._motion_flush_id = self.add_tick_callback(self._on_motion_flush)
+            self._motion_flush_is_tick = True
+
+    def _cancel_motion_flush(self):
+        """Cancels the scheduled motion dispatch and drops pending motion"""
+        if self._motion_flush_id:
+            if self._motion_flush_is_tick:
+                self.remove_tick_callback(self._motion_flush_id)
+            else:
+                GLib.source_remove(self._motion_flush_id)
+            self._motion_flush_id = 0
+        self._pending_motion = None
+
+    def _on_motion_flush(self, *args):
+        """Frame clock / timer callback, dispatches the accumulated motion"""
+        self._motion_flush_id = 0
+        self.flush_pending_motion()
+        return GLib.SOURCE_REMOVE
+
+    def flush_pending_motion(self):
+        """Dispatches pending motion immediately
+
+        Called before button and key transitions so that widgets observe
+        the cursor position in the same order as the original events.
+        """
+        pending = self._pending_motion
+        if pending is None:
+            return
+        self._pending_motion = None
+        self._dispatch_mouse_motion(*pending)
+
+    def _dispatch_mouse_motion(self, controller, x, y, state, event_time=0):
+        """Emits a motion event to the bus and runs the handler chain"""
+        # FIXME This mouse_key should actually be None, this is just for compatibility.
+        # Right-click walking can be triggered when moving in the right-click down state.
+        mouse_key = None
+        button = None
+        if state & Gdk.ModifierType.BUTTON1_MASK:
+            mouse_key = key_registry.create_mouse_key(Gdk.BUTTON_PRIMARY)
+            button = Gdk.BUTTON_PRIMARY
+        elif state & Gdk.ModifierType.BUTTON2_MASK:
+            mouse_key = key_registry.create_mouse_key(Gdk.BUTTON_MIDDLE)
+            button = Gdk.BUTTON_MIDDLE
+        elif state & Gdk.ModifierType.BUTTON3_MASK:
+            mouse_key = key_registry.create_mouse_key(Gdk.BUTTON_SECONDARY)
+            button = Gdk.BUTTON_SECONDARY
+
+        event = InputEvent(
+            event_type=InputEventType.MOUSE_MOTION,
+            position=(int(x), int(y)),
+            key=mouse_key,
+            button=button,
+            raw=(controller, x, y, state),
+        )
+        with latency_tracer.trace("mouse_motion", event_time), self.server.batch():
+            # Skill casting and right-click walking
+            event_bus.emit(Event(EventType.MOUSE_MOTION, self, event))
+            self.event_handler_chain.process_event(event)
+
     def on_window_mouse_scroll(
         self,
         controller: Gtk.EventControllerScroll,
@@ -594,11 +799,15 @@ class TransparentWindow(Adw.Window):
         dy: float | None = None,
     ):
         if self.current_mode == self.MAPPING_MODE:
+            self.flush_pending_motion()
             event = InputEvent(
-                event_type="mouse_scroll",
-                raw_data={"controller": controller, "dx": dx, "dy": dy},
+                event_type=InputEventType.MOUSE_SCROLL,
+                raw=(controller, dx, dy),
             )
-            self.event_handler_chain.process_event(event)
+            with latency_tracer.trace(
+                "mouse_scroll", controller.get_current_event_time()
+            ), self.server.batch():
+                self.event_handler_chain.process_event(event)
 
     def fixed_put(self, widget, x, y):
         self.fixed.put(widget, x, y)
@@ -708,21 +917,26 @@ class TransparentWindow(Adw.Window):
 
         # Use event handler chain in mapping mode
         if self.current_mode == self.MAPPING_MODE:
+            # Button transitions must observe all motion that preceded them
+            self.flush_pending_motion()
 
             # Create Key object for mouse button
             mouse_key = key_registry.create_mouse_key(button)
 
             # Create input event
             event = InputEvent(
-                event_type="mouse_release",
+                event_type=InputEventType.MOUSE_RELEASE,
                 key=mouse_key,
                 button=button,
                 position=(int(x), int(y)),
-                raw_data={"controller": controller, "n_press": n_press, "x": x, "y": y},
+                raw=(controller, n_press, x, y),
             )
 
             # Process with event handler chain
-            handled = self.event_handler_chain.process_event(event)
+            with latency_tracer.trace(
+                "mouse_release", controller.get_current_event_time()
+            ), self.server.batch():
+                handled = self.event_handler_chain.process_event(event)
             if handled:
                 return True
             return
@@ -873,14 +1087,28 @@ class TransparentWindow(Adw.Window):
 
     def set_all_widgets_mapping_mode(self, mapping_mode: bool):
         """Sets the mapping mode for all widgets"""
+        if not mapping_mode:
+            self.indicator_overlay.clear()
+            self.mapping_overlay.set_hints([])
+        hints = []
         widget_count = 0
         child = self.fixed.get_first_child()
         while child:
             if hasattr(child, "set_mapping_mode"):
                 child.set_mapping_mode(mapping_mode)
+                if MAPPING_OVERLAY_RENDERER:
+                    # Widgets stay in the Fixed (key mappings and workspace
+                    # code still reach them), they are only hidden while the
+                    # overlay paints their hints
+                    if mapping_mode:
+                        hints.append(child.get_mapping_hint())
+                    child.set_visible(not mapping_mode)
                 widget_count += 1
             child = child.get_next_sibling()
 
+        if mapping_mode and MAPPING_OVERLAY_RENDERER:
+            self.mapping_overlay.set_hints(hints)
+
 
     def create_widget_at_position(self, widget: "BaseWidget", x: int, y: int):
         """Creates a component at the specified position"""
@@ -935,11 +1163,7 @@ class TransparentWindow(Adw.Window):
         try:
             display = self.get_display()
             if display:
-                success, keyval, _, _, _ = display.translate_key(
-                    keycode=keycode, state=Gdk.ModifierType(0), group=0
-                )
-                if success:
-                    return Gdk.keyval_to_upper(keyval)
+                return physical_key_cache.lookup(display, keycode)
         except Exception as e:
             logger.error(f"Failed to get physical keyval: {e}")
         return 0
@@ -968,6 +1192,11 @@ class TransparentWindow(Adw.Window):
 
         # Use event handler chain in mapping mode
         if self.current_mode == self.MAPPING_MODE:
+            # GTK reports autorepeat as repeated key-pressed signals for a key
+            # that is already down
+            is_repeat = keycode in self._pressed_keycodes
+            self._pressed_keycodes.add(keycode)
+            self.flush_pending_motion()
 
             # Get standard keyval for physical key
             physical_keyval = self.get_physical_keyval(keycode)
@@ -982,40 +1211,20 @@ class TransparentWindow(Adw.Window):
                 main_key = key_registry.create_from_keyval(physical_keyval)
 
             if main_key:
-                # Collect modifier keys
-                modifiers = []
-                if state & Gdk.ModifierType.CONTROL_MASK:
-                    ctrl_key = key_registry.get_by_name("Ctrl_L")
-                    if ctrl_key:
-                        modifiers.append(ctrl_key)
-                if state & Gdk.ModifierType.ALT_MASK:
-                    alt_key = key_registry.get_by_name("Alt_L")
-                    if alt_key:
-                        modifiers.append(alt_key)
-                if state & Gdk.ModifierType.SHIFT_MASK:
-                    shift_key = key_registry.get_by_name("Shift_L")
-                    if shift_key:
-                        modifiers.append(shift_key)
-                if state & Gdk.ModifierType.SUPER_MASK:
-                    super_key = key_registry.get_by_name("Super_L")
-                    if super_key:
-                        modifiers.append(super_key)
-
                 # Create input event
                 event = InputEvent(
-                    event_type="key_press",
+                    event_type=InputEventType.KEY_PRESS,
                     key=main_key,
-                    modifiers=modifiers,
-                    raw_data={
-                        "controller": controller,
-                        "keyval": keyval,
-                        "keycode": keycode,
-                        "state": state,
-                    },
+                    modifier_mask=ModifierMask.from_state(state),
+                    raw=(controller, keyval, keycode, state),
+                    repeat=is_repeat,
                 )
 
                 # Process with event handler chain
-                handled = self.event_handler_chain.process_event(event)
+                with latency_tracer.trace(
+                    "key_press", controller.get_current_event_time()
+                ), self.server.batch():
+                    handled = self.event_handler_chain.process_event(event)
                 if handled:
                     return True
 
@@ -1098,6 +1307,12 @@ class TransparentWindow(Adw.Window):
             # Enter mapping mode: cancel all selections, disable edit functions
             self.clear_all_selections()
 
+            self._pressed_keycodes.clear()
+
+            # Compile dispatch tables so the input hot path only does lookups
+            key_mapping_manager.compile()
+            self.event_handler_chain.compile()
+
             self.show_notification(_("Mapping Mode (F1: Switch Mode)"))
 
             # Add more UI adjustments for mapping mode here
@@ -1108,6 +1323,7 @@ class TransparentWindow(Adw.Window):
 
         else:
             # Enter edit mode: restore edit functions
+            self._cancel_motion_flush()
             self.show_notification(_("Edit Mode (F1: Switch Mode)"))
             self.set_title(f"{APP_TITLE} - Edit Mode (F1: Switch Mode)")
 
@@ -1191,7 +1407,9 @@ class TransparentWindow(Adw.Window):
 
     def on_global_key_release(self, controller, keyval, keycode, state):
         """Global key release event - uses event handler chain"""
+        self._pressed_keycodes.discard(keycode)
         if self.current_mode == self.MAPPING_MODE:
+            self.flush_pending_motion()
             # Get standard keyval for physical key
             physical_keyval = self.get_physical_keyval(keycode)
             if physical_keyval == 0:
@@ -1205,40 +1423,19 @@ class TransparentWindow(Adw.Window):
                 main_key = key_registry.create_from_keyval(physical_keyval)
 
             if main_key:
-                # Collect modifier keys
-                modifiers = []
-                if state & Gdk.ModifierType.CONTROL_MASK:
-                    ctrl_key = key_registry.get_by_name("Ctrl_L")
-                    if ctrl_key:
-                        modifiers.append(ctrl_key)
-                if state & Gdk.ModifierType.ALT_MASK:
-                    alt_key = key_registry.get_by_name("Alt_L")
-                    if alt_key:
-                        modifiers.append(alt_key)
-                if state & Gdk.ModifierType.SHIFT_MASK:
-                    shift_key = key_registry.get_by_name("Shift_L")
-                    if shift_key:
-                        modifiers.append(shift_key)
-                if state & Gdk.ModifierType.SUPER_MASK:
-                    super_key = key_registry.get_by_name("Super_L")
-                    if super_key:
-                        modifiers.append(super_key)
-
                 # Create input event
                 event = InputEvent(
-                    event_type="key_release",
+                    event_type=InputEventType.KEY_RELEASE,
                     key=main_key,
-                    modifiers=modifiers,
-                    raw_data={
-                        "controller": controller,
-                        "keyval": keyval,
-                        "keycode": keycode,
-                        "state": state,
-                    },
+                    modifier_mask=ModifierMask.from_state(state),
+                    raw=(controller, keyval, keycode, state),
                 )
 
                 # Process with event handler chain
-                handled = self.event_handler_chain.process_event(event)
+                with latency_tracer.trace(
+                    "key_release", controller.get_current_event_time()
+                ), self.server.batch():
+                    handled = self.event_handler_chain.process_event(event)
                 if handled:
                     return True
 
@@ -2,12 +2,14 @@
 核心模块
 """
 
+from .animation import animation_scheduler
 from .constants import *
 from .control_msg import *
 from .event_bus import Event, EventType, event_bus
 from .handler.event_handlers import InputEventHandler, InputEventHandlerChain
-from .key_system import Key, KeyCombination, KeyType, key_registry
-from .server import Server
+from .key_system import (Key, KeyCombination, KeyType, key_registry,
+                         physical_key_cache)
+from .server import Server, message_batch
 from .types import *
 from .utils import *
 
@@ -24,7 +26,12 @@ __all__ = [
     "Key",
     "KeyType",
     "key_registry",
+    "physical_key_cache",
     # 服务器
     "Server",
-    'pointer_id_manager'
+    "message_batch",
+    # 动画调度
+    "animation_scheduler",
+    'pointer_id_manager',
+    'cursor_tracker',
 ]
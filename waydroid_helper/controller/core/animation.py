@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+动画调度器
+所有组件的触摸插值动画由同一个帧时钟回调（或同一个定时器）推进，
+每次回调统一计算位置，各组件在同一轮中发送 MOVE
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib
+
+from waydroid_helper.controller.core.constants import ANIMATION_TICK_RATE
+from waydroid_helper.controller.core.server import message_batch
+from waydroid_helper.util.log import logger
+
+if TYPE_CHECKING:
+    from gi.repository import Gdk, Gtk
+
+Position = tuple[float, float]
+
+# 没有可用的帧时钟时，定时器的默认频率（Hz）
+_FALLBACK_RATE = 60
+
+
+@dataclass(slots=True)
+class Animation:
+    """从 start 线性插值到 end 的动画"""
+
+    start: Position
+    end: Position
+    start_time: float  # 开始时间（秒，GLib 单调时钟）
+    duration: float  # 时长（秒）
+    on_update: Callable[[Position], None]
+    on_finish: Callable[[bool], None] | None = None  # 参数为动画是否播放完成
+
+    def position_at(self, now: float) -> tuple[Position, bool]:
+        """计算 now 时刻的位置，以及动画是否已结束"""
+        if self.duration <= 0:
+            return self.end, True
+        progress = (now - self.start_time) / self.duration
+        if progress >= 1.0:
+            return self.end, True
+        progress = max(progress, 0.0)
+        return (
+            self.start[0] + (self.end[0] - self.start[0]) * progress,
+            self.start[1] + (self.end[1] - self.start[1]) * progress,
+        ), False
+
+
+class AnimationScheduler:
+    """动画调度器，每个持有者同时最多有一个动画"""
+
+    def __init__(self, rate: int = ANIMATION_TICK_RATE):
+        self.rate: int = rate  # 0: 跟随帧时钟；>0: 固定频率（Hz）
+        self._animations: dict[Any, Animation] = {}
+        self._widget: "Gtk.Widget | None" = None
+        self._source_id: int = 0
+        self._source_is_tick: bool = False
+
+    @staticmethod
+    def now() -> float:
+        """当前时间（秒），与帧时钟使用同一个单调时钟"""
+        return GLib.get_monotonic_time() / 1_000_000
+
+    def attach(self, widget: "Gtk.Widget") -> None:
+        """使用 widget（通常为主窗口）的帧时钟驱动动画"""
+        self._stop()
+        self._widget = widget
+        self._start()
+
+    def detach(self) -> None:
+        """取消所有动画并解除与帧时钟的绑定"""
+        self.clear()
+        self._widget = None
+
+    def animate(
+        self,
+        owner: Any,
+        start: Position,
+        end: Position,
+        duration: float,
+        on_update: Callable[[Position], None],
+        on_finish: Callable[[bool], None] | None = None,
+    ) -> None:
+        """开始 owner 的动画，替换其正在进行的动画"""
+        self.cancel(owner)
+        self._animations[owner] = Animation(
+            start, end, self.now(), duration, on_update, on_finish
+        )
+        self._start()
+
+    def retarget(self, owner: Any, end: Position) -> bool:
+        """修改 owner 正在进行的动画的终点，从当前位置出发，剩余时长不变"""
+        animation = self._animations.get(owner)
+        if animation is None:
+            return False
+        now = self.now()
+        position, _ = animation.position_at(now)
+        remaining = animation.start_time + animation.duration - now
+        animation.start = position
+        animation.end = end
+        animation.start_time = now
+        animation.duration = max(0.0, remaining)
+        return True
+
+    def cancel(self, owner: Any) -> bool:
+        """取消 owner 的动画"""
+        animation = self._animations.pop(owner, None)
+        if animation is None:
+            return False
+        if not self._animations:
+            self._stop()
+        if animation.on_finish is not None:
+            animation.on_finish(False)
+        return True
+
+    def is_animating(self, owner: Any) -> bool:
+        """owner 是否有正在进行的动画"""
+        return owner in self._animations
+
+    def clear(self) -> None:
+        """取消所有动画"""
+        for owner in list(self._animations):
+            self.cancel(owner)
+
+    def _start(self) -> None:
+        """有动画时启动帧时钟回调或定时器"""
+        if self._source_id or not self._animations:
+            return
+        widget = self._widget
+        if self.rate <= 0 and widget is not None and widget.get_mapped():
+            self._source_id = widget.add_tick_callback(self._on_tick)
+            self._source_is_tick = True
+        else:
+            rate = self.rate if self.rate > 0 else _FALLBACK_RATE
+            self._source_id = GLib.timeout_add(max(1, int(1000 / rate)), self._on_timeout)
+            self._source_is_tick = False
+
+    def _stop(self) -> None:
+        if not self._source_id:
+            return
+        if not self._source_is_tick:
+            GLib.source_remove(self._source_id)
+        elif self._widget is not None:
+            self._widget.remove_tick_callback(self._source_id)
+        self._source_id = 0
+
+    def _on_tick(self, widget: "Gtk.Widget", frame_clock: "Gdk.FrameClock") -> bool:
+        return self._advance(frame_clock.get_frame_time() / 1_000_000)
+
+    def _on_timeout(self) -> bool:
+        return self._advance(self.now())
+
+    def _advance(self, now: float) -> bool:
+        """推进所有动画，本轮发出的消息合并为一次写入，全部结束后停止回调"""
+        source_id = self._source_id
+        with message_batch():
+            for owner, animation in list(self._animations.items()):
+                # 在之前的回调中被取消或替换
+                if self._animations.get(owner) is not animation:
+                    continue
+                position, finished = animation.position_at(now)
+                try:
+                    animation.on_update(position)
+                except Exception as e:
+                    logger.error(f"Animation update failed for {owner}: {e}")
+                    finished = True
+                if finished and self._animations.get(owner) is animation:
+                    del self._animations[owner]
+                    if animation.on_finish is not None:
+                        animation.on_finish(True)
+
+        # 回调期间被停止或重新启动，当前回调不再继续
+        if self._source_id != source_id:
+            return GLib.SOURCE_REMOVE
+        if not self._animations:
+            self._source_id = 0
+            return GLib.SOURCE_REMOVE
+        return GLib.SOURCE_CONTINUE
+
+
+# 全局动画调度器实例
+animation_scheduler = AnimationScheduler()
@@ -3,6 +3,8 @@
 项目常量定义
 """
 
+import os
+
 # 应用程序信息
 APP_ID = "com.example.advanced-transparent-widgets"
 APP_TITLE = "Waydroid Helper Key Mapper"
@@ -13,6 +15,31 @@ DEFAULT_WIDGET_HEIGHT = 100
 MIN_WIDGET_WIDTH = 50
 MIN_WIDGET_HEIGHT = 30
 
+# 映射模式下鼠标移动事件的分发方式
+# None: 每个移动事件立即分发；0: 合并到每帧（Gdk.FrameClock）分发一次；>0: 按固定频率（Hz）合并分发
+MOTION_DISPATCH_RATE: int | None = 0
+
+# 鼠标悬停（HOVER_MOVE）消息的最大发送频率（Hz），0 表示不限制
+HOVER_MAX_RATE = 120
+
+# 瞄准组件 MOVE 消息的输出频率，0: 跟随帧时钟（Gdk.FrameClock）；>0: 固定频率（Hz）
+AIM_OUTPUT_RATE = 0
+
+# 组件插值动画的推进方式，0: 跟随帧时钟（Gdk.FrameClock）；>0: 使用单个固定频率（Hz）定时器
+ANIMATION_TICK_RATE = 0
+
+# 主循环卡顿监视（设置环境变量 WAYDROID_HELPER_WATCHDOG 开启）：探测间隔与卡顿阈值（秒）
+MAIN_LOOP_WATCHDOG_ENABLED = bool(os.environ.get("WAYDROID_HELPER_WATCHDOG"))
+MAIN_LOOP_WATCHDOG_INTERVAL = 0.1
+MAIN_LOOP_WATCHDOG_THRESHOLD = 0.2
+
+# 输入延迟追踪（设置环境变量 WAYDROID_HELPER_TRACE_LATENCY 开启），关闭窗口时输出统计
+LATENCY_TRACING_ENABLED = bool(os.environ.get("WAYDROID_HELPER_TRACE_LATENCY"))
+
+# 映射模式下由窗口覆盖层统一绘制所有组件提示，组件本身隐藏
+# （设置环境变量 WAYDROID_HELPER_MAPPING_OVERLAY 开启）
+MAPPING_OVERLAY_RENDERER = bool(os.environ.get("WAYDROID_HELPER_MAPPING_OVERLAY"))
+
 # 调整大小相关
 RESIZE_BORDER_WIDTH = 8
 
@@ -199,4 +199,20 @@ class InjectScrollEventMsg(ControlMsg):
             hscroll_fixed,
             vscroll_fixed,
             self.buttons,
-        )
\ No newline at end of file
+        )
+
+
+@dataclass
+class PackedMsg(ControlMsg):
+    """预先打包好的控制消息，pack() 直接返回已打包的字节"""
+    packed_type: ControlMsgType
+    data: bytes
+    # 触摸消息的 (action, pointer_id, position)，供 pointer_id 管理器记录触摸位置
+    touch: tuple[int, int, tuple[int, int, int, int]] | None = None
+
+    @property
+    def msg_type(self) -> ControlMsgType:
+        return self.packed_type
+
+    def pack(self) -> bytes:
+        return self.data
@@ -51,6 +51,7 @@ class EventType(str, Enum):
     ENTER_STARING = "enter-staring"  # 进入瞄准模式
     EXIT_STARING = "exit-staring"  # 退出瞄准模式
     SWIPEHOLD_RADIUS = "swipehold-radius"  # 滑动半径设置
+    INDICATOR_UPDATE = "indicator-update"  # 动态指示点更新，data 为 None 时隐藏
 
 
 @dataclass
@@ -99,6 +100,7 @@ class GlobalEventEmitter(GObject.Object):
         EventType.ENTER_STARING: (GObject.SignalFlags.RUN_FIRST, None, (object, object)),
         EventType.EXIT_STARING: (GObject.SignalFlags.RUN_FIRST, None, (object, object)),
         EventType.SWIPEHOLD_RADIUS: (GObject.SignalFlags.RUN_FIRST, None, (object, object)),
+        EventType.INDICATOR_UPDATE: (GObject.SignalFlags.RUN_FIRST, None, (object, object)),
     }
 
     def __new__(cls):
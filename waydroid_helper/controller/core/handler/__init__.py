@@ -4,13 +4,16 @@
 
 from .default import DefaultEventHandler
 from .event_handlers import (EventHandlerPriority, InputEvent,
-                             InputEventHandler, InputEventHandlerChain)
+                             InputEventHandler, InputEventHandlerChain,
+                             InputEventType, ModifierMask)
 from .mapping import KeyMappingEventHandler, key_mapping_manager
 
 __all__ = [
     "InputEventHandler",
     "EventHandlerPriority",
     "InputEvent",
+    "InputEventType",
+    "ModifierMask",
     "InputEventHandlerChain",
     "KeyMappingEventHandler",
     "DefaultEventHandler",
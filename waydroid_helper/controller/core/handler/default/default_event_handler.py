@@ -13,12 +13,14 @@ from waydroid_helper.controller.core.handler.default.default_key_handler import
 from waydroid_helper.controller.core.handler.default.default_mouse_handler import \
     MouseDefault
 from waydroid_helper.controller.core.handler.event_handlers import (
-    EventHandlerPriority, InputEvent, InputEventHandler)
+    EventHandlerPriority, InputEvent, InputEventHandler, InputEventType)
 
 
 class DefaultEventHandler(InputEventHandler):
     """默认事件处理器 - 处理未被widget处理的事件"""
 
+    HANDLED_EVENT_TYPES = frozenset(InputEventType)
+
     def __init__(self):
         super().__init__(EventHandlerPriority.LOWEST)
         self.name = "DefaultEventHandler"
@@ -29,6 +31,17 @@ class DefaultEventHandler(InputEventHandler):
         self.keyboard_handler: KeyboardDefault = KeyboardDefault()
         self.mouse_handler: MouseDefault = MouseDefault()
 
+        # 按事件类型索引的处理函数
+        self._dispatch: dict[InputEventType, Callable[[InputEvent], bool]] = {
+            InputEventType.KEY_PRESS: self._handle_default_key_press,
+            InputEventType.KEY_RELEASE: self._handle_default_key_release,
+            InputEventType.MOUSE_PRESS: self._handle_default_mouse_press,
+            InputEventType.MOUSE_RELEASE: self._handle_default_mouse_release,
+            InputEventType.MOUSE_MOTION: self._handle_default_mouse_motion,
+            InputEventType.MOUSE_SCROLL: self._handle_default_mouse_scroll,
+            InputEventType.MOUSE_ZOOM: self._handle_default_mouse_zoom,
+        }
+
     def can_handle(self, event: InputEvent) -> bool:
         """默认处理器可以处理所有事件"""
         return self.enabled
@@ -36,21 +49,7 @@ class DefaultEventHandler(InputEventHandler):
     def handle_event(self, event: InputEvent) -> bool:
         """处理默认事件"""
         try:
-            if event.event_type == "key_press":
-                return self._handle_default_key_press(event)
-            elif event.event_type == "key_release":
-                return self._handle_default_key_release(event)
-            elif event.event_type == "mouse_press":
-                return self._handle_default_mouse_press(event)
-            elif event.event_type == "mouse_release":
-                return self._handle_default_mouse_release(event)
-            elif event.event_type == "mouse_motion":
-                return self._handle_default_mouse_motion(event)
-            elif event.event_type == "mouse_scroll":
-                return self._handle_default_mouse_scroll(event)
-            elif event.event_type == "mouse_zoom":
-                return self._handle_default_mouse_zoom(event)
-
+            return self._dispatch[event.event_type](event)
         except Exception as e:
             logger.error(f"Default event handler failed to process event: {e}")
 
@@ -58,12 +57,10 @@ class DefaultEventHandler(InputEventHandler):
 
     def _handle_default_mouse_motion(self, event: InputEvent) -> bool:
         """处理默认鼠标移动"""
-        if not event.position or not event.raw_data:
+        if not event.position or not event.raw:
             return False
 
-        self.mouse_handler.motion_processor(
-            event.raw_data["controller"], event.raw_data["x"], event.raw_data["y"]
-        )
+        self.mouse_handler.motion_processor(*event.raw)
         return True
 
     def _handle_default_key_press(self, event: InputEvent) -> bool:
@@ -80,15 +77,10 @@ class DefaultEventHandler(InputEventHandler):
             except Exception as e:
                 logger.error(f"Failed to execute custom key mapping: {e}")
 
-        if not event.raw_data:
+        if not event.raw:
             return False
 
-        self.keyboard_handler.key_processor(
-            event.raw_data["controller"],
-            event.raw_data["keyval"],
-            event.raw_data["keycode"],
-            event.raw_data["state"],
-        )
+        self.keyboard_handler.key_processor(*event.raw)
         return True
 
     def _handle_default_key_release(self, event: InputEvent) -> bool:
@@ -96,15 +88,10 @@ class DefaultEventHandler(InputEventHandler):
         if not event.key:
             return False
 
-        if not event.raw_data:
+        if not event.raw:
             return False
 
-        self.keyboard_handler.key_processor(
-            event.raw_data["controller"],
-            event.raw_data["keyval"],
-            event.raw_data["keycode"],
-            event.raw_data["state"],
-        )
+        self.keyboard_handler.key_processor(*event.raw)
         return True
 
     def _handle_default_mouse_press(self, event: InputEvent) -> bool:
@@ -120,15 +107,10 @@ class DefaultEventHandler(InputEventHandler):
             except Exception as e:
                 logger.error(f"Failed to execute custom mouse mapping: {e}")
 
-        if not event.raw_data:
+        if not event.raw:
             return False
 
-        self.mouse_handler.click_processor(
-            event.raw_data["controller"],
-            event.raw_data["n_press"],
-            event.raw_data["x"],
-            event.raw_data["y"],
-        )
+        self.mouse_handler.click_processor(*event.raw)
         return True
 
     def _handle_default_mouse_release(self, event: InputEvent) -> bool:
@@ -136,15 +118,10 @@ class DefaultEventHandler(InputEventHandler):
         if not event.button:
             return False
 
-        if not event.raw_data:
+        if not event.raw:
             return False
 
-        self.mouse_handler.click_processor(
-            event.raw_data["controller"],
-            event.raw_data["n_press"],
-            event.raw_data["x"],
-            event.raw_data["y"],
-        )
+        self.mouse_handler.click_processor(*event.raw)
         return True
 
     def add_key_mapping(self, key_name: str, callback: Callable[[InputEvent], None]):
@@ -157,18 +134,14 @@ class DefaultEventHandler(InputEventHandler):
 
     def _handle_default_mouse_scroll(self, event: InputEvent) -> bool:
         """处理默认鼠标滚动"""
-        if not event.raw_data:
+        if not event.raw:
             return False
-        self.mouse_handler.scroll_processor(
-            event.raw_data["controller"], event.raw_data["dx"], event.raw_data["dy"]
-        )
+        self.mouse_handler.scroll_processor(*event.raw)
         return True
 
     def _handle_default_mouse_zoom(self, event: InputEvent) -> bool:
         """处理默认鼠标缩放"""
-        if not event.raw_data:
+        if not event.raw:
             return False
-        self.mouse_handler.zoom_processor(
-            event.raw_data["controller"], event.raw_data["range"]
-        )
+        self.mouse_handler.zoom_processor(*event.raw)
         return True
@@ -3,21 +3,27 @@ import gi
 from waydroid_helper.controller.core.handler.event_handlers import InputEvent
 
 gi.require_version("Gdk", "4.0")
+import math
+import time
 from abc import ABC, abstractmethod
 from enum import IntEnum
 from typing import TYPE_CHECKING, cast
 
-from gi.repository import Gdk
+from gi.repository import Gdk, GLib
 
 from waydroid_helper.controller.android.input import (
     AMotionEventAction,
     AMotionEventButtons,
 )
+from waydroid_helper.controller.core.constants import HOVER_MAX_RATE
 from waydroid_helper.controller.core.control_msg import (
     InjectScrollEventMsg,
     InjectTouchEventMsg,
+    scale_coordinates,
+    to_fixed_point_i16,
 )
 from waydroid_helper.controller.core.event_bus import Event, EventType, event_bus
+from waydroid_helper.controller.core.utils import cursor_tracker
 
 if TYPE_CHECKING:
     from gi.repository import Gtk
@@ -47,7 +53,11 @@ class MouseBase(ABC):
 
     @abstractmethod
     def motion_processor(
-        self, controller: "Gtk.EventControllerMotion", x: float, y: float
+        self,
+        controller: "Gtk.EventControllerMotion",
+        x: float,
+        y: float,
+        state: Gdk.ModifierType | None = None,
     ) -> bool:
         pass
 
@@ -69,6 +79,28 @@ class MouseDefault(MouseBase):
         self._current_x: float = 0
         self._current_y: float = 0
 
+        # 悬停消息管线：去重 + 限频，保证最后一个位置一定会发出
+        self.hover_rate: int = HOVER_MAX_RATE
+        self._last_hover_position: tuple[int, int] | None = None
+        self._last_hover_time: float = 0.0
+        self._pending_hover: tuple[int, int, int, int] | None = None
+        self._hover_timer_id: int = 0
+
+        # 滚动累加器：帧间累加滚动量，每帧最多发送一条滚动消息，保留量化余数
+        self._scroll_h: float = 0.0
+        self._scroll_v: float = 0.0
+        self._scroll_position: tuple[int, int, int, int] = (0, 0, 0, 0)
+        self._scroll_buttons: AMotionEventButtons | int = 0
+        self._scroll_tick_id: int = 0
+
+    def _get_root_size(self, widget: "Gtk.Widget") -> tuple[int, int]:
+        """获取窗口尺寸，优先使用窗口尺寸变化时缓存的值"""
+        w, h = cursor_tracker.root_size
+        if w and h:
+            return w, h
+        root = cast("Gtk.Window", widget.get_root())
+        return root.get_width(), root.get_height()
+
     def convert_click_action(self, event: Gdk.Event) -> AMotionEventAction:
         if event.get_event_type() == Gdk.EventType.BUTTON_PRESS:
             action = AMotionEventAction.DOWN
@@ -90,7 +122,13 @@ class MouseDefault(MouseBase):
     def convert_buttons(
         self, event: Gdk.Event, action_button: AMotionEventButtons | int | None = None
     ) -> AMotionEventButtons | int:
-        state = event.get_modifier_state()
+        return self.convert_buttons_state(event.get_modifier_state(), action_button)
+
+    def convert_buttons_state(
+        self,
+        state: Gdk.ModifierType,
+        action_button: AMotionEventButtons | int | None = None,
+    ) -> AMotionEventButtons | int:
         buttons = 0
         if state & Gdk.ModifierType.BUTTON1_MASK:
             buttons |= AMotionEventButtons.PRIMARY
@@ -103,20 +141,22 @@ class MouseDefault(MouseBase):
         return buttons
 
     def motion_processor(
-        self, controller: "Gtk.EventControllerMotion", x: float, y: float
+        self,
+        controller: "Gtk.EventControllerMotion",
+        x: float,
+        y: float,
+        state: Gdk.ModifierType | None = None,
     ) -> bool:
-        # print(controller.get_current_event().get_event_type(), x, y)
         widget = controller.get_widget()
         if widget is None:
             return False
-        root = widget.get_root()
-        root = cast("Gtk.Window", root)
-        w = root.get_width()
-        h = root.get_height()
-        event = controller.get_current_event()
-        if event is None:
-            return False
-        buttons_state = self.convert_buttons(event)
+        # 合并分发的移动事件在分发时已没有当前事件，需要使用记录下来的状态
+        if state is None:
+            event = controller.get_current_event()
+            if event is None:
+                return False
+            state = event.get_modifier_state()
+        buttons_state = self.convert_buttons_state(state)
 
         x = max(0, x)
         y = max(0, y)
@@ -125,35 +165,96 @@ class MouseDefault(MouseBase):
 
         if not self.mouse_hover and buttons_state == 0:
             return False
-        action = (
-            AMotionEventAction.MOVE
-            if buttons_state != 0
-            else AMotionEventAction.HOVER_MOVE
-        )
+
+        w, h = self._get_root_size(widget)
         position = (int(x), int(y), w, h)
-        pressure = 1.0
+        if buttons_state == 0:
+            return self._process_hover(position)
+
+        # 按下状态的移动不限频，同时重置悬停状态
+        self._reset_hover()
         msg = InjectTouchEventMsg(
-            action=action,
+            action=AMotionEventAction.MOVE,
             pointer_id=PointerId.MOUSE,
             position=position,
-            pressure=pressure,
+            pressure=1.0,
             action_button=0,
             buttons=buttons_state,
         )
         event_bus.emit(Event(EventType.CONTROL_MSG, self, msg))
         return True
 
+    def _process_hover(self, position: tuple[int, int, int, int]) -> bool:
+        """悬停移动：丢弃设备坐标未变化的事件，并按 hover_rate 限频"""
+        scaled = scale_coordinates(*position)[:2]
+        if scaled == self._last_hover_position:
+            # 回到了已发送的位置，之前缓存的位置不再需要发送
+            self._pending_hover = None
+            return True
+
+        now = time.monotonic()
+        if self.hover_rate > 0:
+            remaining = self._last_hover_time + 1.0 / self.hover_rate - now
+            if remaining > 0:
+                # 超出频率限制，记录最新位置，到期后发送
+                self._pending_hover = position
+                if not self._hover_timer_id:
+                    self._hover_timer_id = GLib.timeout_add(
+                        max(1, math.ceil(remaining * 1000)), self._flush_hover
+                    )
+                return True
+
+        self._send_hover(position, scaled, now)
+        return True
+
+    def _flush_hover(self) -> bool:
+        """发送限频期间缓存的最后一个悬停位置"""
+        self._hover_timer_id = 0
+        position = self._pending_hover
+        if position is not None:
+            scaled = scale_coordinates(*position)[:2]
+            if scaled != self._last_hover_position:
+                self._send_hover(position, scaled, time.monotonic())
+            self._pending_hover = None
+        return GLib.SOURCE_REMOVE
+
+    def _send_hover(
+        self,
+        position: tuple[int, int, int, int],
+        scaled: tuple[int, int],
+        now: float,
+    ) -> None:
+        self._pending_hover = None
+        self._last_hover_position = scaled
+        self._last_hover_time = now
+        msg = InjectTouchEventMsg(
+            action=AMotionEventAction.HOVER_MOVE,
+            pointer_id=PointerId.MOUSE,
+            position=position,
+            pressure=1.0,
+            action_button=0,
+            buttons=0,
+        )
+        event_bus.emit(Event(EventType.CONTROL_MSG, self, msg))
+
+    def _reset_hover(self) -> None:
+        """取消未发送的悬停位置，下一次悬停一定会发出"""
+        if self._hover_timer_id:
+            GLib.source_remove(self._hover_timer_id)
+            self._hover_timer_id = 0
+        self._pending_hover = None
+        self._last_hover_position = None
+
     def click_processor(
         self, controller: "Gtk.GestureClick", n_press: int, x: float, y: float
     ) -> bool:
         widget = controller.get_widget()
         if widget is None:
             return False
-        root = widget.get_root()
-        root = cast("Gtk.Window", root)
+        w, h = self._get_root_size(widget)
 
-        w = root.get_width()
-        h = root.get_height()
+        # 点击携带自身位置，之前未发送的悬停位置直接丢弃
+        self._reset_hover()
 
         event = controller.get_current_event()
         event = cast(Gdk.ButtonEvent, event)
@@ -182,10 +283,7 @@ class MouseDefault(MouseBase):
         widget = controller.get_widget()
         if widget is None:
             return False
-        root = widget.get_root()
-        root = cast("Gtk.Window", root)
-        w = root.get_width()
-        h = root.get_height()
+        w, h = self._get_root_size(widget)
 
         event = controller.get_current_event()
         if event is None:
@@ -216,19 +314,56 @@ class MouseDefault(MouseBase):
             if self.natural_scroll:
                 hscroll = -hscroll
                 vscroll = -vscroll
-            buttons = self.convert_buttons(event)
 
             if hscroll !=0 and hscroll.is_integer() or vscroll != 0 and vscroll.is_integer():
                 factor = 0.0625
             else:
                 factor = 0.005
 
-            hscroll_clamped = max(-1.0, min(1.0, hscroll * factor))
-            vscroll_clamped = max(-1.0, min(1.0, vscroll * factor))
+            self._accumulate_scroll(hscroll * factor, vscroll * factor)
+            self._scroll_position = position
+            self._scroll_buttons = self.convert_buttons(event)
+            self._schedule_scroll_flush(widget)
+            return True
 
-            msg = InjectScrollEventMsg(position, hscroll_clamped, vscroll_clamped, buttons)
+    def _accumulate_scroll(self, hscroll: float, vscroll: float) -> None:
+        """累加滚动量，方向反转时丢弃积压的滚动量"""
+        if hscroll * self._scroll_h < 0:
+            self._scroll_h = 0.0
+        if vscroll * self._scroll_v < 0:
+            self._scroll_v = 0.0
+        self._scroll_h += hscroll
+        self._scroll_v += vscroll
+
+    def _schedule_scroll_flush(self, widget: "Gtk.Widget") -> None:
+        """在下一帧发送累加的滚动量"""
+        if self._scroll_tick_id:
+            return
+        root = cast("Gtk.Widget", widget.get_root())
+        self._scroll_tick_id = root.add_tick_callback(self._on_scroll_tick)
+
+    def _on_scroll_tick(self, widget: "Gtk.Widget", frame_clock: Gdk.FrameClock) -> bool:
+        """帧回调：发送一条滚动消息，超出 [-1, 1] 的部分和量化余数留到下一帧，
+        积压量限制在 [-1, 1] 内，输入停止后最多再滚动一帧"""
+        hscroll = max(-1.0, min(1.0, self._scroll_h))
+        vscroll = max(-1.0, min(1.0, self._scroll_v))
+        # 与 InjectScrollEventMsg 打包时的定点数精度保持一致
+        hscroll = to_fixed_point_i16(hscroll) / 0x8000
+        vscroll = to_fixed_point_i16(vscroll) / 0x8000
+
+        if hscroll != 0 or vscroll != 0:
+            self._scroll_h = max(-1.0, min(1.0, self._scroll_h - hscroll))
+            self._scroll_v = max(-1.0, min(1.0, self._scroll_v - vscroll))
+            msg = InjectScrollEventMsg(
+                self._scroll_position, hscroll, vscroll, self._scroll_buttons
+            )
             event_bus.emit(Event(EventType.CONTROL_MSG, self, msg))
-            return True
+
+        # 仍有可发送的积压量时继续下一帧，否则停止帧回调
+        if abs(self._scroll_h) * 0x8000 >= 1 or abs(self._scroll_v) * 0x8000 >= 1:
+            return GLib.SOURCE_CONTINUE
+        self._scroll_tick_id = 0
+        return GLib.SOURCE_REMOVE
 
     def touch_processor(self):
         return True
@@ -6,12 +6,17 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from enum import IntEnum
+from enum import IntEnum, IntFlag
 from typing import Any
 
-from waydroid_helper.controller.core.key_system import Key
+import gi
+
+from waydroid_helper.controller.core.key_system import Key, key_registry
 from waydroid_helper.util.log import logger
 
+gi.require_version("Gdk", "4.0")
+from gi.repository import Gdk
+
 
 class EventHandlerPriority(IntEnum):
     """事件处理器优先级"""
@@ -23,21 +28,99 @@ class EventHandlerPriority(IntEnum):
     LOWEST = 100  # 最低优先级（默认处理器）
 
 
-@dataclass
+class InputEventType(IntEnum):
+    """输入事件类型"""
+
+    KEY_PRESS = 0
+    KEY_RELEASE = 1
+    MOUSE_PRESS = 2
+    MOUSE_RELEASE = 3
+    MOUSE_MOTION = 4
+    MOUSE_SCROLL = 5
+    MOUSE_ZOOM = 6
+
+
+class ModifierMask(IntFlag):
+    """修饰键位掩码"""
+
+    NONE = 0
+    CTRL = 1
+    ALT = 2
+    SHIFT = 4
+    SUPER = 8
+
+    @classmethod
+    def from_state(cls, state: int) -> "ModifierMask":
+        """从 Gdk.ModifierType 状态转换"""
+        mask = cls.NONE
+        if state & Gdk.ModifierType.CONTROL_MASK:
+            mask |= cls.CTRL
+        if state & Gdk.ModifierType.ALT_MASK:
+            mask |= cls.ALT
+        if state & Gdk.ModifierType.SHIFT_MASK:
+            mask |= cls.SHIFT
+        if state & Gdk.ModifierType.SUPER_MASK:
+            mask |= cls.SUPER
+        return mask
+
+
+# 位掩码对应的修饰键名称
+_MODIFIER_KEY_NAMES: tuple[tuple[ModifierMask, str], ...] = (
+    (ModifierMask.CTRL, "Ctrl_L"),
+    (ModifierMask.ALT, "Alt_L"),
+    (ModifierMask.SHIFT, "Shift_L"),
+    (ModifierMask.SUPER, "Super_L"),
+)
+
+# 各事件类型原始数据的字段名，与 InputEvent.raw 元组一一对应
+_RAW_FIELDS: dict[InputEventType, tuple[str, ...]] = {
+    InputEventType.KEY_PRESS: ("controller", "keyval", "keycode", "state"),
+    InputEventType.KEY_RELEASE: ("controller", "keyval", "keycode", "state"),
+    InputEventType.MOUSE_PRESS: ("controller", "n_press", "x", "y"),
+    InputEventType.MOUSE_RELEASE: ("controller", "n_press", "x", "y"),
+    InputEventType.MOUSE_MOTION: ("controller", "x", "y", "state"),
+    InputEventType.MOUSE_SCROLL: ("controller", "dx", "dy"),
+    InputEventType.MOUSE_ZOOM: ("controller", "range"),
+}
+
+
+@dataclass(slots=True)
 class InputEvent:
     """输入事件数据结构"""
 
-    event_type: str  # "key_press", "key_release", "mouse_press", "mouse_release"
+    event_type: InputEventType
     key: Key | None = None
     button: int | None = None  # 鼠标按钮
     position: tuple[int, int] | None = None  # (x, y)
-    modifiers: list[Key] | None = None  # 修饰键列表
-    raw_data: dict[str, Any] | None = None  # 原始事件数据
+    modifier_mask: ModifierMask = ModifierMask.NONE  # 修饰键位掩码
+    raw: tuple[Any, ...] | None = None  # 原始事件参数，字段顺序见 _RAW_FIELDS
+    repeat: bool = False  # 是否为按住按键产生的自动重复
+
+    @property
+    def modifiers(self) -> list[Key]:
+        """修饰键列表，按需从位掩码生成"""
+        result: list[Key] = []
+        for flag, name in _MODIFIER_KEY_NAMES:
+            if self.modifier_mask & flag:
+                key = key_registry.get_by_name(name)
+                if key:
+                    result.append(key)
+        return result
+
+    @property
+    def raw_data(self) -> dict[str, Any] | None:
+        """原始事件数据字典，按需生成"""
+        if self.raw is None:
+            return None
+        return dict(zip(_RAW_FIELDS[self.event_type], self.raw))
 
 
 class InputEventHandler(ABC):
     """事件处理器基类"""
 
+    # 处理器关心的事件类型，None 表示需要逐个事件调用 can_handle 判断
+    HANDLED_EVENT_TYPES: frozenset[InputEventType] | None = None
+
     def __init__(self, priority: EventHandlerPriority = EventHandlerPriority.NORMAL):
         self.priority = priority
         self.enabled = True
@@ -65,12 +148,15 @@ class InputEventHandlerChain:
     def __init__(self):
         self.handlers: list[InputEventHandler] = []
         self.enabled = True
+        # 编译后的分发表：按事件类型索引的处理器列表（已按优先级排序）
+        self._dispatch_table: list[tuple[InputEventHandler, ...]] | None = None
 
     def add_handler(self, handler: InputEventHandler):
         """添加事件处理器"""
         self.handlers.append(handler)
         # 按优先级排序（数值越小优先级越高）
         self.handlers.sort(key=lambda h: h.get_priority())
+        self._dispatch_table = None
         logger.info(
             f"Add event handler: {handler.__class__.__name__} (priority: {handler.get_priority()})"
         )
@@ -79,18 +165,38 @@ class InputEventHandlerChain:
         """移除事件处理器"""
         if handler in self.handlers:
             self.handlers.remove(handler)
+            self._dispatch_table = None
             logger.info(f"Remove event handler: {handler.__class__.__name__}")
 
+    def compile(self) -> list[tuple[InputEventHandler, ...]]:
+        """按事件类型预先分组处理器，处理事件时只需查表"""
+        table = [
+            tuple(
+                handler
+                for handler in self.handlers
+                if handler.HANDLED_EVENT_TYPES is None
+                or event_type in handler.HANDLED_EVENT_TYPES
+            )
+            for event_type in InputEventType
+        ]
+        self._dispatch_table = table
+        return table
+
     def process_event(self, event: InputEvent) -> bool:
         """处理事件，返回True表示事件已被处理"""
         if not self.enabled:
             return False
 
-        for handler in self.handlers:
+        table = self._dispatch_table
+        if table is None:
+            table = self.compile()
+
+        for handler in table[event.event_type]:
             if not handler.enabled:
                 continue
 
-            if handler.can_handle(event):
+            # 声明了事件类型的处理器已经在编译时筛选过，无需再调用 can_handle
+            if handler.HANDLED_EVENT_TYPES is not None or handler.can_handle(event):
                 try:
                     if handler.handle_event(event):
                         return True  # 事件已被消费，停止传递
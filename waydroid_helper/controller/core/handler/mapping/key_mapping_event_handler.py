@@ -4,7 +4,7 @@
 """
 
 from waydroid_helper.controller.core.handler.event_handlers import (
-    EventHandlerPriority, InputEvent, InputEventHandler)
+    EventHandlerPriority, InputEvent, InputEventHandler, InputEventType)
 
 from .key_mapping_manager import key_mapping_manager
 
@@ -15,6 +15,15 @@ class KeyMappingEventHandler(InputEventHandler):
     它使用全局的 key_mapping_manager 来触发已注册的映射。
     """
 
+    HANDLED_EVENT_TYPES = frozenset(
+        [
+            InputEventType.KEY_PRESS,
+            InputEventType.KEY_RELEASE,
+            InputEventType.MOUSE_PRESS,
+            InputEventType.MOUSE_RELEASE,
+        ]
+    )
+
     def __init__(self):
         # 这个处理器的优先级应该比较高，确保它在默认处理器之前执行
         super().__init__(EventHandlerPriority.NORMAL)
@@ -22,24 +31,23 @@ class KeyMappingEventHandler(InputEventHandler):
 
     def can_handle(self, event: InputEvent) -> bool:
         """此处理器只处理按键和鼠标事件"""
-        return self.enabled and event.event_type in [
-            "key_press",
-            "key_release",
-            "mouse_press",
-            "mouse_release",
-        ]
+        return self.enabled and event.event_type in self.HANDLED_EVENT_TYPES
 
     def handle_event(self, event: InputEvent) -> bool:
         """
         处理事件，将其传递给 key_mapping_manager，并返回是否被消费。
         """
-        if not self.can_handle(event):
-            return False
+        # 自动重复只转发给可重入的订阅，不再走组合匹配
+        if event.repeat:
+            return key_mapping_manager.handle_key_repeat(event)
 
         # 对于按键事件，我们只关心主键（Key对象），组合逻辑由manager处理
-        if event.event_type in ["key_press", "mouse_press"]:
+        if event.event_type in (InputEventType.KEY_PRESS, InputEventType.MOUSE_PRESS):
             return key_mapping_manager.handle_key_press(event)
-        elif event.event_type in ["key_release", "mouse_release"]:
+        elif event.event_type in (
+            InputEventType.KEY_RELEASE,
+            InputEventType.MOUSE_RELEASE,
+        ):
             return key_mapping_manager.handle_key_release(event)
         # 如果事件没有被按键处理器消费，则返回False
         return False
@@ -4,11 +4,13 @@
 负责管理和处理所有的按键映射订阅和触发
 """
 import itertools
-from typing import TYPE_CHECKING, Any, Callable
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
 
 from waydroid_helper.controller.core.event_bus import (Event, EventType,
                                                        event_bus)
-from waydroid_helper.controller.core.handler.event_handlers import InputEvent
+from waydroid_helper.controller.core.handler.event_handlers import (
+    InputEvent, InputEventType)
 from waydroid_helper.controller.core.key_system import Key, KeyCombination
 
 if TYPE_CHECKING:
@@ -35,6 +37,25 @@ class KeySubscription:
         self.reentrant: bool = reentrant  # 是否支持重入（长按重复触发）
 
 
+class CompiledSubscription(NamedTuple):
+    """编译后的订阅项 - 回调已绑定，条件已合并为单个闭包"""
+
+    widget: "Gtk.Widget"
+    on_triggered: Callable[..., bool] | None
+    on_released: Callable[..., bool] | None
+    reentrant: bool
+    check: Callable[[], bool] | None
+
+
+class CompiledMapping(NamedTuple):
+    """编译后的映射项 - 同一按键组合下的全部订阅"""
+
+    key_combination: KeyCombination
+    subscriptions: tuple[CompiledSubscription, ...]
+    has_reentrant: bool
+    has_non_reentrant: bool
+
+
 class KeyMappingManager:
     """按键映射管理器 - 单例"""
 
@@ -58,14 +79,22 @@ class KeyMappingManager:
         # 为了检查依赖状态，需要一个对widget状态的引用，暂时留空
         self._widget_states: dict[int, dict[str, Any]] = {}
 
+        # 编译后的分发表，按键集合 -> 映射；订阅变化时置空，下次使用时重新编译
+        self._dispatch_table: MappingProxyType[frozenset[Key], CompiledMapping] | None = None
+        self._max_combo_size: int = 0
+
         event_bus.subscribe(EventType.MACRO_KEY_PRESSED, self._on_macro_key_pressed)
         event_bus.subscribe(EventType.MACRO_KEY_RELEASED, self._on_macro_key_released)
 
     def _on_macro_key_pressed(self, event: Event[Key]):
-        self.handle_key_press(InputEvent(event_type="key_press", key=event.data))
+        self.handle_key_press(
+            InputEvent(event_type=InputEventType.KEY_PRESS, key=event.data)
+        )
 
     def _on_macro_key_released(self, event: Event[Key]):
-        self.handle_key_release(InputEvent(event_type="key_release", key=event.data))
+        self.handle_key_release(
+            InputEvent(event_type=InputEventType.KEY_RELEASE, key=event.data)
+        )
 
     def subscribe(
         self,
@@ -90,6 +119,7 @@ class KeyMappingManager:
         if key_combination not in self._key_subscriptions:
             self._key_subscriptions[key_combination] = []
         self._key_subscriptions[key_combination].append(subscription)
+        self.invalidate()
 
         return True
 
@@ -110,6 +140,7 @@ class KeyMappingManager:
             if not self._key_subscriptions[key_combination]:
                 del self._key_subscriptions[key_combination]
 
+        self.invalidate()
         return True
 
     def unsubscribe_key(
@@ -131,6 +162,8 @@ class KeyMappingManager:
             if not self._key_subscriptions[key_combination]:
                 del self._key_subscriptions[key_combination]
 
+            self.invalidate()
+
         return True
 
     def get_subscriptions(self, widget: "Gtk.Widget") -> list[KeyCombination]:
@@ -144,6 +177,65 @@ class KeyMappingManager:
 
         return result
 
+    def invalidate(self) -> None:
+        """使分发表失效，下次处理按键时重新编译"""
+        self._dispatch_table = None
+
+    def compile(self) -> MappingProxyType[frozenset[Key], CompiledMapping]:
+        """将订阅编译为只读分发表，热路径只做查表"""
+        table: dict[frozenset[Key], CompiledMapping] = {}
+        max_size = 0
+        for key_combination, subscriptions in self._key_subscriptions.items():
+            compiled = tuple(
+                CompiledSubscription(
+                    widget=sub.widget,
+                    on_triggered=getattr(sub.widget, sub.callback, None),
+                    on_released=getattr(sub.widget, sub.release_callback, None),
+                    reentrant=sub.reentrant,
+                    check=self._compile_condition(sub),
+                )
+                for sub in subscriptions
+            )
+            table[frozenset(key_combination.keys)] = CompiledMapping(
+                key_combination=key_combination,
+                subscriptions=compiled,
+                has_reentrant=any(sub.reentrant for sub in compiled),
+                has_non_reentrant=any(not sub.reentrant for sub in compiled),
+            )
+            max_size = max(max_size, len(key_combination))
+
+        self._dispatch_table = MappingProxyType(table)
+        self._max_combo_size = max_size
+        return self._dispatch_table
+
+    def _get_dispatch_table(self) -> MappingProxyType[frozenset[Key], CompiledMapping]:
+        """获取分发表，失效时惰性重新编译"""
+        if self._dispatch_table is None:
+            return self.compile()
+        return self._dispatch_table
+
+    def _compile_condition(
+        self, subscription: KeySubscription
+    ) -> Callable[[], bool] | None:
+        """将自定义条件与依赖状态合并为单个闭包，无条件时返回 None"""
+        condition = subscription.condition
+        required_states = tuple(subscription.required_states)
+        if condition is None and not required_states:
+            return None
+
+        widget_id = id(subscription.widget)
+        widget_states = self._widget_states
+
+        def check() -> bool:
+            if condition is not None and not condition():
+                return False
+            if required_states:
+                states = widget_states.get(widget_id, {})
+                return all(states.get(name) for name in required_states)
+            return True
+
+        return check
+
     def handle_key_press(self, event: InputEvent) -> bool:
         """处理按键按下事件，返回事件是否被消费"""
         if event.key:
@@ -157,18 +249,39 @@ class KeyMappingManager:
 
         # 检查是否有非重入的订阅正在处理这个按键
         # 只有当所有相关的订阅都是可重入的时，才允许事件传递给下一个handler
+        table = self._get_dispatch_table()
         for key_combination, triggered_keys in self._triggered_mappings.items():
             if event.key in triggered_keys:
-                # 检查这个key_combination是否有非重入的订阅
-                if key_combination in self._key_subscriptions:
-                    has_non_reentrant = any(
-                        not sub.reentrant for sub in self._key_subscriptions[key_combination]
-                    )
-                    if has_non_reentrant:
-                        return True  # 有非重入的订阅在处理，消费事件
+                mapping = table.get(frozenset(key_combination.keys))
+                if mapping is not None and mapping.has_non_reentrant:
+                    return True  # 有非重入的订阅在处理，消费事件
 
         return False
 
+    def handle_key_repeat(self, event: InputEvent) -> bool:
+        """处理按键自动重复，只转发给可重入的订阅，返回事件是否被消费"""
+        consumed = False
+        table = self._get_dispatch_table()
+        for key_combination, triggered_keys in list(self._triggered_mappings.items()):
+            if event.key not in triggered_keys:
+                continue
+
+            # 按键被某个已触发的映射占用，重复事件不应再传递给默认处理器
+            consumed = True
+            mapping = table.get(frozenset(key_combination.keys))
+            if mapping is None or not mapping.has_reentrant:
+                continue
+
+            for subscription in mapping.subscriptions:
+                if not subscription.reentrant:
+                    continue
+                if subscription.check is not None and not subscription.check():
+                    continue
+                if subscription.on_triggered is not None:
+                    subscription.on_triggered(key_combination, event)
+
+        return consumed
+
     def handle_key_release(self, event: InputEvent) -> bool:
         """处理按键释放事件，返回事件是否被消费"""
         if event.key not in self._pressed_keys:
@@ -186,99 +299,76 @@ class KeyMappingManager:
         # 只要释放了旧的映射，或者触发了新的映射，都算事件被消费
         return released_a_mapping or triggered_new_on_release
 
-    def _check_subscription_conditions(self, subscription: KeySubscription) -> bool:
-        """检查订阅的触发条件"""
-        if subscription.condition and not subscription.condition():
-            return False
-
-        if subscription.required_states:
-            widget_id = id(subscription.widget)
-            widget_states = self._widget_states.get(widget_id, {})
-            for state_name in subscription.required_states:
-                if not widget_states.get(state_name):
-                    return False
-
-        return True
-
-    def _check_and_trigger_mappings(self, event:InputEvent) -> bool:
+    def _check_and_trigger_mappings(self, event: InputEvent) -> bool:
         """检查并触发匹配的映射"""
         triggered_any = False
+        table = self._get_dispatch_table()
+        if not table:
+            return False
         pressed_keys_list = list(self._pressed_keys)
 
         # 从最长的组合开始检查，以支持 "Ctrl+Shift+A" 优先于 "Ctrl+A"
-        for size in range(len(pressed_keys_list), 0, -1):
+        max_size = min(len(pressed_keys_list), self._max_combo_size)
+        for size in range(max_size, 0, -1):
             for combo_tuple in itertools.combinations(pressed_keys_list, size):
-                key_combination = KeyCombination(list(combo_tuple))
-
-                if key_combination in self._key_subscriptions:
-                    # 检查此组合是否是其他已触发组合的子集，如果是，则不触发
-                    # is_subset_of_triggered = False
-                    # for triggered_combo in self._triggered_mappings.keys():
-                    #     if key_combination.is_subset_of(triggered_combo):
-                    #         is_subset_of_triggered = True
-                    #         break
-                    # if is_subset_of_triggered:
-                    #     continue
-
-                    # 检查是否已经触发过，以及是否有可重入的订阅
-                    already_triggered = key_combination in self._triggered_mappings
-                    has_reentrant_subscription = any(
-                        sub.reentrant for sub in self._key_subscriptions[key_combination]
-                    )
-                    
-                    # 如果已经触发过且没有可重入订阅，则跳过
-                    if already_triggered and not has_reentrant_subscription:
-                        continue
-
-                    # 如果是第一次触发，预记录到 _triggered_mappings 中
-                    if not already_triggered:
-                        self._triggered_mappings[key_combination] = set(combo_tuple)
-                    
-                    combo_triggered_this_time = False
-                    try:
-                        for subscription in self._key_subscriptions[key_combination]:
-                            if not self._check_subscription_conditions(subscription):
-                                continue
-
-                            # 如果已经触发过，只处理可重入的订阅
-                            if already_triggered and not subscription.reentrant:
-                                continue
-
-                            if hasattr(subscription.widget, subscription.callback):
-                                callback = getattr(
-                                    subscription.widget, subscription.callback
-                                )
-                                # 假设回调返回True表示事件被处理
-                                if callback(key_combination, event):
-                                    combo_triggered_this_time = True
-
-                        if combo_triggered_this_time:
-                            triggered_any = True
-                        elif not already_triggered:
-                            # 如果是第一次触发但没有成功，则从 _triggered_mappings 中移除预记录
-                            del self._triggered_mappings[key_combination]
-                    except Exception as e:
-                        # 如果回调函数执行过程中出现异常，确保清理预记录的映射
-                        if not already_triggered and key_combination in self._triggered_mappings:
-                            del self._triggered_mappings[key_combination]
-                        raise
+                mapping = table.get(frozenset(combo_tuple))
+                if mapping is None:
+                    continue
+                key_combination = mapping.key_combination
+
+                # 检查是否已经触发过，以及是否有可重入的订阅
+                already_triggered = key_combination in self._triggered_mappings
+
+                # 如果已经触发过且没有可重入订阅，则跳过
+                if already_triggered and not mapping.has_reentrant:
+                    continue
+
+                # 如果是第一次触发，预记录到 _triggered_mappings 中
+                if not already_triggered:
+                    self._triggered_mappings[key_combination] = set(combo_tuple)
+
+                combo_triggered_this_time = False
+                try:
+                    for subscription in mapping.subscriptions:
+                        # 如果已经触发过，只处理可重入的订阅
+                        if already_triggered and not subscription.reentrant:
+                            continue
+
+                        if subscription.check is not None and not subscription.check():
+                            continue
+
+                        # 假设回调返回True表示事件被处理
+                        callback = subscription.on_triggered
+                        if callback is not None and callback(key_combination, event):
+                            combo_triggered_this_time = True
+
+                    if combo_triggered_this_time:
+                        triggered_any = True
+                    elif not already_triggered:
+                        # 如果是第一次触发但没有成功，则从 _triggered_mappings 中移除预记录
+                        del self._triggered_mappings[key_combination]
+                except Exception:
+                    # 如果回调函数执行过程中出现异常，确保清理预记录的映射
+                    if not already_triggered and key_combination in self._triggered_mappings:
+                        del self._triggered_mappings[key_combination]
+                    raise
 
         return triggered_any
+
     def _check_mapping_release(self, released_key: Key) -> bool:
         """处理映射释放，返回是否有映射被释放"""
         released_any = False
+        table = self._get_dispatch_table()
         # 使用 list() 来创建副本，因为我们可能在循环中删除元素
         for mapping_key, related_keys in list(self._triggered_mappings.items()):
             if released_key in related_keys:
-                if mapping_key in self._key_subscriptions:
-                    for subscription in self._key_subscriptions[mapping_key]:
-                        if hasattr(subscription.widget, subscription.release_callback):
-                            callback = getattr(
-                                subscription.widget, subscription.release_callback
-                            )
-                            # 假设释放回调也返回布尔值
-                            if callback(mapping_key):
-                                released_any = True
+                mapping = table.get(frozenset(mapping_key.keys))
+                if mapping is not None:
+                    for subscription in mapping.subscriptions:
+                        callback = subscription.on_released
+                        # 假设释放回调也返回布尔值
+                        if callback is not None and callback(mapping_key):
+                            released_any = True
 
                 del self._triggered_mappings[mapping_key]
         return released_any
@@ -307,6 +397,7 @@ class KeyMappingManager:
         self._key_subscriptions.clear()
         self._pressed_keys.clear()
         self._triggered_mappings.clear()
+        self.invalidate()
 
 
 # 全局实例
@@ -7,11 +7,12 @@
 import threading
 from dataclasses import dataclass
 from enum import Enum
+from typing import cast
 
 import gi
 
 gi.require_version("Gdk", "4.0")
-from gi.repository import Gdk
+from gi.repository import Gdk, GObject
 
 
 class KeyType(Enum):
@@ -151,12 +152,16 @@ class KeyRegistry:
 
         # 处理可打印字符
         if 32 <= keyval <= 126:
-            char = chr(keyval).upper()
-            return Key(char, keyval, KeyType.CHARACTER)
-
-        # 处理未知按键
-        key_name = Gdk.keyval_name(keyval) or f"Key{keyval}"
-        return Key(key_name, keyval, KeyType.SPECIAL)
+            key = Key(chr(keyval).upper(), keyval, KeyType.CHARACTER)
+        else:
+            # 处理未知按键
+            key_name = Gdk.keyval_name(keyval) or f"Key{keyval}"
+            key = Key(key_name, keyval, KeyType.SPECIAL)
+
+        # 缓存动态创建的按键，之后同一 keyval 直接命中注册表
+        # 只按 keyval 缓存，不写入名称索引，避免覆盖标准按键的名称
+        self._keys[keyval] = key
+        return key
 
     def create_mouse_key(self, button: int) -> Key:
         """创建鼠标按键"""
@@ -190,6 +195,64 @@ class KeyRegistry:
             cls._initialized = False
 
 
+class PhysicalKeyCache:
+    """物理按键缓存 - (keycode, group) -> 不受修饰键影响的标准 keyval
+
+    键盘布局变化时自动失效，窗口和编辑器共享同一份缓存
+    """
+
+    def __init__(self):
+        self._cache: dict[tuple[int, int], int] = {}
+        self._display: Gdk.Display | None = None
+        self._keyboard: Gdk.Device | None = None
+        self._handler_ids: list[int] = []
+
+    def lookup(self, display: Gdk.Display, keycode: int, group: int = 0) -> int:
+        """获取物理按键的标准 keyval，失败返回 0"""
+        cache_key = (keycode, group)
+        keyval = self._cache.get(cache_key)
+        if keyval is not None:
+            return keyval
+
+        if display is not self._display:
+            self._watch_display(display)
+
+        success, keyval, _, _, _ = display.translate_key(
+            keycode=keycode, state=Gdk.ModifierType(0), group=group
+        )
+        if not success:
+            return 0
+
+        keyval = Gdk.keyval_to_upper(keyval)
+        self._cache[cache_key] = keyval
+        return keyval
+
+    def invalidate(self, *args: object) -> None:
+        """清空缓存"""
+        self._cache.clear()
+
+    def _watch_display(self, display: Gdk.Display) -> None:
+        """监听键盘布局变化，变化时清空缓存"""
+        if self._keyboard is not None:
+            for handler_id in self._handler_ids:
+                self._keyboard.disconnect(handler_id)
+        self._handler_ids.clear()
+        self._cache.clear()
+
+        self._display = display
+        seat = display.get_default_seat()
+        self._keyboard = seat.get_keyboard() if seat else None
+        if self._keyboard is None:
+            return
+
+        keyboard = cast(GObject.Object, self._keyboard)
+        self._handler_ids = [
+            keyboard.connect("changed", self.invalidate),
+            keyboard.connect("notify::layout-names", self.invalidate),
+            keyboard.connect("notify::active-layout-index", self.invalidate),
+        ]
+
+
 @dataclass(frozen=True)
 class KeyCombination:
     """按键组合 - 不可变、可哈希、可排序"""
@@ -267,6 +330,9 @@ class KeyCombination:
 # 全局按键注册表
 key_registry = KeyRegistry()
 
+# 全局物理按键缓存
+physical_key_cache = PhysicalKeyCache()
+
 
 def parse_key_combination(text: str) -> KeyCombination | None:
     """解析按键组合字符串"""
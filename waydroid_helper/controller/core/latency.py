@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+输入延迟追踪
+从输入事件的硬件时间戳开始，经过处理链、组件、ControlMsg.pack，直到写入传输层，
+按事件类型统计各阶段的延迟分布
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import NamedTuple, TypedDict
+
+from waydroid_helper.util.log import logger
+
+# 各阶段名称，按先后顺序
+STAGES: tuple[str, ...] = ("dispatch", "emit", "pack", "write")
+
+# 时间戳与当前时间相差超过该值（秒）时认为不在同一时钟上，改用当前时间作为起点
+_MAX_EVENT_AGE = 10.0
+
+
+class LatencyTrace(NamedTuple):
+    """一次输入事件的追踪信息"""
+
+    event_type: str
+    origin: float  # 输入发生的时间（time.monotonic()）
+    dispatch: float  # 窗口开始处理的时间
+
+
+class MessageStamp(NamedTuple):
+    """一条控制消息在各阶段的时间戳"""
+
+    trace: LatencyTrace
+    emit: float  # 组件发出 CONTROL_MSG 的时间
+    pack: float  # 打包完成的时间
+
+
+class LatencyStats(TypedDict):
+    """单个阶段的延迟统计（毫秒）"""
+
+    count: int
+    p50: float
+    p95: float
+    p99: float
+
+
+class _TraceScope:
+    """一次追踪的作用域，退出后失效"""
+
+    __slots__ = ("trace", "active")
+
+    def __init__(self, trace: LatencyTrace):
+        self.trace: LatencyTrace = trace
+        self.active: bool = True
+
+
+# 当前正在处理的输入事件；处理期间创建的 asyncio 任务会继承同一个作用域对象，
+# 作用域退出后这些任务稍后发出的消息不再计入该事件
+_current_scope: ContextVar[_TraceScope | None] = ContextVar(
+    "latency_trace", default=None
+)
+
+
+class LatencyTracer:
+    """输入延迟追踪器"""
+
+    def __init__(self, capacity: int = 4096):
+        self.enabled: bool = False
+        self._capacity: int = capacity
+        # (event_type, stage) -> 最近的延迟样本（毫秒）
+        self._samples: dict[tuple[str, str], deque[float]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def trace(
+        self, event_type: str, event_time_ms: int | None = None
+    ) -> Iterator[None]:
+        """追踪一次输入事件的处理，event_time_ms 为 Gdk.Event.get_time() 的值"""
+        if not self.enabled:
+            yield
+            return
+
+        now = time.monotonic()
+        origin = now
+        if event_time_ms:
+            # Gdk 事件时间是 32 位毫秒计数，与 CLOCK_MONOTONIC 同源，需处理回绕
+            age = ((int(now * 1000) - event_time_ms) & 0xFFFFFFFF) / 1000
+            if age < _MAX_EVENT_AGE:
+                origin = now - age
+
+        with self._scope(LatencyTrace(event_type, origin, now)):
+            yield
+
+    @contextmanager
+    def trace_us(self, event_type: str, utime: int) -> Iterator[None]:
+        """追踪带微秒时间戳（如 Wayland 相对指针的 utime）的输入事件"""
+        if not self.enabled:
+            yield
+            return
+
+        now = time.monotonic()
+        origin = utime / 1_000_000
+        if not 0 <= now - origin < _MAX_EVENT_AGE:
+            origin = now
+
+        with self._scope(LatencyTrace(event_type, origin, now)):
+            yield
+
+    @staticmethod
+    @contextmanager
+    def _scope(trace: LatencyTrace) -> Iterator[None]:
+        """在作用域内将 trace 设为当前输入事件，只统计同步发出的消息"""
+        scope = _TraceScope(trace)
+        token = _current_scope.set(scope)
+        try:
+            yield
+        finally:
+            scope.active = False
+            _current_scope.reset(token)
+
+    def current(self) -> LatencyTrace | None:
+        """获取当前正在追踪的输入事件，供稍后输出的消息通过 resume() 继续计入"""
+        scope = _current_scope.get()
+        if scope is None or not scope.active:
+            return None
+        return scope.trace
+
+    @contextmanager
+    def resume(self, trace: LatencyTrace | None) -> Iterator[None]:
+        """重新进入之前由 current() 保存的追踪，trace 为 None 时不追踪"""
+        if trace is None or not self.enabled:
+            yield
+            return
+
+        with self._scope(trace):
+            yield
+
+    def stamp(self, emit: float, pack: float) -> MessageStamp | None:
+        """为当前输入事件产生的控制消息生成时间戳，不在追踪中时返回 None"""
+        scope = _current_scope.get()
+        if scope is None or not scope.active:
+            return None
+        return MessageStamp(scope.trace, emit, pack)
+
+    def record(self, stamp: MessageStamp, write: float) -> None:
+        """记录一条控制消息写入传输层时各阶段的延迟"""
+        trace = stamp.trace
+        stage_times = (trace.dispatch, stamp.emit, stamp.pack, write)
+        with self._lock:
+            for stage, stage_time in zip(STAGES, stage_times):
+                key = (trace.event_type, stage)
+                samples = self._samples.get(key)
+                if samples is None:
+                    samples = self._samples[key] = deque(maxlen=self._capacity)
+                samples.append((stage_time - trace.origin) * 1000)
+
+    def get_stats(self) -> dict[str, dict[str, LatencyStats]]:
+        """按事件类型和阶段获取延迟统计，各阶段延迟均从输入发生时算起"""
+        with self._lock:
+            snapshot = {key: sorted(samples) for key, samples in self._samples.items()}
+
+        stats: dict[str, dict[str, LatencyStats]] = {}
+        for (event_type, stage), samples in snapshot.items():
+            if not samples:
+                continue
+            stats.setdefault(event_type, {})[stage] = {
+                "count": len(samples),
+                "p50": _percentile(samples, 0.50),
+                "p95": _percentile(samples, 0.95),
+                "p99": _percentile(samples, 0.99),
+            }
+        return stats
+
+    def log_report(self) -> None:
+        """将延迟统计输出到日志"""
+        for event_type, stages in sorted(self.get_stats().items()):
+            for stage in STAGES:
+                s = stages.get(stage)
+                if s is None:
+                    continue
+                logger.info(
+                    f"Latency {event_type}/{stage}: n={s['count']} "
+                    f"p50={s['p50']:.2f}ms p95={s['p95']:.2f}ms p99={s['p99']:.2f}ms"
+                )
+
+    def clear(self) -> None:
+        """清空统计数据"""
+        with self._lock:
+            self._samples.clear()
+
+
+def _percentile(sorted_samples: list[float], q: float) -> float:
+    """最近秩法计算分位数，输入必须已排序"""
+    rank = math.ceil(q * len(sorted_samples))
+    return sorted_samples[max(0, rank - 1)]
+
+
+# 全局延迟追踪器实例
+latency_tracer = LatencyTracer()
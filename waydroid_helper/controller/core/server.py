@@ -1,9 +1,17 @@
 import asyncio
 import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 
-from waydroid_helper.controller.core.control_msg import ControlMsg
+from waydroid_helper.controller.core.control_msg import (ControlMsg,
+                                                         InjectTouchEventMsg,
+                                                         PackedMsg)
 from waydroid_helper.controller.core.event_bus import (Event, EventType,
                                                        event_bus)
+from waydroid_helper.controller.core.latency import (MessageStamp,
+                                                     latency_tracer)
+from waydroid_helper.controller.core.utils import pointer_id_manager
 from waydroid_helper.util.log import logger
 
 
@@ -32,7 +40,13 @@ class Server:
 
             self.host: str = host
             self.port: int = port
-            self.message_queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+            self.message_queue: asyncio.Queue[
+                tuple[bytes, tuple[MessageStamp, ...]] | None
+            ] = asyncio.Queue()
+            # 批量发送作用域的嵌套深度，以及作用域内暂存的消息和时间戳
+            self._batch_depth: int = 0
+            self._batch_msgs: list[bytes] = []
+            self._batch_stamps: list[MessageStamp] = []
             event_bus.subscribe(EventType.CONTROL_MSG, self.send_msg, subscriber=self)
             self.server: asyncio.Server | None = None
             self.writers: list[asyncio.StreamWriter] = []
@@ -51,10 +65,15 @@ class Server:
 
         try:
             while True:
-                message = await self.message_queue.get()
-                if not message:
+                item = await self.message_queue.get()
+                if not item:
                     break
+                message, stamps = item
                 writer.write(message)
+                if stamps:
+                    write_time = time.monotonic()
+                    for stamp in stamps:
+                        latency_tracer.record(stamp, write_time)
         finally:
             logger.info(f"Closing the connection to {addr!r}")
             self.writers.remove(writer)
@@ -106,15 +125,38 @@ class Server:
                 pass
         logger.info("Server closed.")
 
-    def send(self, msg: bytes):
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """批量发送作用域：作用域内产生的控制消息在退出时合并为一次写入，
+        使同一输入事件触发的多个触摸点落在同一输入帧中"""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._batch_msgs:
+                msgs, self._batch_msgs = self._batch_msgs, []
+                stamps, self._batch_stamps = self._batch_stamps, []
+                self._enqueue((b"".join(msgs), tuple(stamps)))
+
+    def send(self, msg: bytes, stamp: MessageStamp | None = None):
+        """发送已打包的消息，处于批量发送作用域中时先暂存"""
+        if self._batch_depth:
+            self._batch_msgs.append(msg)
+            if stamp is not None:
+                self._batch_stamps.append(stamp)
+            return
+        self._enqueue((msg, (stamp,) if stamp is not None else ()))
+
+    def _enqueue(self, item: tuple[bytes, tuple[MessageStamp, ...]]):
         """优化版本：直接使用 put_nowait，避免额外的函数调用开销"""
         try:
-            self.message_queue.put_nowait(msg)
+            self.message_queue.put_nowait(item)
         except asyncio.QueueFull:
             # 如果队列满了，丢弃最旧的消息以避免阻塞
             try:
                 self.message_queue.get_nowait()
-                self.message_queue.put_nowait(msg)
+                self.message_queue.put_nowait(item)
             except asyncio.QueueEmpty:
                 pass
 
@@ -124,10 +166,19 @@ class Server:
         # 只在需要时才调用 debug 日志（检查日志级别）
         if logger.isEnabledFor(10):  # DEBUG level = 10
             logger.debug("Send: %s", msg)
+        if type(msg) is InjectTouchEventMsg:
+            pointer_id_manager.track(msg)
+        elif type(msg) is PackedMsg and msg.touch is not None:
+            pointer_id_manager.track_touch(*msg.touch)
+
+        if not latency_tracer.enabled:
+            # 优化后的 pack() 方法总是返回 bytes，无需检查 None
+            self.send(msg.pack())
+            return
 
-        # 优化后的 pack() 方法总是返回 bytes，无需检查 None
+        emit_time = time.monotonic()
         packed_msg: bytes = msg.pack()
-        self.send(packed_msg)
+        self.send(packed_msg, latency_tracer.stamp(emit_time, time.monotonic()))
 
     @classmethod
     def reset_singleton(cls) -> None:
@@ -147,3 +198,16 @@ class Server:
 
 # if __name__ == '__main__':
 #     task = asyncio.run(main())
+
+
+@contextmanager
+def message_batch() -> Iterator[None]:
+    """服务器的批量发送作用域，供帧时钟 / 定时器回调中发送消息的代码使用；
+    服务器尚未创建时不做任何处理"""
+    server = Server._instance
+    if server is None or not Server._initialized:
+        yield
+        return
+
+    with server.batch():
+        yield
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+基于截止时间的定频调度
+以 time.monotonic() 计算每次执行的绝对截止时间，单次迟到不会累积到后续执行中
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import NamedTuple
+
+
+async def sleep_until(deadline: float) -> None:
+    """休眠到 time.monotonic() 的绝对时间 deadline
+
+    主循环定时器约有 1 毫秒的误差，截止时间是绝对的，误差不会累积到后续步骤
+    """
+    remaining = deadline - time.monotonic()
+    if remaining > 0:
+        await asyncio.sleep(remaining)
+
+
+class RateStats(NamedTuple):
+    """定频调度的执行统计"""
+
+    target_rate: float  # 目标频率（Hz）
+    achieved_rate: float  # 实际频率（Hz）
+    ticks: int  # 已执行次数
+    max_lateness: float  # 相对截止时间的最大延迟（秒）
+    resyncs: int  # 落后过多而放弃追赶的次数
+
+
+class DeadlineScheduler:
+    """按绝对截止时间以固定频率执行异步回调"""
+
+    def __init__(self, rate: float, max_backlog: int = 2):
+        self.rate: float = rate
+        self.interval: float = 1.0 / rate
+        # 落后超过该数量的周期时不再追赶，从当前时间重新计时，避免连续突发
+        self.max_backlog: int = max_backlog
+
+        self._start_time: float = 0.0
+        self._last_tick_time: float = 0.0
+        self._ticks: int = 0
+        self._max_lateness: float = 0.0
+        self._resyncs: int = 0
+
+    async def run(
+        self, callback: Callable[[], Awaitable[None]], count: int | None = None
+    ) -> None:
+        """执行 count 次回调（None 表示直到任务被取消），第一次立即执行"""
+        self._start_time = time.monotonic()
+        self._last_tick_time = self._start_time
+        self._ticks = 0
+        self._max_lateness = 0.0
+        self._resyncs = 0
+
+        deadline = self._start_time
+        while count is None or self._ticks < count:
+            now = time.monotonic()
+            if deadline > now:
+                await asyncio.sleep(deadline - now)
+                now = time.monotonic()
+            self._max_lateness = max(self._max_lateness, now - deadline)
+
+            await callback()
+            self._ticks += 1
+            self._last_tick_time = now
+
+            deadline += self.interval
+            now = time.monotonic()
+            if now - deadline > self.max_backlog * self.interval:
+                deadline = now
+                self._resyncs += 1
+
+    def get_stats(self) -> RateStats:
+        """获取最近一次运行的统计"""
+        elapsed = self._last_tick_time - self._start_time
+        achieved = (self._ticks - 1) / elapsed if self._ticks > 1 and elapsed > 0 else 0.0
+        return RateStats(
+            target_rate=self.rate,
+            achieved_rate=achieved,
+            ticks=self._ticks,
+            max_lateness=self._max_lateness,
+            resyncs=self._resyncs,
+        )
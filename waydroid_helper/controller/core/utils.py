@@ -5,10 +5,19 @@
 
 from __future__ import annotations
 
+import asyncio
 import random
 import threading
+import weakref
 from typing import TYPE_CHECKING, Any, TypedDict
 
+from waydroid_helper.controller.android import (AMotionEventAction,
+                                                AMotionEventButtons)
+from waydroid_helper.controller.core.control_msg import InjectTouchEventMsg
+from waydroid_helper.controller.core.event_bus import (Event, EventType,
+                                                       event_bus)
+from waydroid_helper.util.log import logger
+
 if TYPE_CHECKING:
     pass
 
@@ -44,16 +53,60 @@ def is_point_in_rect(
     )
 
 
+class CursorTracker:
+    """光标位置服务 - 由窗口更新，组件在需要时直接读取最新的光标位置和窗口尺寸"""
+
+    __slots__ = ("x", "y", "root_width", "root_height")
+
+    def __init__(self):
+        self.x: int = 0
+        self.y: int = 0
+        self.root_width: int = 0
+        self.root_height: int = 0
+
+    @property
+    def position(self) -> tuple[int, int]:
+        """最新的光标位置"""
+        return self.x, self.y
+
+    @property
+    def root_size(self) -> tuple[int, int]:
+        """最新的窗口尺寸"""
+        return self.root_width, self.root_height
+
+    def update_position(self, x: float, y: float) -> None:
+        """更新光标位置"""
+        self.x = int(x)
+        self.y = int(y)
+
+    def update_root_size(self, width: int, height: int) -> None:
+        """更新窗口尺寸"""
+        self.root_width = width
+        self.root_height = height
+
+
 class PointerIdManagerStatus(TypedDict):
     """PointerIdManager 状态（用于调试）"""
 
     available_ids: list[int]
     allocated_count: int
     allocated_ids: dict[int, int]
+    failed_allocations: int
+    auto_released: int
+
+
+# pointer_id 范围是 1-10
+MIN_POINTER_ID = 1
+MAX_POINTER_ID = 10
+_FULL_MASK = ((1 << (MAX_POINTER_ID + 1)) - 1) & ~((1 << MIN_POINTER_ID) - 1)
 
 
 class PointerIdManager:
-    """Pointer ID 管理器 - 管理 widget 的 pointer_id 分配和释放（严格单例模式）"""
+    """Pointer ID 管理器 - 管理 widget 的 pointer_id 分配和释放（严格单例模式）
+
+    空闲 ID 保存在位掩码中，总是分配最小的空闲 ID；
+    对持有者只保留弱引用，持有者被回收时自动发送 UP 并释放其 ID
+    """
 
     _instance: "PointerIdManager | None" = None
     _lock = threading.Lock()
@@ -75,56 +128,129 @@ class PointerIdManager:
             if PointerIdManager._initialized:
                 return
 
-            # pointer_id 范围是 1-10
-            self._available_ids: set[int] = set(range(1, 11))
-            self._allocated_ids: dict[Any, int] = {}  # widget_id -> pointer_id
+            self._free_mask: int = _FULL_MASK
+            # 持有者键 -> (pointer_id, 持有者弱引用)
+            # 可弱引用的持有者以 id() 为键；不可弱引用的持有者（如宏的触摸点元组）直接作为键
+            self._allocated: dict[Any, tuple[int, weakref.ref[Any] | None]] = {}
+            # pointer_id -> 最近一次发送的触摸位置，用于自动释放时发送 UP
+            self._last_positions: dict[int, tuple[int, int, int, int]] = {}
+            self._failed_allocations: int = 0
+            self._auto_released: int = 0
 
             PointerIdManager._initialized = True
 
-    def allocate(self, widget:Any) -> int | None:
+    @staticmethod
+    def _key(owner: Any) -> Any:
+        # 类型的 __weakrefoffset__ 非 0 即可弱引用，无需每次创建弱引用来检测
+        if type(owner).__weakrefoffset__:
+            return id(owner)
+        return owner
+
+    def allocate(self, widget: Any) -> int | None:
         """为 widget 分配一个 pointer_id"""
-        # widget_id = id(widget)
-        widget_id = widget
+        key = self._key(widget)
 
         # 如果该 widget 已经有分配的 pointer_id，直接返回
-        if widget_id in self._allocated_ids:
-            return self._allocated_ids[widget_id]
-
-        # 分配新的 pointer_id
-        if not self._available_ids:
+        entry = self._allocated.get(key)
+        if entry is not None:
+            return entry[0]
+
+        # 分配最小的空闲 pointer_id
+        free = self._free_mask
+        if not free:
+            self._failed_allocations += 1
+            logger.warning(
+                f"No free pointer_id for {widget} "
+                f"(failed allocations: {self._failed_allocations})"
+            )
             return None
 
-        pointer_id = self._available_ids.pop()
-        self._allocated_ids[widget_id] = pointer_id
+        pointer_id = (free & -free).bit_length() - 1
+        self._free_mask = free & ~(1 << pointer_id)
 
+        ref = None
+        if key is not widget:
+            ref = weakref.ref(
+                widget, lambda _ref, key=key: self._on_owner_collected(key)
+            )
+        self._allocated[key] = (pointer_id, ref)
         return pointer_id
 
     def release(self, widget: Any) -> bool:
         """释放 widget 的 pointer_id"""
-        # widget_id = id(widget)
-        widget_id = widget
-
-        if widget_id not in self._allocated_ids:
+        entry = self._allocated.pop(self._key(widget), None)
+        if entry is None:
             return False
-
-        pointer_id = self._allocated_ids.pop(widget_id)
-        self._available_ids.add(pointer_id)
-
-
+        self._free(entry[0])
         return True
 
     def get_allocated_id(self, widget: Any) -> int | None:
         """获取 widget 当前分配的 pointer_id"""
-        # widget_id = id(widget)
-        widget_id = widget
-        return self._allocated_ids.get(widget_id)
+        entry = self._allocated.get(self._key(widget))
+        return entry[0] if entry is not None else None
+
+    def track(self, msg: InjectTouchEventMsg) -> None:
+        """记录触摸消息的位置，由服务器在发送前调用"""
+        self.track_touch(msg.action, msg.pointer_id, msg.position)
+
+    def track_touch(
+        self, action: int, pointer_id: int, position: tuple[int, int, int, int]
+    ) -> None:
+        """记录触摸位置，用于预先打包的触摸消息"""
+        if action == AMotionEventAction.UP:
+            self._last_positions.pop(pointer_id, None)
+        else:
+            self._last_positions[pointer_id] = position
+
+    def _free(self, pointer_id: int) -> None:
+        self._free_mask |= 1 << pointer_id
+        self._last_positions.pop(pointer_id, None)
+
+    def _on_owner_collected(self, key: Any) -> None:
+        """持有者在未释放 pointer_id 时被回收"""
+        entry = self._allocated.pop(key, None)
+        if entry is None:
+            return
+        pointer_id = entry[0]
+        self._auto_released += 1
+        logger.warning(f"pointer_id {pointer_id} leaked by a collected owner, releasing")
+
+        # 回调可能发生在任意代码中途的垃圾回收里，UP 和释放推迟到事件循环中进行；
+        # 在此之前 ID 不会回到空闲池，避免 UP 抬起新分配的触摸点
+        try:
+            asyncio.get_running_loop().call_soon(self._release_collected, pointer_id)
+        except RuntimeError:
+            self._release_collected(pointer_id)
+
+    def _release_collected(self, pointer_id: int) -> None:
+        position = self._last_positions.get(pointer_id)
+        if position is not None:
+            msg = InjectTouchEventMsg(
+                action=AMotionEventAction.UP,
+                pointer_id=pointer_id,
+                position=position,
+                pressure=0.0,
+                action_button=AMotionEventButtons.PRIMARY,
+                buttons=0,
+            )
+            event_bus.emit(Event(EventType.CONTROL_MSG, self, msg))
+        self._free(pointer_id)
 
     def get_status(self) -> PointerIdManagerStatus:
         """获取当前分配状态（用于调试）"""
         return {
-            "available_ids": sorted(self._available_ids),
-            "allocated_count": len(self._allocated_ids),
-            "allocated_ids": dict(self._allocated_ids),
+            "available_ids": [
+                i
+                for i in range(MIN_POINTER_ID, MAX_POINTER_ID + 1)
+                if self._free_mask & (1 << i)
+            ],
+            "allocated_count": len(self._allocated),
+            "allocated_ids": {
+                key if isinstance(key, int) else id(key): pointer_id
+                for key, (pointer_id, _) in self._allocated.items()
+            },
+            "failed_allocations": self._failed_allocations,
+            "auto_released": self._auto_released,
         }
 
     @classmethod
@@ -133,11 +259,15 @@ class PointerIdManager:
         with cls._lock:
             if cls._instance is not None:
                 # 清理所有分配的 pointer_id
-                cls._instance._available_ids = set(range(1, 11))
-                cls._instance._allocated_ids.clear()
+                cls._instance._free_mask = _FULL_MASK
+                cls._instance._allocated.clear()
+                cls._instance._last_positions.clear()
             cls._instance = None
             cls._initialized = False
 
 
 # 全局 pointer_id 管理器实例
 pointer_id_manager = PointerIdManager()
+
+# 全局光标位置服务实例
+cursor_tracker = CursorTracker()
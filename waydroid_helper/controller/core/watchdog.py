@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+主循环卡顿监视器
+后台线程定期向 GLib 主循环投递回调，回调超时未执行时抓取主线程的 Python 调用栈
+"""
+
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib
+
+from waydroid_helper.util.log import logger
+
+
+@dataclass(frozen=True)
+class StallRecord:
+    """一次主循环卡顿记录"""
+
+    timestamp: float  # 卡顿开始的时间（time.time()）
+    duration: float  # 卡顿时长（秒）
+    stack: str  # 超过阈值时主线程的调用栈
+
+
+class MainLoopWatchdog:
+    """主循环卡顿监视器"""
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        threshold: float = 0.2,
+        capacity: int = 50,
+    ):
+        self.interval: float = interval  # 两次探测之间的间隔（秒）
+        self.threshold: float = threshold  # 超过该时长视为卡顿（秒）
+        self._records: deque[StallRecord] = deque(maxlen=capacity)
+        self._records_lock = threading.Lock()
+
+        self._main_thread_id: int | None = None
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._pong_event = threading.Event()
+        self._pong_time: float = 0.0
+
+    def start(self) -> None:
+        """启动监视线程，必须在主线程调用"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._main_thread_id = threading.get_ident()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="main-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止监视线程"""
+        self._stop_event.set()
+        # 唤醒可能正在等待回调的线程
+        self._pong_event.set()
+        self._thread = None
+
+    def get_stalls(self) -> list[StallRecord]:
+        """获取最近记录的卡顿（按时间顺序）"""
+        with self._records_lock:
+            return list(self._records)
+
+    def clear(self) -> None:
+        """清空卡顿记录"""
+        with self._records_lock:
+            self._records.clear()
+
+    def _on_ping(self) -> bool:
+        """主循环中执行的探测回调"""
+        self._pong_time = time.monotonic()
+        self._pong_event.set()
+        return GLib.SOURCE_REMOVE
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self._pong_event.clear()
+            ping_time = time.monotonic()
+            ping_wall_time = time.time()
+            GLib.idle_add(self._on_ping, priority=GLib.PRIORITY_HIGH)
+
+            if not self._pong_event.wait(self.threshold):
+                # 主循环超过阈值未响应，立即抓取主线程调用栈
+                stack = self._capture_main_stack()
+                # 等待主循环恢复，以得到完整的卡顿时长
+                self._pong_event.wait()
+                if self._stop_event.is_set():
+                    break
+                self._record(
+                    StallRecord(
+                        timestamp=ping_wall_time,
+                        duration=self._pong_time - ping_time,
+                        stack=stack,
+                    )
+                )
+
+            self._stop_event.wait(self.interval)
+
+    def _capture_main_stack(self) -> str:
+        """抓取主线程当前的 Python 调用栈"""
+        if self._main_thread_id is None:
+            return ""
+        frame = sys._current_frames().get(self._main_thread_id)
+        if frame is None:
+            return ""
+        return "".join(traceback.format_stack(frame))
+
+    def _record(self, record: StallRecord) -> None:
+        with self._records_lock:
+            self._records.append(record)
+        logger.warning(
+            f"Main loop stalled for {record.duration * 1000:.0f} ms, "
+            f"main thread stack:\n{record.stack}"
+        )
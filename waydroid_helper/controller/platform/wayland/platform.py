@@ -16,6 +16,7 @@ from pywayland.protocol.relative_pointer_unstable_v1 import \
 from pywayland.protocol.wayland import WlCompositor, WlSeat, WlSurface
 
 from ..base import PlatformBase
+from waydroid_helper.controller.core.latency import latency_tracer
 from waydroid_helper.util.log import logger
 
 # 加载libgtk-4.so.1
@@ -112,7 +113,8 @@ class PointerConstraint(GObject.Object):
         dx_unaccel,
         dy_unaccel,
     ):
-        self.emit("relative-motion", dx, dy, dx_unaccel, dy_unaccel)
+        with latency_tracer.trace_us("relative_motion", (utime_hi << 32) | utime_lo):
+            self.emit("relative-motion", dx, dy, dx_unaccel, dy_unaccel)
 
     def lock_pointer(self):
         try:
@@ -2,6 +2,7 @@
 基础组件模块
 """
 
-from .base_widget import BaseWidget
+from .base_widget import BaseWidget, MappingHint
+from .text_renderer import text_renderer
 
-__all__ = ['BaseWidget'] 
\ No newline at end of file
+__all__ = ['BaseWidget', 'MappingHint', 'text_renderer'] 
\ No newline at end of file
@@ -7,8 +7,10 @@
 from __future__ import annotations
 
 import math
-from typing import TYPE_CHECKING, Any, Callable, TypedDict, cast
+import sys
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, TypedDict, cast
 
+import cairo
 import gi
 
 from waydroid_helper.controller.core.utils import pointer_id_manager
@@ -16,17 +18,25 @@ from waydroid_helper.controller.core.utils import pointer_id_manager
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 gi.require_version("Gdk", "4.0")
+gi.require_version("Graphene", "1.0")
 
-from gi.repository import Gdk, GObject, Gtk
+from gi.repository import Gdk, GLib, GObject, Graphene, Gtk
 
 from waydroid_helper.controller.core import (Event, EventType, KeyCombination,
                                              event_bus)
+from waydroid_helper.controller.widgets.base.text_renderer import text_renderer
 from waydroid_helper.controller.widgets.config import ConfigManager
 
 if TYPE_CHECKING:
     from cairo import Context, Surface
     from waydroid_helper.controller.widgets.config import ConfigItem
-from cairo import FontSlant, FontWeight
+
+# cairo ARGB32 按本机字节序存储预乘的像素
+_CAIRO_MEMORY_FORMAT = (
+    Gdk.MemoryFormat.B8G8R8A8_PREMULTIPLIED
+    if sys.byteorder == "little"
+    else Gdk.MemoryFormat.A8R8G8B8_PREMULTIPLIED
+)
 
 class EditableRegion(TypedDict):
     """可编辑区域类型定义"""
@@ -38,6 +48,16 @@ class EditableRegion(TypedDict):
     set_keys: Callable[[set[KeyCombination]], None]
 
 
+class MappingHint(NamedTuple):
+    """映射模式下组件提示的绘制记录，glyph 为映射模式静态内容（含按键标签）的纹理"""
+
+    x: float
+    y: float
+    width: int
+    height: int
+    glyph: Gdk.Texture
+
+
 class BaseWidget(Gtk.DrawingArea):
     """基础可拖动调整大小组件"""
 
@@ -111,17 +131,42 @@ class BaseWidget(Gtk.DrawingArea):
         self.delete_button_hovered = False
         self.settings_button_hovered = False
 
-        # 设置绘制函数
-        self.set_draw_func(self.draw_func, None)
+        # 静态内容缓存: (缓存键, 纹理)，绘制用的表面在纹理创建后即释放
+        self._static_cache: tuple[tuple[Any, ...], Gdk.Texture] | None = None
 
         # 添加事件控制器
         self.setup_event_controllers()
 
-        # 配置管理器
-        self.config_manager = ConfigManager()
+        # 配置管理器，首次使用时创建；创建前注册的回调暂存于此，创建时再交给管理器
+        self._config_manager: ConfigManager | None = None
+        self._pending_config_callbacks: list[Callable[[ConfigManager], None]] | None = None
+
+    @classmethod
+    def create_config_items(cls) -> list["ConfigItem"]:
+        """创建配置项定义 - 子类可以覆盖，每个组件类只调用一次"""
+        return []
+
+    @classmethod
+    def get_config_definitions(cls) -> dict[str, "ConfigItem"]:
+        """获取该组件类共享的配置项定义"""
+        definitions = cls.__dict__.get("_config_definitions")
+        if definitions is None:
+            definitions = {item.key: item for item in cls.create_config_items()}
+            cls._config_definitions = definitions
+        return definitions
+
+    @property
+    def config_manager(self) -> ConfigManager:
+        """配置管理器"""
+        if self._config_manager is None:
+            self._config_manager = ConfigManager(type(self).get_config_definitions())
+            pending, self._pending_config_callbacks = self._pending_config_callbacks, None
+            for register in pending or ():
+                register(self._config_manager)
+        return self._config_manager
 
     def add_config_item(self, config_item: "ConfigItem") -> None:
-        """添加配置项"""
+        """添加该实例独有的配置项"""
         self.config_manager.add_config(config_item)
 
     def get_config_manager(self) -> ConfigManager:
@@ -134,11 +179,26 @@ class BaseWidget(Gtk.DrawingArea):
 
     def get_config_value(self, key: str) -> Any:
         """获取配置值"""
-        return self.config_manager.get_value(key)
+        if self._config_manager is None:
+            config = type(self).get_config_definitions().get(key)
+            return config.value if config is not None else None
+        return self._config_manager.get_value(key)
 
     def add_config_change_callback(self, key: str, callback: Callable[[str, Any, bool], None]) -> None:
-        """添加配置变更回调"""
-        self.config_manager.add_change_callback(key, callback)
+        """添加配置变更回调，配置管理器尚未创建时不会因此创建"""
+        self._register_config_callback(lambda manager: manager.add_change_callback(key, callback))
+
+    def add_config_confirm_callback(self, callback: Callable[[ConfigManager], None]) -> None:
+        """添加配置确认回调，配置管理器尚未创建时不会因此创建"""
+        self._register_config_callback(lambda manager: manager.add_confirm_callback(callback))
+
+    def _register_config_callback(self, register: Callable[[ConfigManager], None]) -> None:
+        if self._config_manager is not None:
+            register(self._config_manager)
+        elif self._pending_config_callbacks is None:
+            self._pending_config_callbacks = [register]
+        else:
+            self._pending_config_callbacks.append(register)
 
     @property
     def mapping_start_x(self)->float:
@@ -219,8 +279,56 @@ class BaseWidget(Gtk.DrawingArea):
         # 清除widget级别的指针设置，让窗口级别的指针生效
         self.set_cursor(None)
 
-    def draw_func(self, widget:Gtk.DrawingArea, cr:'Context[Surface]', width:int, height:int, user_data:Any):
-        """基础绘制函数 - 调用子类的具体绘制方法"""
+    def do_snapshot(self, snapshot: Gtk.Snapshot) -> None:
+        """快照渲染 - 静态内容作为纹理节点，只在缓存失效时上传；
+        动态内容由子类生成渲染节点，装饰器的绘制退回 cairo"""
+        width, height = self.get_width(), self.get_height()
+        if width <= 0 or height <= 0:
+            return
+
+        bounds = Graphene.Rect().init(0, 0, width, height)
+        snapshot.append_texture(self._get_static_texture(width, height), bounds)
+        self.snapshot_dynamic_content(snapshot, width, height)
+
+        # 装饰器（调整大小手柄、编辑边框）只在选中时绘制内容
+        decorator_draws = getattr(self, "_decorator_draws", None)
+        if decorator_draws and self.is_selected:
+            cr = snapshot.append_cairo(bounds)
+            for draw in decorator_draws:
+                draw(cr, width, height)
+
+    def _get_static_texture(self, width: int, height: int) -> Gdk.Texture:
+        """获取静态内容的缓存纹理，状态变化时重新绘制"""
+        scale = self.get_scale_factor()
+        key = (
+            width,
+            height,
+            scale,
+            self.mapping_mode,
+            self.is_selected,
+            self.delete_button_hovered,
+            self.settings_button_hovered,
+            self.title,
+            self.text,
+            self.get_render_state(),
+        )
+        if self._static_cache is None or self._static_cache[0] != key:
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width * scale, height * scale)
+            surface.set_device_scale(scale, scale)
+            self.draw_static_content(cairo.Context(surface), width, height)
+            surface.flush()
+            texture = Gdk.MemoryTexture.new(
+                surface.get_width(),
+                surface.get_height(),
+                _CAIRO_MEMORY_FORMAT,
+                GLib.Bytes.new(bytes(surface.get_data())),
+                surface.get_stride(),
+            )
+            self._static_cache = (key, texture)
+        return self._static_cache[1]
+
+    def draw_static_content(self, cr:'Context[Surface]', width:int, height:int)->None:
+        """绘制静态内容 - 调用子类的具体绘制方法，结果会被缓存"""
         if self.mapping_mode:
             # 映射模式下的精简绘制
             self.draw_mapping_mode(cr, width, height)
@@ -230,6 +338,36 @@ class BaseWidget(Gtk.DrawingArea):
             self.draw_text_content(cr, width, height)
             self.draw_selection_indicators(cr, width, height)
 
+    def draw_dynamic_content(self, cr:'Context[Surface]', width:int, height:int)->None:
+        """绘制随动画变化的内容，不进入缓存 - 子类可以重写此方法"""
+
+    def snapshot_dynamic_content(self, snapshot: Gtk.Snapshot, width: int, height: int) -> None:
+        """以渲染节点绘制动态内容 - 子类可以重写此方法，默认退回 cairo 绘制"""
+        if type(self).draw_dynamic_content is BaseWidget.draw_dynamic_content:
+            return
+        cr = snapshot.append_cairo(Graphene.Rect().init(0, 0, width, height))
+        self.draw_dynamic_content(cr, width, height)
+
+    def get_render_state(self) -> tuple[Any, ...]:
+        """除尺寸、模式、选中状态和文本外，影响静态内容的其他状态 - 子类可以重写此方法"""
+        return ()
+
+    def invalidate_static_cache(self) -> None:
+        """丢弃静态内容缓存并重绘"""
+        self._static_cache = None
+        self.queue_draw()
+
+    def get_mapping_hint(self) -> MappingHint:
+        """获取映射模式下的提示记录，供窗口覆盖层统一绘制 - 需已处于映射模式"""
+        width, height = int(self.MAPPING_MODE_WIDTH), int(self.MAPPING_MODE_HEIGHT)
+        return MappingHint(
+            self.mapping_start_x,
+            self.mapping_start_y,
+            width,
+            height,
+            self._get_static_texture(width, height),
+        )
+
     def draw_widget_content(self, cr:'Context[Surface]', width:int, height:int)->None:
         """绘制widget的具体内容 - 子类应重写此方法"""
         # 默认绘制一个简单的矩形背景
@@ -242,13 +380,7 @@ class BaseWidget(Gtk.DrawingArea):
         elif hasattr(self, "title") and self.title and self.title != "组件":
             # 如果没有text但有标题，绘制标题
             cr.set_source_rgba(0, 0, 0, 1)
-            cr.select_font_face("Arial", FontSlant.NORMAL, FontWeight.BOLD)
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.title)
-            x = (width - text_extents.width) / 2
-            y = (height + text_extents.height) / 2
-            cr.move_to(x, y)
-            cr.show_text(self.title)
+            text_renderer.draw_label(cr, self.title, width / 2, height / 2)
 
     def draw_selection_indicators(self, cr:'Context[Surface]', width:int, height:int):
         """绘制选择状态指示器"""
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+文本渲染服务
+基于 Pango 的共享文本渲染，缓存排版好的布局和测量结果，
+同一标签只在第一次绘制时排版，之后的重绘直接复用
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, NamedTuple
+
+import cairo
+import gi
+
+gi.require_version("Pango", "1.0")
+gi.require_version("PangoCairo", "1.0")
+
+from gi.repository import Pango, PangoCairo
+
+if TYPE_CHECKING:
+    from cairo import Context, Surface
+
+DEFAULT_FONT_FAMILY = "Arial"
+
+
+class TextExtents(NamedTuple):
+    """文本的墨迹范围（与 cairo text_extents 的 x_bearing/y_bearing/width/height 含义一致）"""
+
+    x_bearing: float
+    y_bearing: float
+    width: float
+    height: float
+
+
+class _CachedLayout(NamedTuple):
+    layout: Pango.Layout
+    extents: TextExtents
+
+
+class TextRenderer:
+    """共享的文本渲染器，按 (文本, 字体, 字号, 粗细) 缓存 Pango 布局"""
+
+    def __init__(self, capacity: int = 512):
+        self._capacity: int = capacity
+        self._cache: OrderedDict[tuple[str, str, float, bool], _CachedLayout] = (
+            OrderedDict()
+        )
+        self._context: Pango.Context | None = None
+
+    def _get_context(self) -> Pango.Context:
+        """共享的 Pango 上下文，关闭度量提示，使排版结果与缩放倍数无关"""
+        if self._context is None:
+            context = PangoCairo.FontMap.get_default().create_context()
+            options = cairo.FontOptions()
+            options.set_hint_metrics(cairo.HINT_METRICS_OFF)
+            PangoCairo.context_set_font_options(context, options)
+            self._context = context
+        return self._context
+
+    def _get(
+        self, text: str, size: float, bold: bool, family: str
+    ) -> _CachedLayout:
+        key = (text, family, size, bold)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        font = Pango.FontDescription()
+        font.set_family(family)
+        font.set_weight(Pango.Weight.BOLD if bold else Pango.Weight.NORMAL)
+        font.set_absolute_size(size * Pango.SCALE)
+
+        layout = Pango.Layout.new(self._get_context())
+        layout.set_font_description(font)
+        layout.set_text(text, -1)
+
+        # 墨迹范围相对布局原点，换算为相对基线起点，与 cairo text_extents 一致
+        ink, _ = layout.get_extents()
+        baseline = layout.get_baseline()
+        extents = TextExtents(
+            ink.x / Pango.SCALE,
+            (ink.y - baseline) / Pango.SCALE,
+            ink.width / Pango.SCALE,
+            ink.height / Pango.SCALE,
+        )
+
+        cached = self._cache[key] = _CachedLayout(layout, extents)
+        if len(self._cache) > self._capacity:
+            self._cache.popitem(last=False)
+        return cached
+
+    def measure(
+        self,
+        text: str,
+        size: float = 12,
+        bold: bool = True,
+        family: str = DEFAULT_FONT_FAMILY,
+    ) -> TextExtents:
+        """测量文本的墨迹范围"""
+        return self._get(text, size, bold, family).extents
+
+    def draw_label(
+        self,
+        cr: "Context[Surface]",
+        text: str,
+        center_x: float,
+        center_y: float,
+        size: float = 12,
+        bold: bool = True,
+        family: str = DEFAULT_FONT_FAMILY,
+    ) -> TextExtents:
+        """以当前源颜色绘制文本，墨迹范围居中于 (center_x, center_y)"""
+        layout, extents = self._get(text, size, bold, family)
+        baseline = layout.get_baseline() / Pango.SCALE
+        cr.move_to(
+            center_x - extents.x_bearing - extents.width / 2,
+            center_y - extents.y_bearing - extents.height / 2 - baseline,
+        )
+        PangoCairo.show_layout(cr, layout)
+        cr.new_path()
+        return extents
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._cache.clear()
+
+
+# 全局文本渲染器实例
+text_renderer = TextRenderer()
@@ -2,21 +2,35 @@ from __future__ import annotations
 
 import asyncio
 import math
+import time
 from enum import Enum
 from gettext import pgettext
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any, TypedDict, cast
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib
 
 from waydroid_helper.controller.android.input import (AMotionEventAction,
                                                       AMotionEventButtons)
 from waydroid_helper.controller.core import (Event, EventType, KeyCombination,
-                                             event_bus, is_point_in_rect,
+                                             cursor_tracker, event_bus,
+                                             is_point_in_rect, message_batch,
                                              pointer_id_manager)
+from waydroid_helper.controller.core.constants import AIM_OUTPUT_RATE
 from waydroid_helper.controller.core.control_msg import InjectTouchEventMsg
+from waydroid_helper.controller.core.latency import (LatencyTrace,
+                                                     latency_tracer)
 from waydroid_helper.controller.platform import get_platform
 from waydroid_helper.controller.widgets import BaseWidget
-from waydroid_helper.controller.widgets.config import create_slider_config
+from waydroid_helper.controller.widgets.base.text_renderer import text_renderer
+from waydroid_helper.controller.widgets.config import (ConfigItem,
+                                                       create_dropdown_config,
+                                                       create_slider_config)
 from waydroid_helper.controller.widgets.decorators import (Editable, Resizable,
                                                            ResizableDecorator)
+from waydroid_helper.util.log import logger
 
 if TYPE_CHECKING:
     from cairo import Context, Surface
@@ -35,6 +49,20 @@ class AimState(Enum):
     MOVING = "moving"       # 移动状态
 
 
+class RecenterMode(Enum):
+    """越界后重新居中的方式"""
+    HANDOFF = "handoff"     # 另一根手指先在中心按下，再抬起原来的手指
+    RELEASE = "release"     # 抬起后等待一段时间再在中心按下
+
+
+class RecenterStats(TypedDict):
+    """重新居中耗时统计（毫秒）"""
+
+    count: int
+    mean_ms: float
+    max_ms: float
+
+
 @Editable
 @Resizable(resize_strategy=ResizableDecorator.RESIZE_SYMMETRIC)
 class Aim(BaseWidget):
@@ -52,6 +80,9 @@ class Aim(BaseWidget):
     CIRCLE_SIZE = 50
     CIRCLE_RADIUS = 25
 
+    # RELEASE 方式下抬起后再次按下前的等待时间（毫秒）
+    RELEASE_RECENTER_DELAY = 50
+
     def __init__(
         self,
         x: int = 0,
@@ -73,21 +104,40 @@ class Aim(BaseWidget):
             min_height=150,
         )
 
-        # 状态管理
+        # 状态管理（只在主循环中读写，无需加锁）
         self._state: AimState = AimState.IDLE
-        self._state_lock = asyncio.Lock()
 
         # 平台相关
         self.platform: "PlatformBase | None" = None
 
-        # 位置跟踪
+        # 位置跟踪，使用浮点坐标保留亚像素余量
         self._current_pos: tuple[float, float] | None = None
+        # 最近一次发送的整数坐标，坐标不变时不重复发送 MOVE
+        self._sent_pos: tuple[int, int] | None = None
+
+        # 累计的相对移动增量，在帧时钟 / 定时器回调中统一输出
+        self._pending_dx: float = 0.0
+        self._pending_dy: float = 0.0
+        # 累计期间最早一次相对移动的延迟追踪，输出时重新进入
+        self._pending_trace: LatencyTrace | None = None
+        self.output_rate: int = AIM_OUTPUT_RATE
+        self._flush_id: int = 0
+        self._flush_is_tick: bool = False
+        # 越界后等待重新按下的定时器
+        self._recenter_id: int = 0
+
+        # 当前手指在 pointer_id_manager 中的持有者，重新居中时在两个持有者之间交替
+        self._pointer_owner: Any = self
+        self._spare_pointer_owner: tuple[Any, str] = (self, "recenter")
+
+        # 重新居中耗时统计（秒）：从越界到新手指在中心按下
+        self._recenter_started: float = 0.0
+        self.recenter_count: int = 0
+        self.recenter_time_total: float = 0.0
+        self.recenter_time_max: float = 0.0
 
         # 异步任务管理
         self._aim_task: asyncio.Task[None] | None = None
-        self._motion_task: asyncio.Task[None] | None = None
-        self._motion_queue: asyncio.Queue[tuple[float, float, float, float]] = asyncio.Queue()
-        self._motion_processor_running = False
 
         # 配置
         self.setup_config()
@@ -96,10 +146,11 @@ class Aim(BaseWidget):
         event_bus.subscribe(EventType.ENTER_STARING, self._handle_enter_staring, subscriber=self)
         event_bus.subscribe(EventType.EXIT_STARING, self._handle_exit_staring, subscriber=self)
 
-    def setup_config(self) -> None:
-        """设置配置项"""
+    @classmethod
+    def create_config_items(cls) -> list["ConfigItem"]:
+        """创建配置项定义"""
 
-        # 添加灵敏度配置
+        # 灵敏度配置
         sensitivity_config = create_slider_config(
             key="sensitivity",
             label=pgettext("Controller Widgets", "Sensitivity"),
@@ -113,7 +164,24 @@ class Aim(BaseWidget):
             ),
         )
 
-        self.add_config_item(sensitivity_config)
+        recenter_mode_config = create_dropdown_config(
+            key="recenter_mode",
+            label=pgettext("Controller Widgets", "Re-centering"),
+            options=[RecenterMode.HANDOFF.value, RecenterMode.RELEASE.value],
+            option_labels={
+                RecenterMode.HANDOFF.value: pgettext("Controller Widgets", "Seamless"),
+                RecenterMode.RELEASE.value: pgettext("Controller Widgets", "Release and press"),
+            },
+            value=RecenterMode.HANDOFF.value,
+            description=pgettext(
+                "Controller Widgets",
+                "How the aim touch returns to the center after leaving the area",
+            ),
+        )
+        return [sensitivity_config, recenter_mode_config]
+
+    def setup_config(self) -> None:
+        """设置配置项"""
         # 添加配置变更回调
         self.add_config_change_callback("sensitivity", self._on_sensitivity_changed)
 
@@ -121,116 +189,109 @@ class Aim(BaseWidget):
         """处理灵敏度配置变更"""
         pass
 
-    async def _set_state(self, new_state: AimState) -> None:
-        """安全地设置状态"""
-        async with self._state_lock:
-            if self._state != new_state:
-                old_state = self._state
-                self._state = new_state
-
-    async def _get_state(self) -> AimState:
-        """安全地获取状态"""
-        async with self._state_lock:
-            return self._state
-
     def _cancel_tasks(self) -> None:
-        """取消所有异步任务"""
+        """取消所有异步任务和定时器"""
         if self._aim_task and not self._aim_task.done():
             self._aim_task.cancel()
             self._aim_task = None
 
-        if self._motion_task and not self._motion_task.done():
-            self._motion_task.cancel()
-            self._motion_task = None
-
-        # 清空移动队列
-        while not self._motion_queue.empty():
-            try:
-                self._motion_queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
-
-        # 重置处理器状态
-        self._motion_processor_running = False
+        self._reset_motion()
+
+    def _reset_motion(self) -> None:
+        """取消待输出的移动并清空累计增量"""
+        self._cancel_flush()
+        if self._recenter_id:
+            GLib.source_remove(self._recenter_id)
+            self._recenter_id = 0
+        self._pending_dx = 0.0
+        self._pending_dy = 0.0
+        self._pending_trace = None
+
+    def set_output_rate(self, rate: int) -> None:
+        """设置 MOVE 的输出频率，0 表示跟随帧时钟，>0 为固定频率（Hz）"""
+        self._cancel_flush()
+        self.output_rate = rate
+        if self._pending_dx or self._pending_dy:
+            self._schedule_flush()
 
     def on_relative_pointer_motion(
         self, dx: float, dy: float, dx_unaccel: float, dy_unaccel: float
     ) -> None:
-        """处理相对鼠标移动事件 - 使用队列机制避免频繁取消任务"""
-        # 将移动事件放入队列
-        try:
-            self._motion_queue.put_nowait((dx, dy, dx_unaccel, dy_unaccel))
-        except asyncio.QueueFull:
-            # 队列满了，丢弃最旧的事件
-            try:
-                self._motion_queue.get_nowait()
-                self._motion_queue.put_nowait((dx, dy, dx_unaccel, dy_unaccel))
-            except asyncio.QueueEmpty:
-                pass
-
-        # 如果处理器没有运行，启动它
-        if not self._motion_processor_running:
-            self._motion_task = asyncio.create_task(self._motion_processor())
-
-    async def _motion_processor(self) -> None:
-        """异步处理鼠标移动事件的处理器"""
-        self._motion_processor_running = True
-        try:
-            while True:
-                # 等待队列中的移动事件
-                dx, dy, dx_unaccel, dy_unaccel = await self._motion_queue.get()
-
-                # 检查状态
-                current_state = await self._get_state()
-                if current_state != AimState.AIMING:
-                    # 清空队列并退出
-                    while not self._motion_queue.empty():
-                        try:
-                            self._motion_queue.get_nowait()
-                        except asyncio.QueueEmpty:
-                            break
-                    break
-
-                # 处理移动事件
-                await self._handle_single_motion(dx, dy, dx_unaccel, dy_unaccel)
-
-                # 标记任务完成
-                self._motion_queue.task_done()
-
-        except Exception:
-            pass
-        finally:
-            self._motion_processor_running = False
+        """处理相对鼠标移动事件 - 只累计增量，由帧时钟 / 定时器统一输出"""
+        if self._state != AimState.AIMING:
+            return
 
-    async def _handle_single_motion(
-        self, dx: float, dy: float, dx_unaccel: float, dy_unaccel: float
-    ) -> None:
-        """处理单个鼠标移动事件"""
-        try:
-            # 计算移动增量
-            sensitivity = self.get_config_value("sensitivity")
-            _dx = dx_unaccel * sensitivity / 50
-            _dy = dy_unaccel * sensitivity / 50
+        scale = self.get_config_value("sensitivity") / 50
+        self._pending_dx += dx_unaccel * scale
+        self._pending_dy += dy_unaccel * scale
+        if self._pending_trace is None:
+            self._pending_trace = latency_tracer.current()
+        self._schedule_flush()
 
-            # 获取根窗口尺寸
-            root = self.get_root()
-            if not root:
-                return
-            root = cast("Gtk.Window", root)
-            w, h = root.get_width(), root.get_height()
+    def _schedule_flush(self) -> None:
+        """安排一次输出，已安排时不重复"""
+        if self._flush_id:
+            return
+        if self.output_rate > 0:
+            interval = max(1, int(1000 / self.output_rate))
+            self._flush_id = GLib.timeout_add(interval, self._on_flush)
+            self._flush_is_tick = False
+        else:
+            self._flush_id = self.add_tick_callback(self._on_flush)
+            self._flush_is_tick = True
 
-            # 处理位置更新
-            await self._update_aim_position(_dx, _dy, w, h)
+    def _cancel_flush(self) -> None:
+        """取消已安排的输出"""
+        if not self._flush_id:
+            return
+        if self._flush_is_tick:
+            self.remove_tick_callback(self._flush_id)
+        else:
+            GLib.source_remove(self._flush_id)
+        self._flush_id = 0
+
+    def _on_flush(self, *args: Any) -> bool:
+        """帧时钟 / 定时器回调"""
+        self._flush_id = 0
+        self._flush_motion()
+        return GLib.SOURCE_REMOVE
+
+    def _flush_motion(self) -> None:
+        """输出累计的移动增量"""
+        # 等待重新按下期间继续累计，按下后再一并输出
+        if self._state != AimState.AIMING or self._recenter_id:
+            return
 
-        except Exception:
-            pass
+        dx, dy = self._pending_dx, self._pending_dy
+        if not dx and not dy:
+            return
+        self._pending_dx = 0.0
+        self._pending_dy = 0.0
+        trace, self._pending_trace = self._pending_trace, None
 
-    async def _update_aim_position(self, dx: float, dy: float, w: int, h: int) -> None:
+        w, h = self._get_root_size()
+        if not w or not h:
+            return
+        with latency_tracer.resume(trace), message_batch():
+            self._update_aim_position(dx, dy, w, h)
+
+    def _get_root_size(self) -> tuple[int, int]:
+        """获取根窗口尺寸"""
+        w, h = cursor_tracker.root_size
+        if w and h:
+            return w, h
+        root = self.get_root()
+        if not root:
+            return 0, 0
+        root = cast("Gtk.Window", root)
+        return root.get_width(), root.get_height()
+
+    def _update_aim_position(self, dx: float, dy: float, w: int, h: int) -> None:
         """更新瞄准位置"""
         # 如果没有当前位置，初始化为中心点
         if self._current_pos is None:
             self._current_pos = (float(self.center_x), float(self.center_y))
-            await self._send_touch_down(w, h)
+            self._send_touch_down(w, h)
 
         # 计算新位置
         new_x = self._current_pos[0] + dx
@@ -238,64 +299,147 @@ class Aim(BaseWidget):
 
         # 检查是否超出边界
         if not is_point_in_rect(new_x, new_y, self.x, self.y, self.width, self.height):
-            # 超出边界，发送UP事件并重置位置
-            await self._send_touch_up(w, h)
+            self._recenter_started = time.perf_counter()
+            if (
+                self.get_config_value("recenter_mode") == RecenterMode.HANDOFF.value
+                and self._recenter_handoff(dx, dy, w, h)
+            ):
+                return
+
+            # 超出边界，发送UP事件，稍后在中心重新按下，期间的移动继续累计
+            self._send_touch_up(w, h)
             self._current_pos = (float(self.center_x), float(self.center_y))
-            await asyncio.sleep(0.05)
-            await self._send_touch_down(w, h)
-            self._current_pos = (float(self.center_x)+dx, float(self.center_y)+dy)
-            await self._send_touch_move(w, h)
+            self._pending_dx += dx
+            self._pending_dy += dy
+            self._recenter_id = GLib.timeout_add(
+                self.RELEASE_RECENTER_DELAY, self._on_recenter_timeout
+            )
             return
 
         # 更新位置并发送MOVE事件
         self._current_pos = (new_x, new_y)
-        await self._send_touch_move(w, h)
+        self._send_touch_move(w, h)
+
+    def _recenter_handoff(self, dx: float, dy: float, w: int, h: int) -> bool:
+        """新手指先在中心按下，再抬起旧手指，视角控制不会中断
+
+        没有空闲的 pointer_id 时返回 False，由调用方改用抬起后重新按下的方式
+        """
+        old_owner = self._pointer_owner
+        new_owner = self._spare_pointer_owner if old_owner is self else self
+        if pointer_id_manager.allocate(new_owner) is None:
+            return False
+
+        old_pos = self._current_pos
+        self._pointer_owner = new_owner
+        self._current_pos = (float(self.center_x), float(self.center_y))
+        self._send_touch_down(w, h)
+        if old_pos is not None:
+            self._send_touch_up(w, h, old_pos[0], old_pos[1], owner=old_owner)
+        self._record_recenter()
+
+        # 新位置限制在瞄准区域内，超出的部分留到下一次输出
+        target_x = self._current_pos[0] + dx
+        target_y = self._current_pos[1] + dy
+        new_x = min(max(target_x, self.x), self.x + self.width)
+        new_y = min(max(target_y, self.y), self.y + self.height)
+        self._pending_dx += target_x - new_x
+        self._pending_dy += target_y - new_y
+        self._current_pos = (new_x, new_y)
+        self._send_touch_move(w, h)
+        if self._pending_dx or self._pending_dy:
+            self._schedule_flush()
+        return True
 
-    async def _send_touch_down(self, w: int, h: int) -> None:
+    def _on_recenter_timeout(self) -> bool:
+        """在中心重新按下，并输出等待期间累计的移动"""
+        self._recenter_id = 0
+        if self._state == AimState.AIMING and self._current_pos is not None:
+            w, h = self._get_root_size()
+            with message_batch():
+                self._send_touch_down(w, h)
+                self._record_recenter()
+                self._flush_motion()
+        return GLib.SOURCE_REMOVE
+
+    def _record_recenter(self) -> None:
+        """记录一次重新居中的耗时"""
+        elapsed = time.perf_counter() - self._recenter_started
+        self.recenter_count += 1
+        self.recenter_time_total += elapsed
+        self.recenter_time_max = max(self.recenter_time_max, elapsed)
+        logger.debug(f"Aim re-centered in {elapsed * 1000:.2f} ms")
+
+    def get_recenter_stats(self) -> RecenterStats:
+        """获取重新居中耗时统计"""
+        count = self.recenter_count
+        return {
+            "count": count,
+            "mean_ms": self.recenter_time_total / count * 1000 if count else 0.0,
+            "max_ms": self.recenter_time_max * 1000,
+        }
+
+    def _send_touch_down(self, w: int, h: int) -> None:
         """发送触摸按下事件"""
         if self._current_pos is None:
             return
 
-        pointer_id = pointer_id_manager.allocate(self)
+        pointer_id = pointer_id_manager.allocate(self._pointer_owner)
         if pointer_id is None:
             return
 
+        position = (int(self._current_pos[0]), int(self._current_pos[1]))
         msg = InjectTouchEventMsg(
             action=AMotionEventAction.DOWN,
             pointer_id=pointer_id,
-            position=(int(self._current_pos[0]), int(self._current_pos[1]), w, h),
+            position=(*position, w, h),
             pressure=1.0,
             action_button=AMotionEventButtons.PRIMARY,
             buttons=AMotionEventButtons.PRIMARY,
         )
         event_bus.emit(Event(EventType.CONTROL_MSG, self, msg))
+        self._sent_pos = position
 
-    async def _send_touch_move(self, w: int, h: int) -> None:
-        """发送触摸移动事件"""
+    def _send_touch_move(self, w: int, h: int) -> None:
+        """发送触摸移动事件，整数坐标未变化时不发送"""
         if self._current_pos is None:
             return
 
-        pointer_id = pointer_id_manager.get_allocated_id(self)
+        position = (int(self._current_pos[0]), int(self._current_pos[1]))
+        if position == self._sent_pos:
+            return
+
+        pointer_id = pointer_id_manager.get_allocated_id(self._pointer_owner)
         if pointer_id is None:
             return
 
         msg = InjectTouchEventMsg(
             action=AMotionEventAction.MOVE,
             pointer_id=pointer_id,
-            position=(int(self._current_pos[0]), int(self._current_pos[1]), w, h),
+            position=(*position, w, h),
             pressure=1.0,
             action_button=0,
             buttons=AMotionEventButtons.PRIMARY,
         )
         event_bus.emit(Event(EventType.CONTROL_MSG, self, msg))
+        self._sent_pos = position
 
-    async def _send_touch_up(self, w: int, h: int, x: float | None = None, y: float | None = None) -> None:
-        """发送触摸抬起事件"""
+    def _send_touch_up(
+        self,
+        w: int,
+        h: int,
+        x: float | None = None,
+        y: float | None = None,
+        owner: Any = None,
+    ) -> None:
+        """发送触摸抬起事件，owner 默认为当前手指"""
         # 使用提供的坐标或当前位置
         pos_x = x if x is not None else (self._current_pos[0] if self._current_pos else self.center_x)
         pos_y = y if y is not None else (self._current_pos[1] if self._current_pos else self.center_y)
 
-        pointer_id = pointer_id_manager.get_allocated_id(self)
+        if owner is None:
+            owner = self._pointer_owner
+        pointer_id = pointer_id_manager.get_allocated_id(owner)
         if pointer_id is None:
             return
 
@@ -308,7 +452,9 @@ class Aim(BaseWidget):
             buttons=0,
         )
         event_bus.emit(Event(EventType.CONTROL_MSG, self, msg))
-        pointer_id_manager.release(self)
+        pointer_id_manager.release(owner)
+        if owner is self._pointer_owner:
+            self._sent_pos = None
 
     def draw_widget_content(self, cr: "Context[Surface]", width: int, height: int):
         """绘制瞄准按钮的具体内容 - 中心50*50圆形区域"""
@@ -361,13 +507,7 @@ class Aim(BaseWidget):
             center_y = height / 2
 
             cr.set_source_rgba(1, 1, 1, 1)  # 白色文字
-            cr.select_font_face("Arial")
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
-            x = center_x - text_extents.width / 2
-            y = center_y + text_extents.height / 2
-            cr.move_to(x, y)
-            cr.show_text(self.text)
+            text_renderer.draw_label(cr, self.text, center_x, center_y, bold=False)
 
             # 清除路径，避免影响后续绘制
             cr.new_path()
@@ -416,18 +556,17 @@ class Aim(BaseWidget):
     async def _enter_aiming_state(self) -> None:
         """异步进入瞄准状态"""
         try:
-            current_state = await self._get_state()
-            if current_state != AimState.IDLE:
+            if self._state != AimState.IDLE:
                 return
 
-            await self._set_state(AimState.AIMING)
+            self._state = AimState.AIMING
 
             # 初始化平台
             if not self.platform:
                 self.platform = get_platform(self.get_root())
 
             if not self.platform:
-                await self._set_state(AimState.IDLE)
+                self._state = AimState.IDLE
                 return
 
             # 设置相对指针回调
@@ -444,36 +583,18 @@ class Aim(BaseWidget):
             event_bus.emit(Event(type=EventType.AIM_TRIGGERED, source=self, data=None))
 
         except Exception as e:
-            await self._set_state(AimState.IDLE)
+            self._state = AimState.IDLE
 
     async def _exit_aiming_state(self) -> None:
         """异步退出瞄准状态"""
         try:
-            current_state = await self._get_state()
-            if current_state == AimState.IDLE:
+            if self._state == AimState.IDLE:
                 return
 
-            await self._set_state(AimState.IDLE)
-
-            # 停止运动处理器 - 设置状态为IDLE后，处理器会自动退出
-            # 等待处理器完成当前正在处理的事件
-            if self._motion_task and not self._motion_task.done():
-                try:
-                    await asyncio.wait_for(self._motion_task, timeout=0.1)
-                except asyncio.TimeoutError:
-                    # 如果超时，强制取消
-                    self._motion_task.cancel()
-                    try:
-                        await self._motion_task
-                    except asyncio.CancelledError:
-                        pass
-
-            # 清空队列
-            while not self._motion_queue.empty():
-                try:
-                    self._motion_queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    break
+            self._state = AimState.IDLE
+
+            # 丢弃尚未输出的移动
+            self._reset_motion()
 
             # 解锁指针并恢复光标
             if self.platform:
@@ -488,7 +609,7 @@ class Aim(BaseWidget):
             if self._current_pos is not None:
                 if root:
                     w, h = root.get_width(), root.get_height()
-                    await self._send_touch_up(w, h)
+                    self._send_touch_up(w, h)
                 self._current_pos = None
 
             # 发送瞄准释放事件
@@ -518,9 +639,7 @@ class Aim(BaseWidget):
     async def _handle_key_triggered(self, used_key: str) -> None:
         """异步处理按键触发"""
         try:
-            current_state = await self._get_state()
-
-            if current_state == AimState.IDLE:
+            if self._state == AimState.IDLE:
                 # 进入瞄准状态
                 await self._enter_aiming_state()
             else:
@@ -548,8 +667,7 @@ class Aim(BaseWidget):
     async def _cleanup_async(self) -> None:
         """异步清理"""
         try:
-            current_state = await self._get_state()
-            if current_state != AimState.IDLE:
+            if self._state != AimState.IDLE:
                 await self._exit_aiming_state()
         except Exception:
             pass
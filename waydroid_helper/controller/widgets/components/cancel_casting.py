@@ -18,6 +18,7 @@ from waydroid_helper.controller.core import (Event, EventType, KeyCombination,
                                              event_bus, pointer_id_manager)
 from waydroid_helper.controller.core.handler.event_handlers import InputEvent
 from waydroid_helper.controller.widgets.base.base_widget import BaseWidget
+from waydroid_helper.controller.widgets.base.text_renderer import text_renderer
 from waydroid_helper.controller.widgets.decorators import Editable
 
 
@@ -123,15 +124,7 @@ class CancelCasting(BaseWidget):
             center_y = height / 2
 
             cr.set_source_rgba(1, 1, 1, 1)  # 白色文字
-            cr.select_font_face(
-                "Arial", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD
-            )
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
-            x = center_x - text_extents.width / 2
-            y = center_y + text_extents.height / 2
-            cr.move_to(x, y)
-            cr.show_text(self.text)
+            text_renderer.draw_label(cr, self.text, center_x, center_y)
 
             # 清除路径，避免影响后续绘制
             cr.new_path()
@@ -157,8 +150,7 @@ class CancelCasting(BaseWidget):
 
         # 计算文字尺寸
         if self.text:
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
+            text_extents = text_renderer.measure(self.text)
             text_width = text_extents.width
             text_height = text_extents.height
         else:
@@ -279,15 +271,7 @@ class CancelCasting(BaseWidget):
 
             # 使用白色文字以在红色背景上清晰显示
             cr.set_source_rgba(1, 1, 1, 1)  # 白色文字
-            cr.select_font_face(
-                "Arial", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD
-            )
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
-            x = center_x - text_extents.width / 2
-            y = center_y + text_extents.height / 2
-            cr.move_to(x, y)
-            cr.show_text(self.text)
+            text_renderer.draw_label(cr, self.text, center_x, center_y)
 
             # 清除路径，避免影响后续绘制
             cr.new_path()
@@ -6,11 +6,11 @@
 
 from __future__ import annotations
 
-import asyncio
+import itertools
 import math
 from enum import Enum
 from gettext import pgettext
-from typing import TYPE_CHECKING, Callable, TypedDict, cast
+from typing import TYPE_CHECKING, Any, Callable, TypedDict, cast
 
 from waydroid_helper.controller.core.handler.event_handlers import InputEvent
 
@@ -21,27 +21,31 @@ if TYPE_CHECKING:
 
 from waydroid_helper.controller.android.input import (AMotionEventAction,
                                                       AMotionEventButtons)
-from waydroid_helper.controller.core import KeyCombination, key_registry
+from waydroid_helper.controller.core import (KeyCombination,
+                                             animation_scheduler, key_registry)
 from waydroid_helper.controller.core.control_msg import InjectTouchEventMsg
 from waydroid_helper.controller.core.event_bus import (Event, EventType,
                                                        event_bus)
 from waydroid_helper.controller.core.utils import pointer_id_manager
 from waydroid_helper.controller.widgets import BaseWidget
-from waydroid_helper.controller.widgets.config import create_dropdown_config
+from waydroid_helper.controller.widgets.base.text_renderer import text_renderer
+from waydroid_helper.controller.widgets.config import (ConfigItem,
+                                                       create_dropdown_config)
 from waydroid_helper.controller.widgets.decorators import (Editable, Resizable,
                                                            ResizableDecorator)
-from waydroid_helper.util.task import Task
 
 
 class MovementMode(Enum):
     SMOOTH = "smooth"
     INSTANT = "instant"
 
-class MovementState(Enum):
-    """方向盘移动状态"""
-    IDLE = "idle"           # 空闲状态
-    MOVING = "moving"       # 正在移动
-    STOPPING = "stopping"   # 正在停止
+# 按下状态 (up, left, down, right)
+DirectionState = tuple[bool, bool, bool, bool]
+
+# 映射模式下摇杆红点的颜色和半径
+JOYSTICK_DOT_COLOR = (1.0, 0.2, 0.2, 0.9)
+JOYSTICK_DOT_RADIUS = 4
+
 
 class DirectionalPadEditableRegion(TypedDict):
     """可编辑区域信息"""
@@ -71,6 +75,23 @@ class DirectionalPad(BaseWidget):
     DIRECTIONS = ["up", "down", "left", "right"]
     DEFAULT_KEYS = {"up": "W", "down": "S", "left": "A", "right": "D"}
 
+    # 方向组合 (up, left, down, right) -> 目标点属性名，未列出的组合回到中心
+    TARGET_POINTS: dict[DirectionState, str] = {
+        (True, False, False, False): "top_with_factor",  # Up
+        (False, True, False, False): "left_with_factor",  # Left
+        (False, False, True, False): "bottom_with_factor",  # Down
+        (False, False, False, True): "right_with_factor",  # Right
+        (True, True, False, False): "top_left_with_factor",
+        (True, False, False, True): "top_right_with_factor",
+        (False, True, True, False): "bottom_left_with_factor",
+        (False, False, True, True): "bottom_right_with_factor",
+        # 3-key combos resolve to the middle key's axis
+        (True, True, True, False): "left_with_factor",
+        (True, True, False, True): "top_with_factor",
+        (True, False, True, True): "right_with_factor",
+        (False, True, True, True): "bottom_with_factor",
+    }
+
     def __init__(
         self,
         x: int = 0,
@@ -120,39 +141,21 @@ class DirectionalPad(BaseWidget):
         }
 
         self._joystick_active: bool = False  # 摇杆是否已离开中心
+        self._indicator_shown: bool = False  # 指示层上是否显示了摇杆红点
 
         self._current_position: tuple[float, float] = (x + width / 2, y + height / 2)
 
-        # region 异步移动系统
-        self._movement_state: MovementState = MovementState.IDLE
-        self._state_lock = asyncio.Lock()
-        self._movement_task: asyncio.Task[None] | None = None
-        self._task_manager = Task()
-
-        # 移动参数
+        # 移动参数，平滑移动由 animation_scheduler 统一推进
         self._move_interval: float = 0.02  # 20ms in seconds
         self._move_steps_total: int = 6
         self._target_position: tuple[float, float] = self._current_position
 
-        self._target_points_map: dict[
-            tuple[bool, bool, bool, bool], Callable[[], tuple[float, float]]
-        ] = {
-            (True, False, False, False): lambda: self.top_with_factor,  # Up
-            (False, True, False, False): lambda: self.left_with_factor,  # Left
-            (False, False, True, False): lambda: self.bottom_with_factor,  # Down
-            (False, False, False, True): lambda: self.right_with_factor,  # Right
-            (True, True, False, False): lambda: self.top_left_with_factor,
-            (True, False, False, True): lambda: self.top_right_with_factor,
-            (False, True, True, False): lambda: self.bottom_left_with_factor,
-            (False, False, True, True): lambda: self.bottom_right_with_factor,
-            # 3-key combos resolve to the middle key's axis
-            (True, True, True, False): lambda: self.left_with_factor,
-            (True, True, False, True): lambda: self.top_with_factor,
-            (True, False, True, True): lambda: self.right_with_factor,
-            (False, True, True, True): lambda: self.bottom_with_factor,
-            # 4-key combo returns to center
-            (True, True, True, True): lambda: self.center,
-        }
+        # 方向组合 -> 目标位置，几何或滑动半径变化后在下次查询时重新计算
+        self._target_table: dict[DirectionState, tuple[float, float]] = {}
+        self._target_table_key: tuple[float, ...] | None = None
+
+        # 最近一次发送的整数坐标，未变化时不重复发送 MOVE
+        self._sent_position: tuple[int, int] | None = None
 
         # 初始化编辑区域字典
         self.edit_regions: dict[str, DirectionalPadEditableRegion] = {}
@@ -161,6 +164,14 @@ class DirectionalPad(BaseWidget):
 
         # 移动模式设置
         # self._movement_mode: MovementMode = MovementMode.SMOOTH
+        self.add_config_change_callback("movement_mode", lambda key, value, restoring: self.set_movement_mode(value))
+        self.swipehold_radius_factor = 1
+
+        event_bus.subscribe(EventType.SWIPEHOLD_RADIUS, self.on_swipehold_radius_changed, subscriber=self)
+
+    @classmethod
+    def create_config_items(cls) -> list[ConfigItem]:
+        """创建配置项定义"""
         movement_mode_config = create_dropdown_config(
             key="movement_mode",
             label=pgettext("Controller Widgets", "Operating Method"),
@@ -172,11 +183,7 @@ class DirectionalPad(BaseWidget):
             value=MovementMode.SMOOTH.value,
             description=pgettext("Controller Widgets", "Adjusts the operating method of the directional pad")
         )
-        self.add_config_item(movement_mode_config)
-        self.add_config_change_callback("movement_mode", lambda key, value, restoring: self.set_movement_mode(value))
-        self.swipehold_radius_factor = 1
-
-        event_bus.subscribe(EventType.SWIPEHOLD_RADIUS, self.on_swipehold_radius_changed, subscriber=self)
+        return [movement_mode_config]
     
     def on_swipehold_radius_changed(self, event: Event[float]):
         """滑动半径系数设置"""
@@ -199,109 +206,69 @@ class DirectionalPad(BaseWidget):
         # self._movement_mode = MovementMode(mode)
 
     def __del__(self):
-        """清理异步任务"""
-        self._cancel_movement_task()
-
-    def _cancel_movement_task(self) -> None:
-        """取消当前的移动任务"""
-        if self._movement_task and not self._movement_task.done():
-            self._movement_task.cancel()
-            self._movement_task = None
-
-    async def _get_movement_state(self) -> MovementState:
-        """获取当前移动状态"""
-        async with self._state_lock:
-            return self._movement_state
-
-    async def _set_movement_state(self, state: MovementState) -> None:
-        """设置移动状态"""
-        async with self._state_lock:
-            self._movement_state = state
+        """取消移动动画"""
+        self._cancel_movement()
+
+    def _cancel_movement(self) -> None:
+        """取消当前的平滑移动"""
+        animation_scheduler.cancel(self)
+
+    def _get_target_table(self) -> dict[DirectionState, tuple[float, float]]:
+        """获取方向组合到目标位置的表，几何或滑动半径变化时重新计算"""
+        key = (self.x, self.y, self.width, self.height, self.swipehold_radius_factor)
+        if key != self._target_table_key:
+            center = self.center
+            table = {
+                cast(DirectionState, state): center
+                for state in itertools.product((False, True), repeat=4)
+            }
+            for state, name in self.TARGET_POINTS.items():
+                table[state] = getattr(self, name)
+            self._target_table = table
+            self._target_table_key = key
+        return self._target_table
 
     def _get_target_position(self) -> tuple[float, float]:
         """根据当前按键状态获取目标位置"""
-        key_state = tuple(
-            self.pressed_directions[d] for d in ["up", "left", "down", "right"]
-        )
-        key_state = cast(tuple[bool, bool, bool, bool], key_state)
-        return self._target_points_map.get(key_state, lambda: self.center)()
+        pressed = self.pressed_directions
+        key_state = (pressed["up"], pressed["left"], pressed["down"], pressed["right"])
+        return self._get_target_table()[key_state]
 
     def _move_to(self, target: tuple[float, float], smooth: bool = False):
-        """统一的移动入口点 - 创建异步任务"""
+        """统一的移动入口点"""
         self._target_position = target
 
-        # 取消现有的移动任务
-        self._cancel_movement_task()
+        # 取消正在进行的平滑移动
+        self._cancel_movement()
 
         # 根据移动模式决定是否使用平滑移动
         use_smooth = smooth and self.get_config_value("movement_mode") == MovementMode.SMOOTH.value
 
-        if use_smooth:
-            # 创建平滑移动任务
-            self._movement_task = self._task_manager.create_task(
-                self._smooth_move_to(target)
+        if use_smooth and target != self._current_position:
+            animation_scheduler.animate(
+                self,
+                self._current_position,
+                target,
+                self._move_interval * self._move_steps_total,
+                self._on_move_step,
             )
         else:
-            # 创建瞬间移动任务
-            self._movement_task = self._task_manager.create_task(
-                self._instant_move_to(target)
-            )
-
-    async def _instant_move_to(self, target: tuple[float, float]) -> None:
-        """瞬间移动到目标位置"""
-        try:
-            await self._set_movement_state(MovementState.MOVING)
-            self._current_position = target
-            self.queue_draw()
-            if self._joystick_active:
-                self._emit_touch_event(AMotionEventAction.MOVE)
-        except Exception:
-            pass
-        finally:
-            await self._set_movement_state(MovementState.IDLE)
-
-    async def _smooth_move_to(self, target: tuple[float, float]) -> None:
-        """平滑移动到目标位置"""
-        try:
-            await self._set_movement_state(MovementState.MOVING)
-
-            start_position = self._current_position
-            move_steps_count = 0
-
-            while move_steps_count < self._move_steps_total:
-                # 检查是否被取消
-                current_state = await self._get_movement_state()
-                if current_state == MovementState.STOPPING:
-                    break
-
-                # 计算当前步骤的位置
-                progress = (move_steps_count + 1) / self._move_steps_total
-                dx = target[0] - start_position[0]
-                dy = target[1] - start_position[1]
-
-                self._current_position = (
-                    start_position[0] + dx * progress,
-                    start_position[1] + dy * progress,
-                )
-
-                if self._joystick_active:
-                    self._emit_touch_event(AMotionEventAction.MOVE)
-                self.queue_draw()
-
-                move_steps_count += 1
-
-                # 等待下一帧
-                if move_steps_count < self._move_steps_total:
-                    await asyncio.sleep(self._move_interval)
-
-            # 确保到达最终位置
-            self._current_position = target
-            self.queue_draw()
+            self._on_move_step(target)
+
+    def _on_move_step(self, position: tuple[float, float]) -> None:
+        """更新摇杆位置，由动画调度器每帧调用，位置未变化时不发送也不重绘"""
+        target = self._target_position
+        if (int(position[0]), int(position[1])) == (int(target[0]), int(target[1])):
+            # 已到达目标，提前结束插值
+            position = target
+            self._cancel_movement()
+        if position == self._current_position:
+            return
 
-        except Exception:
-            pass
-        finally:
-            await self._set_movement_state(MovementState.IDLE)
+        self._current_position = position
+        self._update_indicator()
+        if self._joystick_active:
+            self._emit_touch_event(AMotionEventAction.MOVE)
 
     def _set_default_keys(self):
         """为未设置的方向设置默认按键"""
@@ -464,22 +431,16 @@ class DirectionalPad(BaseWidget):
             key_text = str(key) if key else ""
 
             cr.set_source_rgba(1, 1, 1, 1)  # 白色文字
-            cr.select_font_face("Arial", 0, 1)
 
             # 根据按键长度调整字体大小
             if len(key_text) <= 1:
-                cr.set_font_size(14)
+                font_size = 14
             elif len(key_text) <= 3:
-                cr.set_font_size(10)
+                font_size = 10
             else:
-                cr.set_font_size(8)
+                font_size = 8
 
-            text_extents = cr.text_extents(key_text)
-            text_x = x - text_extents.width / 2
-            text_y = y + text_extents.height / 2
-            cr.move_to(text_x, text_y)
-            cr.show_text(key_text)
-            cr.new_path()  # 清除路径
+            text_renderer.draw_label(cr, key_text, x, y, size=font_size)
 
     def draw_text_content(self, cr: "Context[Surface]", width: int, height: int):
         """重写文本绘制 - 显示按键映射信息"""
@@ -535,25 +496,23 @@ class DirectionalPad(BaseWidget):
             key_text = str(key) if key else "?"
 
             cr.set_source_rgba(1, 1, 1, 0.9)  # 白色文字
-            cr.select_font_face("Arial", 0, 1)
 
             # 根据按键长度调整字体大小
             if len(key_text) <= 1:
-                cr.set_font_size(10)  # 映射模式下稍小的字体
+                font_size = 10  # 映射模式下稍小的字体
             elif len(key_text) <= 3:
-                cr.set_font_size(8)
+                font_size = 8
             else:
-                cr.set_font_size(6)
+                font_size = 6
 
-            text_extents = cr.text_extents(key_text)
-            text_x = x - text_extents.width / 2
-            text_y = y + text_extents.height / 2
-            cr.move_to(text_x, text_y)
-            cr.show_text(key_text)
-            cr.new_path()  # 清除路径
+            text_renderer.draw_label(cr, key_text, x, y, size=font_size)
 
-        if self._joystick_active:
-            self._draw_joystick_dot(cr, width, height)
+    def get_render_state(self) -> tuple[Any, ...]:
+        """方向按键和按下状态会影响方向按钮的绘制（映射模式下不显示按下状态）"""
+        keys = tuple(str(self.direction_keys[d]) for d in self.DIRECTIONS)
+        if self.mapping_mode:
+            return (keys,)
+        return (keys, tuple(self.pressed_directions[d] for d in self.DIRECTIONS))
 
     def get_direction_from_key(self, key_combination: KeyCombination) -> str | None:
         """根据按键组合获取对应的方向"""
@@ -566,6 +525,9 @@ class DirectionalPad(BaseWidget):
         self, action: AMotionEventAction, position: tuple[float, float] | None = None
     ):
         pos = position if position is not None else self._current_position
+        int_pos = (int(pos[0]), int(pos[1]))
+        if action == AMotionEventAction.MOVE and int_pos == self._sent_position:
+            return
         root = self.get_root()
         if not root:
             return
@@ -580,12 +542,13 @@ class DirectionalPad(BaseWidget):
         msg = InjectTouchEventMsg(
             action=action,
             pointer_id=pointer_id,
-            position=(int(pos[0]), int(pos[1]), w, h),
+            position=(*int_pos, w, h),
             pressure=pressure,
             action_button=AMotionEventButtons.PRIMARY,
             buttons=buttons,
         )
         event_bus.emit(Event(EventType.CONTROL_MSG, self, msg))
+        self._sent_position = None if action == AMotionEventAction.UP else int_pos
 
     def on_key_triggered(self, key_combination: KeyCombination | None = None, event: "InputEvent | None" = None) -> bool:
         """当映射的按键被触发时的行为 - 根据按键确定方向"""
@@ -604,7 +567,8 @@ class DirectionalPad(BaseWidget):
                 self._current_position = self.center
                 self._emit_touch_event(AMotionEventAction.DOWN, position=self.center)
                 self._move_to(target, smooth=True)
-            else:
+            elif target != self._target_position:
+                # 只有方向实际变化时才移动
                 self._move_to(target, smooth=False)
 
 
@@ -626,23 +590,26 @@ class DirectionalPad(BaseWidget):
             if not any(self.pressed_directions.values()):
                 # 所有键释放: 停用摇杆，瞬移回中心
                 self._joystick_active = False
-                self._cancel_movement_task()
+                self._cancel_movement()
                 self._emit_touch_event(AMotionEventAction.UP)
                 pointer_id_manager.release(self)
                 self._move_to(self.center, smooth=False)
+                self._update_indicator()
             else:
-                # 还有其他键按下: 更新目标位置并瞬移
-                self._move_to(self._get_target_position(), smooth=False)
+                # 还有其他键按下: 方向变化时更新目标位置并瞬移
+                target = self._get_target_position()
+                if target != self._target_position:
+                    self._move_to(target, smooth=False)
             # 这里可以调用具体的方向处理方法
             self.on_direction_released(direction, key_combination)
             return True
         else:
             return False
 
-    def _draw_joystick_dot(
-        self, cr: "Context[Surface]", map_width: int, map_height: int
-    ):
-        """在映射模式下绘制代表摇杆位置的红点"""
+    def _get_joystick_dot_position(
+        self, map_width: int, map_height: int
+    ) -> tuple[float, float]:
+        """计算映射模式下代表摇杆位置的红点坐标"""
         # 1. 计算摇杆相对于其编辑模式中心的归一化偏移
         edit_center_x, edit_center_y = self.center
         offset_x = self._current_position[0] - edit_center_x
@@ -656,13 +623,28 @@ class DirectionalPad(BaseWidget):
 
         # 2. 将归一化偏移应用到映射模式的尺寸上
         map_center_x, map_center_y = map_width / 2, map_height / 2
-        draw_x = map_center_x + norm_x * (map_width / 2)
-        draw_y = map_center_y + norm_y * (map_height / 2)
+        return (
+            map_center_x + norm_x * (map_width / 2),
+            map_center_y + norm_y * (map_height / 2),
+        )
 
-        # 3. 绘制红点
-        cr.set_source_rgba(1.0, 0.2, 0.2, 0.9)
-        cr.arc(draw_x, draw_y, 4, 0, 2 * math.pi)
-        cr.fill()
+    def _update_indicator(self) -> None:
+        """更新映射模式下代表摇杆位置的红点，红点由窗口的指示层绘制，不重绘组件本身"""
+        if self.mapping_mode and self._joystick_active:
+            dot_x, dot_y = self._get_joystick_dot_position(
+                self.MAPPING_MODE_WIDTH, self.MAPPING_MODE_HEIGHT
+            )
+            data = {
+                "position": (self.mapping_start_x + dot_x, self.mapping_start_y + dot_y),
+                "radius": JOYSTICK_DOT_RADIUS,
+                "color": JOYSTICK_DOT_COLOR,
+            }
+        elif self._indicator_shown:
+            data = None
+        else:
+            return
+        self._indicator_shown = data is not None
+        event_bus.emit(Event(EventType.INDICATOR_UPDATE, self, data))
 
     def on_direction_triggered(self, direction: str, key_combination: KeyCombination):
         """方向被触发时的具体处理 - 子类可以重写此方法"""
@@ -786,8 +768,10 @@ class DirectionalPad(BaseWidget):
 
     def on_delete(self):
         """清理资源"""
-        # 取消异步任务
-        self._cancel_movement_task()
+        # 取消移动动画
+        self._cancel_movement()
+        self._joystick_active = False
+        self._update_indicator()
         # 取消事件订阅
         event_bus.unsubscribe_by_subscriber(self)
         return super().on_delete()
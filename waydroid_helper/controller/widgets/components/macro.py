@@ -6,12 +6,16 @@
 
 import asyncio
 import math
+import time
 from abc import ABC, abstractmethod
 from gettext import pgettext
 from typing import TYPE_CHECKING, NamedTuple, cast
 
 from waydroid_helper.controller.android import AMotionEventAction, AMotionEventButtons
-from waydroid_helper.controller.core.control_msg import InjectTouchEventMsg
+from waydroid_helper.controller.core.control_msg import (ControlMsg,
+                                                         InjectTouchEventMsg,
+                                                         PackedMsg, ScreenInfo)
+from waydroid_helper.controller.core.timing import sleep_until
 from waydroid_helper.util.log import logger
 
 if TYPE_CHECKING:
@@ -20,18 +24,21 @@ if TYPE_CHECKING:
     from waydroid_helper.controller.widgets.base.base_widget import EditableRegion
 
 from waydroid_helper.controller.core.handler.event_handlers import InputEvent
-from waydroid_helper.controller.core.utils import pointer_id_manager
+from waydroid_helper.controller.core.utils import (cursor_tracker,
+                                                   pointer_id_manager)
 
-from cairo import FontSlant, FontWeight
 from waydroid_helper.controller.core import (
     Event,
     EventType,
+    Key,
     KeyCombination,
     event_bus,
     key_system,
 )
 from waydroid_helper.controller.widgets.base.base_widget import BaseWidget
-from waydroid_helper.controller.widgets.config import create_textarea_config
+from waydroid_helper.controller.widgets.base.text_renderer import text_renderer
+from waydroid_helper.controller.widgets.config import (ConfigItem,
+                                                       create_textarea_config)
 from waydroid_helper.controller.widgets.decorators import Editable
 
 
@@ -45,6 +52,13 @@ class MacroCommand(NamedTuple):
 # ==================== 命令模式实现 ====================
 
 
+class TimelineStep(NamedTuple):
+    """编译后时间线上的一步"""
+
+    offset: float  # 相对触发时间的偏移（秒）
+    command: "Command"
+
+
 class Command(ABC):
     """抽象命令接口"""
 
@@ -55,42 +69,50 @@ class Command(ABC):
     async def cancel(self, context: "Macro") -> None:
         """取消/释放命令的状态，默认实现为空操作"""
 
+    def compile(self, offset: float) -> tuple[list[TimelineStep], float]:
+        """编译到时间线，返回在 offset 处执行的步骤以及下一条命令的偏移"""
+        return [TimelineStep(offset, self)], offset
+
+
+def _resolve_keys(key_names: list[str]) -> list[Key]:
+    """解析按键名，忽略无法识别的按键"""
+    keys: list[Key] = []
+    for key_name in key_names:
+        try:
+            keys.append(key_system.deserialize_key(key_name))
+        except ValueError:
+            pass
+    return keys
+
 
 class KeyPressCommand(Command):
     """按键按下命令"""
 
     def __init__(self, key_names: list[str]):
         self.key_names = key_names
+        # 解析时即确定按键，执行时不再反序列化
+        self.keys = _resolve_keys(key_names)
 
     async def execute(self, context: "Macro") -> None:
-        for key_name in self.key_names:
-            try:
-                key = key_system.deserialize_key(key_name)
-                event_bus.emit(
-                    Event(
-                        type=EventType.MACRO_KEY_PRESSED,
-                        source=context,
-                        data=key,
-                    )
+        for key in self.keys:
+            event_bus.emit(
+                Event(
+                    type=EventType.MACRO_KEY_PRESSED,
+                    source=context,
+                    data=key,
                 )
-            except ValueError:
-                pass
+            )
 
     async def cancel(self, context: "Macro") -> None:
         """取消按键按下 - 释放所有由此命令按下的按键"""
-        for key_name in self.key_names:
-            if key_name in self.key_names:
-                try:
-                    key = key_system.deserialize_key(key_name)
-                    event_bus.emit(
-                        Event(
-                            type=EventType.MACRO_KEY_RELEASED,
-                            source=context,
-                            data=key,
-                        )
-                    )
-                except ValueError:
-                    pass
+        for key in self.keys:
+            event_bus.emit(
+                Event(
+                    type=EventType.MACRO_KEY_RELEASED,
+                    source=context,
+                    data=key,
+                )
+            )
 
 
 class KeyReleaseCommand(Command):
@@ -98,27 +120,17 @@ class KeyReleaseCommand(Command):
 
     def __init__(self, key_names: list[str]):
         self.key_names = key_names
+        self.keys = _resolve_keys(key_names)
 
     async def execute(self, context: "Macro") -> None:
-        from waydroid_helper.controller.core import (
-            Event,
-            EventType,
-            event_bus,
-            key_system,
-        )
-
-        for key_name in self.key_names:
-            try:
-                key = key_system.deserialize_key(key_name)
-                event_bus.emit(
-                    Event(
-                        type=EventType.MACRO_KEY_RELEASED,
-                        source=context,
-                        data=key,
-                    )
+        for key in self.keys:
+            event_bus.emit(
+                Event(
+                    type=EventType.MACRO_KEY_RELEASED,
+                    source=context,
+                    data=key,
                 )
-            except ValueError:
-                pass
+            )
 
 
 class KeySwitchCommand(Command):
@@ -144,80 +156,97 @@ class KeySwitchCommand(Command):
             self.is_pressed = False
 
 
-class PressCommand(Command):
-    """按下命令 - 处理触摸按下事件"""
+class TouchPointsCommand(Command):
+    """触摸点命令基类 - 解析时确定坐标，固定坐标的触摸消息在首次发送后缓存打包结果"""
 
     def __init__(self, points: list[str]):
         # ["x,y", "x1,y1"...]
         self.points = points
+        # 固定坐标在解析时转换为整数，"mouse" 为 None，执行时读取光标位置
+        self._coordinates: list[tuple[int, int] | None] = [
+            self._parse_point(point) for point in points
+        ]
         # Use deterministic identifiers based on point content for consistent pointer ID management
-        self._point_identifiers = [
-            self._create_point_identifier(point) for point in points
+        self._point_identifiers: list[tuple[int, int]] = [
+            coordinate if coordinate is not None else (-1, -1)
+            for coordinate in self._coordinates
         ]
+        # (action, x, y, pointer_id, 窗口尺寸, 设备分辨率) -> 打包好的消息
+        self._packed: dict[tuple[int, ...], PackedMsg] = {}
 
-    def _create_point_identifier(self, point: str) -> tuple[int, int]:
-        """
-        Create a deterministic identifier for a point that can be shared across commands.
+    @staticmethod
+    def _parse_point(point: str) -> tuple[int, int] | None:
+        """解析 "x,y" 坐标，"mouse" 返回 None"""
+        if point == "mouse":
+            return None
+        x, y = point.split(",")
+        return int(x), int(y)
 
-        Args:
-            point: Point string (either "mouse" or "x,y" format)
+    def _resolve_coordinates(self, context: "Macro") -> list[tuple[int, int]]:
+        """获取所有点的坐标，"mouse" 使用当前光标位置"""
+        cursor = None
+        coordinates: list[tuple[int, int]] = []
+        for coordinate in self._coordinates:
+            if coordinate is None:
+                if cursor is None:
+                    cursor = context.get_cursor_position()
+                coordinate = cursor
+            coordinates.append(coordinate)
+        return coordinates
 
-        Returns:
-            str: Deterministic identifier for the point
-        """
-        # For "mouse", use a special identifier since coordinates change
-        if point == "mouse":
-            return (-1, -1)  # Use command instance ID for mouse points
-        else:
-            # For fixed coordinates, use the coordinates as identifier
-            x, y = point.split(",")
-            x, y = int(x), int(y)
-            return (x, y)
+    def _touch_msg(
+        self,
+        action: AMotionEventAction,
+        index: int,
+        pointer_id: int,
+        position: tuple[int, int],
+        size: tuple[int, int],
+    ) -> ControlMsg:
+        """创建触摸消息，固定坐标的消息使用缓存的打包结果"""
+        fixed = self._coordinates[index] is not None
+        if fixed:
+            key = (action, *position, pointer_id, *size, *ScreenInfo().get_resolution())
+            packed = self._packed.get(key)
+            if packed is not None:
+                return packed
+
+        down = action == AMotionEventAction.DOWN
+        msg = InjectTouchEventMsg(
+            action=action,
+            pointer_id=pointer_id,
+            position=(*position, *size),
+            pressure=1.0 if down else 0.0,
+            action_button=AMotionEventButtons.PRIMARY,
+            buttons=AMotionEventButtons.PRIMARY if down else 0,
+        )
+        if not fixed:
+            return msg
 
-    def _parse_coordinates(self, context: "Macro") -> list[tuple[int, int]]:
-        """
-        Parse all point coordinates once at the beginning.
+        packed = self._packed[key] = PackedMsg(
+            msg.msg_type, msg.pack(), (action, pointer_id, msg.position)
+        )
+        return packed
 
-        Args:
-            context: The macro context
 
-        Returns:
-            list[tuple[int, int]]: List of (x, y) coordinates
-        """
-        coordinates: list[tuple[int, int]] = []
-        for point in self.points:
-            if point == "mouse":
-                x, y = context.get_cursor_position()
-            else:
-                x, y = point.split(",")
-                x, y = int(x), int(y)
-            coordinates.append((x, y))
-        return coordinates
+class PressCommand(TouchPointsCommand):
+    """按下命令 - 处理触摸按下事件"""
 
     async def execute(self, context: "Macro") -> None:
-        # Parse all coordinates once at the beginning
-        coordinates = self._parse_coordinates(context)
+        coordinates = self._resolve_coordinates(context)
 
         # Get window dimensions once
         root = context.get_root()
         root = cast("Gtk.Window", root)
-        w, h = root.get_width(), root.get_height()
+        size = (root.get_width(), root.get_height())
 
         # Send DOWN events for all points
-        for idx, (x, y) in enumerate(coordinates):
+        for idx, position in enumerate(coordinates):
             point_id = self._point_identifiers[idx]
             pointer_id = pointer_id_manager.allocate(point_id)
             if pointer_id is None:
                 return  # Exit early if allocation fails
 
-            msg = InjectTouchEventMsg(
-                action=AMotionEventAction.DOWN,
-                pointer_id=pointer_id,
-                position=(x, y, w, h),
-                pressure=1.0,
-                action_button=AMotionEventButtons.PRIMARY,
-                buttons=AMotionEventButtons.PRIMARY,
-            )
+            msg = self._touch_msg(AMotionEventAction.DOWN, idx, pointer_id, position, size)
             event_bus.emit(Event(EventType.CONTROL_MSG, context, msg))
 
     async def cancel(self, context: "Macro") -> None:
@@ -225,81 +254,24 @@ class PressCommand(Command):
         # Get window dimensions
         root = context.get_root()
         root = cast("Gtk.Window", root)
-        w, h = root.get_width(), root.get_height()
+        size = (root.get_width(), root.get_height())
 
-        # Parse coordinates for UP events
-        coordinates = self._parse_coordinates(context)
+        coordinates = self._resolve_coordinates(context)
 
         # Send UP events for all points that have allocated pointer IDs
-        for idx, (x, y) in enumerate(coordinates):
+        for idx, position in enumerate(coordinates):
             point_id = self._point_identifiers[idx]
             pointer_id = pointer_id_manager.get_allocated_id(point_id)
             if pointer_id is not None:
-                msg = InjectTouchEventMsg(
-                    action=AMotionEventAction.UP,
-                    pointer_id=pointer_id,
-                    position=(x, y, w, h),
-                    pressure=0.0,
-                    action_button=AMotionEventButtons.PRIMARY,
-                    buttons=0,
-                )
+                msg = self._touch_msg(AMotionEventAction.UP, idx, pointer_id, position, size)
                 event_bus.emit(Event(EventType.CONTROL_MSG, context, msg))
                 # Release the pointer ID
                 pointer_id_manager.release(point_id)
 
 
-class ReleaseCommand(Command):
+class ReleaseCommand(TouchPointsCommand):
     """释放命令 - 处理触摸释放事件"""
 
-    def __init__(self, points: list[str]):
-        # ["x,y", "x1,y1"...]
-        self.points = points
-        # Use the same deterministic identifier system as PressCommand
-        self._point_identifiers = [
-            self._create_point_identifier(point) for point in points
-        ]
-
-    def _create_point_identifier(self, point: str) -> tuple[int, int]:
-        """
-        Create a deterministic identifier for a point that matches PressCommand.
-
-        Note: For "mouse" points, this will create a different identifier than PressCommand
-        since each command instance has a different ID. For proper mouse point release,
-        the identifier should be shared between PressCommand and ReleaseCommand instances.
-
-        Args:
-            point: Point string (either "mouse" or "x,y" format)
-
-        Returns:
-            str: Deterministic identifier for the point
-        """
-        if point == "mouse":
-            return (-1, -1)  # This needs to be coordinated with PressCommand
-        else:
-            x, y = point.split(",")
-            x, y = int(x), int(y)
-            return (x, y)
-
-    def _parse_coordinates(self, context: "Macro") -> list[tuple[int, int]]:
-        """
-        Parse all point coordinates once at the beginning.
-
-        Args:
-            context: The macro context
-
-        Returns:
-            list[tuple[int, int]]: List of (x, y) coordinates
-        """
-        coordinates: list[tuple[int, int]] = []
-        for point in self.points:
-            if point == "mouse":
-                x, y = context.get_cursor_position()
-            else:
-                x, y = point.split(",")
-                x, y = int(x), int(y)
-            coordinates.append((x, y))
-        return coordinates
-
     def set_point_identifiers(self, identifiers: list[tuple[int, int]]) -> None:
         """
         Set point identifiers to match those used by a corresponding PressCommand.
@@ -313,30 +285,21 @@ class ReleaseCommand(Command):
         self._point_identifiers = identifiers
 
     async def execute(self, context: "Macro") -> None:
-        # Parse all coordinates once at the beginning
-        coordinates = self._parse_coordinates(context)
+        coordinates = self._resolve_coordinates(context)
 
         # Get window dimensions once
         root = context.get_root()
         root = cast("Gtk.Window", root)
-        w, h = root.get_width(), root.get_height()
+        size = (root.get_width(), root.get_height())
 
         # Send UP events for all points
-        for idx, (x, y) in enumerate(coordinates):
+        for idx, position in enumerate(coordinates):
             point_id = self._point_identifiers[idx]
-            # 打印一下 id(point_id) 红色
             pointer_id = pointer_id_manager.get_allocated_id(point_id)
             if pointer_id is None:
                 continue  # Continue with other points even if one fails
 
-            msg = InjectTouchEventMsg(
-                action=AMotionEventAction.UP,
-                pointer_id=pointer_id,
-                position=(x, y, w, h),
-                pressure=0.0,
-                action_button=AMotionEventButtons.PRIMARY,
-                buttons=0,
-            )
+            msg = self._touch_msg(AMotionEventAction.UP, idx, pointer_id, position, size)
             event_bus.emit(Event(EventType.CONTROL_MSG, context, msg))
 
             # Release the pointer ID after sending UP event
@@ -374,6 +337,9 @@ class SwitchCommand(Command):
 class ClickCommand(Command):
     """点击命令 - 组合按下和释放命令"""
 
+    # DOWN 与 UP 之间的间隔（秒）
+    CLICK_DURATION = 0.05
+
     def __init__(self, points: list[str]):
         # ["x,y", "x1,y1"...]
         self.points = points
@@ -386,11 +352,19 @@ class ClickCommand(Command):
         await self.press_command.execute(context)
 
         # Wait 0.05 seconds between DOWN and UP events
-        await asyncio.sleep(0.05)
+        await asyncio.sleep(self.CLICK_DURATION)
 
         # Execute release command (UP events)
         await self.release_command.execute(context)
 
+    def compile(self, offset: float) -> tuple[list[TimelineStep], float]:
+        """按下和释放分别作为时间线上的两步"""
+        release_offset = offset + self.CLICK_DURATION
+        return [
+            TimelineStep(offset, self.press_command),
+            TimelineStep(release_offset, self.release_command),
+        ], release_offset
+
 
 class SleepCommand(Command):
     """延迟命令"""
@@ -402,6 +376,10 @@ class SleepCommand(Command):
         if self.sleep_time > 0:
             await asyncio.sleep(self.sleep_time)
 
+    def compile(self, offset: float) -> tuple[list[TimelineStep], float]:
+        """延迟只推后后续步骤的偏移，不产生步骤"""
+        return [], offset + max(0.0, self.sleep_time)
+
 class ReleaseAllCommand(Command):
     """释放所有按键命令"""
 
@@ -654,6 +632,9 @@ class Macro(BaseWidget):
         # 存储预解析的宏命令对象
         self.press_commands: list[Command] = []
         self.release_commands: list[Command] = []
+        # 编译后的时间线，每一步按相对触发时间的绝对偏移执行
+        self.press_timeline: list[TimelineStep] = []
+        self.release_timeline: list[TimelineStep] = []
 
         # 设置宏命令配置
         self.setup_config()
@@ -665,16 +646,17 @@ class Macro(BaseWidget):
 
         # 按键状态跟踪 - 记录已按下但未释放的按键
         # self.pressed_keys: set[str] = set()
-        self._cursor_position: tuple[int, int] = (0, 0)
 
         event_bus.subscribe(EventType.MACRO_RELEASE_ALL, self.trigger_release_all)
 
     def get_cursor_position(self) -> tuple[int, int]:
-        return self._cursor_position
+        """触发时从窗口的光标位置服务读取，不再订阅鼠标移动事件"""
+        return cursor_tracker.position
 
-    def setup_config(self) -> None:
-        """设置配置项"""
-        # 添加宏命令配置
+    @classmethod
+    def create_config_items(cls) -> list[ConfigItem]:
+        """创建配置项定义"""
+        # 宏命令配置
         macro_config = create_textarea_config(
             key="macro_command",
             label=pgettext("Controller Widgets", "Macro Command"),
@@ -700,15 +682,12 @@ class Macro(BaseWidget):
                 "- Use 'mouse' as coordinate to use current cursor position",
             ),
         )
-        self.add_config_item(macro_config)
-        # self.add_config_change_callback("macro_command", self.on_macro_command_changed)
-        self.config_manager.connect("confirmed", self.on_macro_command_changed)
-        event_bus.subscribe(EventType.MOUSE_MOTION, self.on_mouse_motion)
+        return [macro_config]
 
-    def on_mouse_motion(self, event: Event[InputEvent]):
-        if event.data.position is None:
-            return
-        self._cursor_position = event.data.position
+    def setup_config(self) -> None:
+        """设置配置项"""
+        # self.add_config_change_callback("macro_command", self.on_macro_command_changed)
+        self.add_config_confirm_callback(self.on_macro_command_changed)
 
     def on_macro_command_changed(self, config_manager):
         """当宏命令文本框内容改变时，解析并存储预解析的命令对象"""
@@ -727,6 +706,19 @@ class Macro(BaseWidget):
         else:
             self.release_commands = []
 
+        self.press_timeline = self._compile_timeline(self.press_commands)
+        self.release_timeline = self._compile_timeline(self.release_commands)
+
+    @staticmethod
+    def _compile_timeline(commands: list[Command]) -> list[TimelineStep]:
+        """将命令列表编译为按偏移排序的时间线"""
+        timeline: list[TimelineStep] = []
+        offset = 0.0
+        for command in commands:
+            steps, offset = command.compile(offset)
+            timeline.extend(steps)
+        return timeline
+
     def _parse_command_lines(self, lines: list[str]) -> list[Command]:
         """解析命令行列表为Command对象列表"""
         commands = []
@@ -782,13 +774,7 @@ class Macro(BaseWidget):
             center_y = height / 2
 
             cr.set_source_rgba(1, 1, 1, 1)  # 白色文字
-            cr.select_font_face("Arial", FontSlant.NORMAL, FontWeight.BOLD)
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
-            x = center_x - text_extents.width / 2
-            y = center_y + text_extents.height / 2
-            cr.move_to(x, y)
-            cr.show_text(self.text)
+            text_renderer.draw_label(cr, self.text, center_x, center_y)
 
             # 清除路径，避免影响后续绘制
             cr.new_path()
@@ -826,9 +812,11 @@ class Macro(BaseWidget):
         if self.current_press_task and not self.current_press_task.done():
             return True
 
-        if self.press_commands:
+        if self.press_timeline:
             self.current_press_task = asyncio.create_task(
-                self._execute_commands_async(self.press_commands, "press")
+                self._execute_commands_async(
+                    self.press_timeline, time.monotonic(), "press"
+                )
             )
         return True
 
@@ -856,16 +844,19 @@ class Macro(BaseWidget):
 
         # 创建新的 release task
         self.current_release_task = asyncio.create_task(
-            self._execute_commands_async(self.release_commands, "release")
+            self._execute_commands_async(
+                self.release_timeline, time.monotonic(), "release"
+            )
         )
         return True
 
     async def _execute_commands_async(
-        self, commands: list[Command], task_type: str = "unknown"
+        self, timeline: list[TimelineStep], start: float, task_type: str = "unknown"
     ):
-        """异步执行预解析的宏命令列表"""
+        """按时间线执行宏命令，每一步在 start + offset 时执行，休眠误差不会累积"""
         try:
-            for command in commands:
+            for offset, command in timeline:
+                await sleep_until(start + offset)
                 await command.execute(self)
         except asyncio.CancelledError:
             logger.debug(f"Macro command task cancelled: {task_type}")
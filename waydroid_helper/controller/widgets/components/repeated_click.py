@@ -26,10 +26,14 @@ from waydroid_helper.controller.core import (Event, EventType, KeyCombination,
                                              event_bus, pointer_id_manager)
 from waydroid_helper.controller.core.control_msg import InjectTouchEventMsg
 from waydroid_helper.controller.core.handler.event_handlers import InputEvent
+from waydroid_helper.controller.core.timing import DeadlineScheduler, RateStats
 from waydroid_helper.controller.widgets.base.base_widget import BaseWidget
-from waydroid_helper.controller.widgets.config import (create_dropdown_config,
+from waydroid_helper.controller.widgets.base.text_renderer import text_renderer
+from waydroid_helper.controller.widgets.config import (ConfigItem,
+                                                       create_dropdown_config,
                                                        create_text_config)
 from waydroid_helper.controller.widgets.decorators import Editable
+from waydroid_helper.util.log import logger
 
 
 class OperatingMethod(Enum):
@@ -53,6 +57,9 @@ class RepeatedClick(BaseWidget):
     # 映射模式固定尺寸
     MAPPING_MODE_HEIGHT = 30
 
+    # 按键后连击模式的点击频率（每秒次数）
+    CLICK_AFTER_BUTTON_RATE = 20
+
     @property
     def MAPPING_MODE_WIDTH(self):
         """根据文字长度计算映射模式宽度，与draw_mapping_mode_background的逻辑保持一致"""
@@ -96,6 +103,8 @@ class RepeatedClick(BaseWidget):
         self._click_task: asyncio.Task[None] | None = None
         self._click_count = 0
         self._is_clicking = False
+        # 最近一次连击的实际频率统计
+        self.click_stats: RateStats | None = None
 
     def draw_widget_content(self, cr: 'Context[Surface]', width: int, height: int):
         """绘制圆形按钮的具体内容"""
@@ -123,13 +132,7 @@ class RepeatedClick(BaseWidget):
             center_y = height / 2
 
             cr.set_source_rgba(1, 1, 1, 1)  # 白色文字
-            cr.select_font_face("Arial", 0, 1)
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
-            x = center_x - text_extents.width / 2
-            y = center_y + text_extents.height / 2
-            cr.move_to(x, y)
-            cr.show_text(self.text)
+            text_renderer.draw_label(cr, self.text, center_x, center_y)
 
             # 清除路径，避免影响后续绘制
             cr.new_path()
@@ -153,8 +156,7 @@ class RepeatedClick(BaseWidget):
 
         # 计算文字尺寸
         if self.text:
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
+            text_extents = text_renderer.measure(self.text)
             text_width = text_extents.width
             text_height = text_extents.height
         else:
@@ -273,21 +275,13 @@ class RepeatedClick(BaseWidget):
 
             # 使用白色文字以在蓝色背景上清晰显示
             cr.set_source_rgba(1, 1, 1, 1)  # 白色文字
-            cr.select_font_face("Arial", 0, 1)
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
-            x = center_x - text_extents.width / 2
-            y = center_y + text_extents.height / 2
-            cr.move_to(x, y)
-            cr.show_text(self.text)
+            text_renderer.draw_label(cr, self.text, center_x, center_y)
 
             # 清除路径，避免影响后续绘制
             cr.new_path()
 
     async def _long_press_combo_click(self, clicks_per_second: int):
         """长按连击模式的异步点击任务"""
-        interval = 1.0 / clicks_per_second
-        
         pointer_id = self._allocate_pointer()
         if pointer_id is None:
             return
@@ -296,49 +290,51 @@ class RepeatedClick(BaseWidget):
         if root_dimensions is None:
             return
         w, h = root_dimensions
-        
+
+        scheduler = DeadlineScheduler(clicks_per_second)
         try:
-            while self._is_clicking:
-                await self._send_click_sequence(w, h, pointer_id)
-                
-                await asyncio.sleep(interval - 0.001)  # 剩余时间等待
-                
+            # 按截止时间点击，直到按键松开取消任务
+            await scheduler.run(lambda: self._send_click_sequence(w, h, pointer_id))
         except Exception:
             pass
         finally:
             if self._is_clicking: # Only send UP if not cancelled
                 await self._send_click_sequence(w, h, pointer_id)
             pointer_id_manager.release(self)
+            self._report_click_rate(scheduler)
 
     async def _click_after_button_click(self, click_count: int):
         """按键后连击模式的异步点击任务"""
-        interval = 1.0 / 20.0  # 每秒20次
-        
         root_dimensions = self._get_root_dimensions()
         if root_dimensions is None:
             return
         w, h = root_dimensions
-        
+
         pointer_id = self._allocate_pointer()
         if pointer_id is None:
             return
-        
+
+        scheduler = DeadlineScheduler(self.CLICK_AFTER_BUTTON_RATE)
         try:
-            for i in range(click_count):
-                if not self._is_clicking:  # 检查是否应该停止
-                    break
-                
-                await self._send_click_sequence(w, h, pointer_id)
-                
-                if i < click_count - 1:  # 最后一次点击后不需要等待
-                    await asyncio.sleep(interval - 0.001)
-                    
+            await scheduler.run(
+                lambda: self._send_click_sequence(w, h, pointer_id), count=click_count
+            )
         except Exception:
             pass
         finally:
             if self._is_clicking:  # Only send UP if not cancelled
                 await self._send_click_sequence(w, h, pointer_id)
             pointer_id_manager.release(self)
+            self._report_click_rate(scheduler)
+
+    def _report_click_rate(self, scheduler: DeadlineScheduler) -> None:
+        """记录本次连击的实际频率"""
+        stats = scheduler.get_stats()
+        self.click_stats = stats
+        logger.debug(
+            f"RepeatedClick: {stats.ticks} clicks, {stats.achieved_rate:.1f}/"
+            f"{stats.target_rate:.0f} CPS, max lateness {stats.max_lateness * 1000:.1f} ms"
+        )
 
     async def _send_touch_event(self, action: AMotionEventAction, pointer_id: int, root_width: int, root_height: int, pressure: float = 1.0) -> None:
         """发送触摸事件的辅助方法"""
@@ -462,8 +458,9 @@ class RepeatedClick(BaseWidget):
     def center_y(self):
         return self.y + self.height / 2
     
-    def setup_config(self) -> None:
-        """设置配置项"""
+    @classmethod
+    def create_config_items(cls) -> list[ConfigItem]:
+        """创建配置项定义"""
         
         # 操作方式配置
         operating_method_config = create_dropdown_config(
@@ -504,11 +501,14 @@ class RepeatedClick(BaseWidget):
             visible=False,
         )
         
-        # 添加配置项
-        self.add_config_item(operating_method_config)
-        self.add_config_item(clicks_per_second_config)
-        self.add_config_item(repeated_click_count_config)
-        
+        return [
+            operating_method_config,
+            clicks_per_second_config,
+            repeated_click_count_config,
+        ]
+    
+    def setup_config(self) -> None:
+        """设置配置项"""
         # 添加配置变更回调
         self.add_config_change_callback("operating_method", self._on_operating_method_changed)
     
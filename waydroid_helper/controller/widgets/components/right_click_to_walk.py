@@ -14,10 +14,11 @@ from gi.repository import GLib
 from waydroid_helper.controller.android.input import (AMotionEventAction,
                                                       AMotionEventButtons)
 from waydroid_helper.controller.core import (Event, EventType, KeyCombination,
-                                             event_bus, key_registry,
-                                             pointer_id_manager)
+                                             animation_scheduler, event_bus,
+                                             key_registry, pointer_id_manager)
 from waydroid_helper.controller.core.control_msg import InjectTouchEventMsg
-from waydroid_helper.controller.core.handler.event_handlers import InputEvent
+from waydroid_helper.controller.core.handler.event_handlers import (
+    InputEvent, InputEventType)
 from waydroid_helper.controller.widgets.base.base_widget import BaseWidget
 from waydroid_helper.controller.widgets.decorators import (Resizable,
                                                            ResizableDecorator)
@@ -79,11 +80,9 @@ class RightClickToWalk(BaseWidget):
         self._target_position: tuple[float, float] = (x + width / 2, y + height / 2)
         self.is_reentrant: bool = True
 
-        # 平滑移动系统
+        # 平滑移动系统，由 animation_scheduler 统一推进
         self._timer_interval: int = 20  # ms
         self._move_steps_total: int = 6
-        self._move_steps_count: int = 0
-        self._move_timer: int | None = None
 
         # 点按/长按检测
         self._key_press_start_time: float = 0.0
@@ -388,41 +387,31 @@ class RightClickToWalk(BaseWidget):
 
     def _start_smooth_move_to_boundary(self):
         """开始平滑移动到边界"""
-        if self._move_timer:
-            GLib.source_remove(self._move_timer)
-        
         self._joystick_state = JoystickState.MOVING
-        self._move_steps_count = 0
-        self._move_timer = GLib.timeout_add(
-            self._timer_interval, self._update_smooth_move
+        animation_scheduler.animate(
+            self,
+            self._current_position,
+            self._target_position,
+            self._timer_interval * self._move_steps_total / 1000,
+            self._update_smooth_move,
+            self._on_smooth_move_finished,
         )
 
-    def _update_smooth_move(self) -> bool:
-        """平滑移动的定时器回调"""
-        if self._move_steps_count < self._move_steps_total:
-            dx = self._target_position[0] - self._current_position[0]
-            dy = self._target_position[1] - self._current_position[1]
-            remaining_steps = self._move_steps_total - self._move_steps_count
-
-            self._current_position = (
-                self._current_position[0] + dx / remaining_steps,
-                self._current_position[1] + dy / remaining_steps,
-            )
-            self._move_steps_count += 1
-            
-            if self._joystick_state == JoystickState.MOVING:
-                self._emit_touch_event(AMotionEventAction.MOVE)
-            
-            return True  # Continue timer
+    def _update_smooth_move(self, position: tuple[float, float]) -> None:
+        """平滑移动的每帧回调"""
+        self._current_position = position
+        if self._joystick_state == JoystickState.MOVING:
+            self._emit_touch_event(AMotionEventAction.MOVE)
+
+    def _on_smooth_move_finished(self, completed: bool) -> None:
+        """平滑移动结束"""
+        if not completed:
+            return
 
         # 移动完成，到达边界
         self._current_position = self._target_position
-        self._move_timer = None
-        
         if self._joystick_state == JoystickState.MOVING:
             self._on_reached_boundary()
-        
-        return False  # Stop timer
 
     def _on_reached_boundary(self):
         """到达边界时的处理"""
@@ -486,9 +475,7 @@ class RightClickToWalk(BaseWidget):
         self._current_position = (self.center_x, self.center_y)
         
         # 清理定时器
-        if self._move_timer:
-            GLib.source_remove(self._move_timer)
-            self._move_timer = None
+        animation_scheduler.cancel(self)
         if self._hold_timer:
             GLib.source_remove(self._hold_timer)
             self._hold_timer = None
@@ -599,8 +586,8 @@ class RightClickToWalk(BaseWidget):
         )
 
         # 判断是点击事件还是移动事件
-        is_click_event = event.event_type == "mouse_press"
-        is_motion_event = event.event_type == "mouse_motion"
+        is_click_event = event.event_type == InputEventType.MOUSE_PRESS
+        is_motion_event = event.event_type == InputEventType.MOUSE_MOTION
         
         if self._joystick_state == JoystickState.INACTIVE:
             # 首次激活 - 只有点击事件才能激活
@@ -626,6 +613,8 @@ class RightClickToWalk(BaseWidget):
                 return False
             
         elif self._joystick_state == JoystickState.MOVING:
+            # 移动中跟随新的目标位置
+            animation_scheduler.retarget(self, self._target_position)
             if is_click_event:
                 # 移动中收到新点击，重置触发时间和长按状态
                 self._key_press_start_time = current_time
@@ -20,6 +20,7 @@ from waydroid_helper.controller.core import (Event, EventType, KeyCombination,
 from waydroid_helper.controller.core.control_msg import InjectTouchEventMsg
 from waydroid_helper.controller.core.handler.event_handlers import InputEvent
 from waydroid_helper.controller.widgets.base.base_widget import BaseWidget
+from waydroid_helper.controller.widgets.base.text_renderer import text_renderer
 from waydroid_helper.controller.widgets.decorators import Editable
 
 
@@ -101,13 +102,7 @@ class SingleClick(BaseWidget):
             center_y = height / 2
 
             cr.set_source_rgba(1, 1, 1, 1)  # 白色文字
-            cr.select_font_face("Arial", 0, 1)
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
-            x = center_x - text_extents.width / 2
-            y = center_y + text_extents.height / 2
-            cr.move_to(x, y)
-            cr.show_text(self.text)
+            text_renderer.draw_label(cr, self.text, center_x, center_y)
 
             # 清除路径，避免影响后续绘制
             cr.new_path()
@@ -131,8 +126,7 @@ class SingleClick(BaseWidget):
 
         # 计算文字尺寸
         if self.text:
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
+            text_extents = text_renderer.measure(self.text)
             text_width = text_extents.width
             text_height = text_extents.height
         else:
@@ -251,13 +245,7 @@ class SingleClick(BaseWidget):
 
             # 使用白色文字以在灰色背景上清晰显示
             cr.set_source_rgba(1, 1, 1, 1)  # 白色文字
-            cr.select_font_face("Arial", 0, 1)
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
-            x = center_x - text_extents.width / 2
-            y = center_y + text_extents.height / 2
-            cr.move_to(x, y)
-            cr.show_text(self.text)
+            text_renderer.draw_label(cr, self.text, center_x, center_y)
 
             # 清除路径，避免影响后续绘制
             cr.new_path()
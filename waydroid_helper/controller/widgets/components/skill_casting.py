@@ -7,6 +7,7 @@
 import asyncio
 import math
 import time
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
 from gettext import pgettext
@@ -20,16 +21,18 @@ if TYPE_CHECKING:
     from gi.repository import Gtk
     from waydroid_helper.controller.widgets.base.base_widget import EditableRegion
 
-from cairo import FONT_SLANT_NORMAL, FONT_WEIGHT_BOLD
-
 from waydroid_helper.controller.android.input import (AMotionEventAction,
                                                       AMotionEventButtons)
 from waydroid_helper.controller.core import (Event, EventType, KeyCombination,
-                                             event_bus, pointer_id_manager)
+                                             animation_scheduler, event_bus,
+                                             pointer_id_manager)
 from waydroid_helper.controller.core.control_msg import InjectTouchEventMsg
-from waydroid_helper.controller.core.handler.event_handlers import InputEvent
+from waydroid_helper.controller.core.handler.event_handlers import (
+    InputEvent, InputEventType)
 from waydroid_helper.controller.widgets.base.base_widget import BaseWidget
-from waydroid_helper.controller.widgets.config import (create_dropdown_config,
+from waydroid_helper.controller.widgets.base.text_renderer import text_renderer
+from waydroid_helper.controller.widgets.config import (ConfigItem,
+                                                       create_dropdown_config,
                                                        create_slider_config,
                                                        create_switch_config)
 from waydroid_helper.controller.widgets.decorators import (Editable, Resizable,
@@ -92,6 +95,8 @@ class SkillCasting(BaseWidget):
             "Enable a cancel casting button that can interrupt ongoing skill casting",
         ),
     )
+    # 取消施法按钮全局唯一，该配置的值由所有技能施法组件共享
+    cancel_button_config.shared = True
 
     @property
     def MAPPING_MODE_WIDTH(self):
@@ -145,7 +150,11 @@ class SkillCasting(BaseWidget):
 
         # 异步任务管理
         self._current_task: asyncio.Task | None = None
-        self._event_queue: asyncio.Queue = asyncio.Queue()
+        # 按键和取消事件按顺序排队，优先于鼠标移动处理
+        self._event_queue: deque[SkillEvent] = deque()
+        # 鼠标移动只保留最新的一次
+        self._pending_motion: SkillEvent | None = None
+        self._event_ready: asyncio.Event = asyncio.Event()
         self._event_processor_task: asyncio.Task | None = None
 
         # 技能释放控制标志
@@ -159,7 +168,7 @@ class SkillCasting(BaseWidget):
             None  # 取消施法的目标位置
         )
 
-        # 平滑移动系统参数
+        # 平滑移动系统参数，总时长为 _move_interval * _move_steps_total
         self._move_interval: float = 0.02  # 20ms，转换为秒
         self._move_steps_total: int = 6
 
@@ -198,14 +207,36 @@ class SkillCasting(BaseWidget):
         if self._event_processor_task is None or self._event_processor_task.done():
             self._event_processor_task = asyncio.create_task(self._process_events())
 
+    def _post_event(self, event: SkillEvent):
+        """投递事件 - 鼠标移动覆盖尚未处理的上一次移动，其余事件排队
+
+        其余事件入队前先把尚未处理的移动排在它前面，保持移动与按键、取消事件的先后顺序
+        """
+        if event.type == "mouse_motion":
+            self._pending_motion = event
+        else:
+            if self._pending_motion is not None:
+                self._event_queue.append(self._pending_motion)
+                self._pending_motion = None
+            self._event_queue.append(event)
+        self._event_ready.set()
+
     async def _process_events(self):
-        """异步事件处理器主循环"""
+        """异步事件处理器主循环 - 先处理排队的事件，再处理最新的鼠标移动"""
         try:
             while True:
                 # 等待事件
-                event = await self._event_queue.get()
-                await self._handle_event(event)
-                self._event_queue.task_done()
+                await self._event_ready.wait()
+                self._event_ready.clear()
+                while True:
+                    if self._event_queue:
+                        event = self._event_queue.popleft()
+                    elif self._pending_motion is not None:
+                        event = self._pending_motion
+                        self._pending_motion = None
+                    else:
+                        break
+                    await self._handle_event(event)
         except:
             pass
 
@@ -224,7 +255,7 @@ class SkillCasting(BaseWidget):
             pass
 
     def _on_mouse_motion(self, event):
-        """鼠标移动事件回调 - 将事件放入队列"""
+        """鼠标移动事件回调 - 只保留最新的位置"""
         # 窗口发送的 MOUSE_MOTION 事件包含 InputEvent 对象
         if hasattr(event, "data") and hasattr(event.data, "position"):
             # 这是 InputEvent 对象
@@ -239,27 +270,20 @@ class SkillCasting(BaseWidget):
         else:
             return
 
+        # 立即记录光标位置，优先处理的按键事件也能使用最新位置
+        self._mouse_x, self._mouse_y = position
+
         skill_event = SkillEvent(
             type="mouse_motion", data={"position": position, "timestamp": time.time()}
         )
-
-        # 非阻塞方式放入队列
-        try:
-            self._event_queue.put_nowait(skill_event)
-        except:
-            pass
+        self._post_event(skill_event)
 
     def _on_cancel_casting(self, event):
-        """取消施法事件回调 - 将事件放入队列"""
+        """取消施法事件回调 - 排队处理"""
         skill_event = SkillEvent(
             type="cancel_casting", data=event.data if hasattr(event, "data") else event
         )
-
-        # 非阻塞方式放入队列
-        try:
-            self._event_queue.put_nowait(skill_event)
-        except:
-            pass
+        self._post_event(skill_event)
 
     async def _handle_key_press(self, event: SkillEvent):
         """异步处理按键按下事件"""
@@ -420,28 +444,38 @@ class SkillCasting(BaseWidget):
             await self._release_skill()
 
     async def _smooth_move_to_target(self, target: tuple[float, float]):
-        """异步平滑移动到目标位置"""
-        start_pos = self._current_position
-        steps = self._move_steps_total
-
-        for step in range(1, steps + 1):
-            # 计算当前位置
-            progress = step / steps
-            current_x = start_pos[0] + (target[0] - start_pos[0]) * progress
-            current_y = start_pos[1] + (target[1] - start_pos[1]) * progress
-
-            self._current_position = (current_x, current_y)
-            self._emit_touch_event(AMotionEventAction.MOVE)
-
-            # 等待间隔
-            await asyncio.sleep(self._move_interval)
+        """异步平滑移动到目标位置，由动画调度器每帧推进"""
+        finished: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
 
+        def on_update(position: tuple[float, float]) -> None:
             # 检查是否被取消
             if self._skill_state == SkillState.INACTIVE:
+                animation_scheduler.cancel(self)
                 return
+            self._current_position = position
+            self._emit_touch_event(AMotionEventAction.MOVE)
+
+        def on_finish(completed: bool) -> None:
+            if not finished.done():
+                finished.set_result(completed)
+
+        animation_scheduler.animate(
+            self,
+            self._current_position,
+            target,
+            self._move_interval * self._move_steps_total,
+            on_update,
+            on_finish,
+        )
+        try:
+            completed = await finished
+        finally:
+            # 任务被取消时停止动画
+            animation_scheduler.cancel(self)
 
         # 移动完成
-        self._current_position = target
+        if completed:
+            self._current_position = target
 
     async def _instant_move_to_target(self, target: tuple[float, float]):
         """瞬间移动到目标位置"""
@@ -472,10 +506,11 @@ class SkillCasting(BaseWidget):
         # 释放指针ID
         pointer_id_manager.release(self)
 
-    def setup_config(self) -> None:
-        """设置配置项"""
+    @classmethod
+    def create_config_items(cls) -> list[ConfigItem]:
+        """创建配置项定义"""
 
-        # 添加圆半径配置
+        # 圆半径配置
         circle_radius_config = create_slider_config(
             key="circle_radius",
             label=pgettext("Controller Widgets", "Casting Radius"),
@@ -489,7 +524,7 @@ class SkillCasting(BaseWidget):
             ),
         )
 
-        # 添加施法时机配置
+        # 施法时机配置
         cast_timing_config = create_dropdown_config(
             key="cast_timing",
             label=pgettext("Controller Widgets", "Cast Timing"),
@@ -512,12 +547,11 @@ class SkillCasting(BaseWidget):
             ),
         )
 
-        # 添加取消施法按钮配置
-
-        self.add_config_item(circle_radius_config)
-        self.add_config_item(cast_timing_config)
-        self.add_config_item(self.cancel_button_config)
+        # 取消施法按钮配置为类属性
+        return [circle_radius_config, cast_timing_config, cls.cancel_button_config]
 
+    def setup_config(self) -> None:
+        """设置配置项"""
         # 添加配置变更回调
         self.add_config_change_callback("circle_radius", self._on_circle_radius_changed)
         self.add_config_change_callback("cast_timing", self._on_cast_timing_changed)
@@ -601,6 +635,7 @@ class SkillCasting(BaseWidget):
         #     self._disable_cancel_button()
 
         # 取消异步任务
+        animation_scheduler.cancel(self)
         if self._current_task and not self._current_task.done():
             self._current_task.cancel()
         if self._event_processor_task and not self._event_processor_task.done():
@@ -698,15 +733,7 @@ class SkillCasting(BaseWidget):
             center_y = height / 2
 
             cr.set_source_rgba(1, 1, 1, 1)  # 白色文字
-            cr.select_font_face(
-                "Arial", FONT_SLANT_NORMAL, FONT_WEIGHT_BOLD
-            )
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
-            x = center_x - text_extents.width / 2
-            y = center_y + text_extents.height / 2
-            cr.move_to(x, y)
-            cr.show_text(self.text)
+            text_renderer.draw_label(cr, self.text, center_x, center_y)
 
             # 清除路径，避免影响后续绘制
             cr.new_path()
@@ -732,8 +759,7 @@ class SkillCasting(BaseWidget):
 
         # 计算文字尺寸
         if self.text:
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
+            text_extents = text_renderer.measure(self.text)
             text_width = text_extents.width
             text_height = text_extents.height
         else:
@@ -854,15 +880,7 @@ class SkillCasting(BaseWidget):
 
             # 使用白色文字以在灰色背景上清晰显示
             cr.set_source_rgba(1, 1, 1, 1)  # 白色文字
-            cr.select_font_face(
-                "Arial", FONT_SLANT_NORMAL, FONT_WEIGHT_BOLD
-            )
-            cr.set_font_size(12)
-            text_extents = cr.text_extents(self.text)
-            x = center_x - text_extents.width / 2
-            y = center_y + text_extents.height / 2
-            cr.move_to(x, y)
-            cr.show_text(self.text)
+            text_renderer.draw_label(cr, self.text, center_x, center_y)
 
             # 清除路径，避免影响后续绘制
             cr.new_path()
@@ -966,8 +984,8 @@ class SkillCasting(BaseWidget):
         key_combination: KeyCombination | None = None,
         event: "InputEvent | None" = None,
     ):
-        """按键触发事件处理 - 将事件放入异步队列"""
-        if not event or not event.event_type:
+        """按键触发事件处理 - 投递到异步事件处理器"""
+        if not event:
             return False
 
         # 取消施法状态下不响应任何用户输入
@@ -975,8 +993,8 @@ class SkillCasting(BaseWidget):
             return True
 
         # 判断事件类型
-        is_key_press = event.event_type == "key_press"
-        is_mouse_motion = event.event_type == "mouse_motion"
+        is_key_press = event.event_type == InputEventType.KEY_PRESS
+        is_mouse_motion = event.event_type == InputEventType.MOUSE_MOTION
 
         if not (is_key_press or is_mouse_motion):
             return False
@@ -988,19 +1006,14 @@ class SkillCasting(BaseWidget):
 
         # 将事件放入异步队列
         skill_event = SkillEvent(
-            type=event.event_type,
+            type="key_press" if is_key_press else "mouse_motion",
             data={
                 "key_combination": key_combination,
                 "position": event.position,
                 "timestamp": time.time(),
             },
         )
-
-        # 非阻塞方式放入队列
-        try:
-            self._event_queue.put_nowait(skill_event)
-        except asyncio.QueueFull:
-            pass
+        self._post_event(skill_event)
 
         return True
 
@@ -1009,18 +1022,13 @@ class SkillCasting(BaseWidget):
         key_combination: KeyCombination | None = None,
         event: "InputEvent | None" = None,
     ):
-        """按键释放事件处理 - 将事件放入异步队列"""
+        """按键释放事件处理 - 投递到异步事件处理器"""
         # 将事件放入异步队列
         skill_event = SkillEvent(
             type="key_release",
             data={"key_combination": key_combination, "timestamp": time.time()},
         )
-
-        # 非阻塞方式放入队列
-        try:
-            self._event_queue.put_nowait(skill_event)
-        except asyncio.QueueFull:
-            pass
+        self._post_event(skill_event)
 
         return True
 
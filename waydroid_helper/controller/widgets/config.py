@@ -5,7 +5,7 @@ Widget Configuration System
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum, auto
 from typing import Any, Callable, Dict, List, Optional
 
@@ -14,7 +14,7 @@ import gi
 from waydroid_helper.controller.core import EventType, event_bus
 
 gi.require_version("Gtk", "4.0")
-from gi.repository import GObject, Gtk
+from gi.repository import Gtk
 
 from waydroid_helper.util.log import logger
 
@@ -38,6 +38,7 @@ class ConfigItem(ABC):
     description: str = ""
     value: Any = None
     visible: bool = True
+    shared: bool = False  # 值由同类所有组件共享，保存在定义中而非各组件
     
     @abstractmethod
     def create_ui_widget(self, on_change_callback: Callable[[str, Any], None]) -> Gtk.Widget:
@@ -460,71 +461,116 @@ class TextAreaConfig(ConfigItem):
         return data
 
 
-class ConfigManager(GObject.Object):
-    """配置管理器，使用GObject信号机制"""
-    
-    __gsignals__ = {
-        'config-changed': (GObject.SignalFlags.RUN_FIRST, None, (str, object)),
-        'config-validated': (GObject.SignalFlags.RUN_FIRST, None, (str, bool)),
-        'confirmed': (GObject.SignalFlags.RUN_FIRST, None, ()),
-    }
-    
-    def __init__(self):
-        super().__init__()
-        self.configs: Dict[str, ConfigItem] = {}
+class ConfigManager:
+    """配置管理器
+
+    配置项定义由同一组件类的所有实例共享，每个实例只保存自己的配置值和可见性，
+    UI 控件在打开设置面板时才根据定义创建
+    """
+
+    __slots__ = (
+        "configs",
+        "_owns_configs",
+        "_values",
+        "_visible",
+        "_change_callbacks",
+        "_confirm_callbacks",
+        "ui_widgets",
+        "_ui_configs",
+        "_updating_ui",
+        "restoring",
+    )
+
+    def __init__(self, configs: Optional[Dict[str, ConfigItem]] = None):
+        # 共享的配置项定义，添加实例独有的配置项时才复制
+        self.configs: Dict[str, ConfigItem] = configs if configs is not None else {}
+        self._owns_configs: bool = configs is None
+        self._values: Dict[str, Any] = {}
+        self._visible: Dict[str, bool] = {}
+        self._change_callbacks: Dict[str, List[Callable[[str, Any, bool], None]]] = {}
+        self._confirm_callbacks: List[Callable[["ConfigManager"], None]] = []
         self.ui_widgets: Dict[str, Gtk.Widget] = {}
+        # 设置面板中各控件对应的配置项副本（带有当前实例的值）
+        self._ui_configs: Dict[str, ConfigItem] = {}
         self._updating_ui = False  # 标记是否正在更新UI，防止循环
         self.restoring = False
     
     def add_config(self, config: ConfigItem) -> None:
         """添加配置项"""
+        if not self._owns_configs:
+            self.configs = dict(self.configs)
+            self._owns_configs = True
         self.configs[config.key] = config
     
     def get_config(self, key: str) -> Optional[ConfigItem]:
-        """获取配置项"""
+        """获取配置项定义"""
         return self.configs.get(key)
     
     def set_value(self, key: str, value: Any, update_ui: bool = True) -> bool:
         """设置配置值"""
-        if key not in self.configs:
+        config = self.configs.get(key)
+        if config is None:
             return False
         
-        config = self.configs[key]
         if not config.validate(value):
-            self.emit('config-validated', key, False)
             return False
         
-        old_value = config.value
-        config.value = value
+        if config.shared:
+            config.value = value
+        else:
+            self._values[key] = value
+        
+        ui_config = self._ui_configs.get(key)
+        if ui_config is not None:
+            ui_config.value = value
+            # 更新UI（如果需要且不在UI更新过程中）
+            if update_ui and not self._updating_ui:
+                self._updating_ui = True
+                try:
+                    ui_config.set_value_to_ui(self.ui_widgets[key], value)
+                finally:
+                    self._updating_ui = False
         
-        # 更新UI（如果需要且不在UI更新过程中）
-        if update_ui and not self._updating_ui and key in self.ui_widgets:
-            self._updating_ui = True
+        # 通知配置变更
+        for callback in self._change_callbacks.get(key, ()):
             try:
-                config.set_value_to_ui(self.ui_widgets[key], value)
-            finally:
-                self._updating_ui = False
-        
-        # 发送配置变更信号
-        self.emit('config-changed', key, value)
-        self.emit('config-validated', key, True)
+                callback(key, value, self.restoring)
+            except Exception as e:
+                logger.error(f"Config change callback for {key} failed: {e}")
         
         return True
     
     def get_value(self, key: str) -> Any:
-        """获取配置值"""
-        if key in self.configs:
-            return self.configs[key].value
-        return None
+        """获取配置值，未设置时返回定义中的默认值"""
+        config = self.configs.get(key)
+        if config is None:
+            return None
+        if config.shared:
+            return config.value
+        return self._values.get(key, config.value)
+    
+    def is_visible(self, key: str) -> bool:
+        """配置项是否可见"""
+        config = self.configs.get(key)
+        if config is None:
+            return False
+        return self._visible.get(key, config.visible)
     
     def add_change_callback(self, key: str, callback: Callable[[str, Any, bool], None]) -> None:
-        """添加配置变更回调（向后兼容方法）"""
-        # 连接到config-changed信号
-        def signal_handler(config_manager, changed_key, value ):
-            if changed_key == key:
-                callback(changed_key, value, self.restoring)
-        
-        self.connect("config-changed", signal_handler)
+        """添加配置变更回调"""
+        self._change_callbacks.setdefault(key, []).append(callback)
+    
+    def add_confirm_callback(self, callback: Callable[["ConfigManager"], None]) -> None:
+        """添加配置确认回调（设置面板点击确认或加载配置后调用）"""
+        self._confirm_callbacks.append(callback)
+    
+    def confirm(self) -> None:
+        """确认配置"""
+        for callback in self._confirm_callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.error(f"Config confirm callback failed: {e}")
     
     def _on_ui_value_changed(self, key: str, value: Any) -> None:
         """UI控件值变更回调"""
@@ -547,7 +593,11 @@ class ConfigManager(GObject.Object):
         # 为每个配置项创建UI
         for key, config in self.configs.items():
             try:
-                widget = config.create_ui_widget(self._on_ui_value_changed)
+                ui_config = replace(
+                    config, value=self.get_value(key), visible=self.is_visible(key)
+                )
+                widget = ui_config.create_ui_widget(self._on_ui_value_changed)
+                self._ui_configs[key] = ui_config
                 self.ui_widgets[key] = widget
                 main_box.append(widget)
             except Exception as e:
@@ -558,20 +608,22 @@ class ConfigManager(GObject.Object):
     def collect_values_from_ui(self) -> Dict[str, Any]:
         """从UI收集所有配置值"""
         values = {}
-        for key, config in self.configs.items():
-            if key in self.ui_widgets:
-                try:
-                    value = config.get_value_from_ui(self.ui_widgets[key])
-                    values[key] = value
-                except Exception as e:
-                    logger.error(f"Failed to get value from UI for config {key}: {e}")
+        for key, ui_config in self._ui_configs.items():
+            try:
+                values[key] = ui_config.get_value_from_ui(self.ui_widgets[key])
+            except Exception as e:
+                logger.error(f"Failed to get value from UI for config {key}: {e}")
         return values
     
     def serialize(self) -> Dict[str, Any]:
         """序列化所有配置"""
-        return {
-            key: config.serialize() for key, config in self.configs.items()
-        }
+        data = {}
+        for key, config in self.configs.items():
+            item = config.serialize()
+            item["value"] = self.get_value(key)
+            item["visible"] = self.is_visible(key)
+            data[key] = item
+        return data
     
     def deserialize(self, data: Dict[str, Any]) -> None:
         """反序列化配置"""
@@ -583,7 +635,7 @@ class ConfigManager(GObject.Object):
                     if value is not None:
                         self.set_value(key, value)
                     self.set_visible(key, config_data.get("visible", True))
-            self.emit("confirmed")
+            self.confirm()
         finally:
             self.restoring = False
     
@@ -593,18 +645,23 @@ class ConfigManager(GObject.Object):
             event_bus.unsubscribe_by_subscriber(w)
             w.unparent()
         self.ui_widgets.clear()
+        self._ui_configs.clear()
 
     def clear(self) -> None:
         """清空所有配置"""
         for _, w in self.ui_widgets.items():
             w.unparent()
-        self.configs.clear()
+        self.configs = {}
+        self._owns_configs = True
+        self._values.clear()
+        self._visible.clear()
         self.ui_widgets.clear()
+        self._ui_configs.clear()
     
     def set_visible(self, key: str, visible: bool) -> None:
         """设置配置项的可见性"""
         if key in self.configs:
-            self.configs[key].visible = visible
+            self._visible[key] = visible
             if key in self.ui_widgets:
                 self.ui_widgets[key].set_visible(visible)
 
@@ -11,7 +11,8 @@ from gi.repository import Gdk, GLib, Gtk
 
 from waydroid_helper.controller.core.handler import key_mapping_manager
 from waydroid_helper.controller.core.key_system import (Key, KeyCombination,
-                                                        key_registry)
+                                                        key_registry,
+                                                        physical_key_cache)
 from waydroid_helper.util.log import logger
 
 from .base_decorator import WidgetDecorator, parameterized_widget_decorator
@@ -66,7 +67,6 @@ class EditableDecorator(WidgetDecorator):
         self._wrapped_widget.should_keep_editing_on_click = self.should_keep_editing_on_click
         
         logger.debug(f"EditableDecorator applied to {type(self._wrapped_widget).__name__}")
-        logger.debug(f"Editable Hook draw function: {self._wrapped_widget.draw_func}")
         logger.debug(f"Component focusable: {self._wrapped_widget.get_focusable()}")
     
     def should_keep_editing_on_click(self, x, y):
@@ -119,21 +119,9 @@ class EditableDecorator(WidgetDecorator):
     
     def _hook_draw_function(self):
         """Hook绘制函数，在编辑模式下绘制光标和编辑文本"""
-        # 初始化装饰器绘制列表（如果不存在）
+        # 初始化装饰器绘制列表（如果不存在），由 BaseWidget.do_snapshot 在组件内容之后依次调用
         if not hasattr(self._wrapped_widget, '_decorator_draws'):
             self._wrapped_widget._decorator_draws = []
-            # 保存原始绘制函数
-            original_draw = self._wrapped_widget.draw_func
-            
-            def master_draw_func(widget, cr, width, height, user_data):
-                # 调用原始绘制
-                original_draw(widget, cr, width, height, user_data)
-                # 调用所有装饰器的绘制
-                for draw_func in widget._decorator_draws:
-                    draw_func(cr, width, height)
-            
-            # 设置主绘制函数
-            self._wrapped_widget.set_draw_func(master_draw_func, None)
         
         # 添加此装饰器的绘制函数到列表
         def editable_draw(cr, width, height):
@@ -308,21 +296,10 @@ class EditableDecorator(WidgetDecorator):
     def _get_physical_keyval(self, keycode):
         """获取物理按键对应的标准 keyval（不受修饰键影响）"""
         try:
-            # 尝试获取顶级窗口的方法
-            window = self._get_toplevel_window()
-            if window and hasattr(window, 'get_physical_keyval'):
-                return window.get_physical_keyval(keycode)
-            else:
-                # 如果无法获取window，尝试直接实现
-                widget = self._wrapped_widget
-                if widget and hasattr(widget, 'get_display'):
-                    display = widget.get_display()
-                    if display:
-                        success, keyval, _, _, _ = display.translate_key(
-                            keycode=keycode, state=Gdk.ModifierType(0), group=0
-                        )
-                        if success:
-                            return Gdk.keyval_to_upper(keyval)
+            # 与窗口共享同一份物理按键缓存
+            display = self._wrapped_widget.get_display()
+            if display:
+                return physical_key_cache.lookup(display, keycode)
         except Exception as e:
             logger.debug(f"Failed to get physical keyval: {e}")
         return 0
@@ -44,7 +44,6 @@ class ResizableDecorator(WidgetDecorator):
         self._hook_draw_function()
         
         logger.debug(f"ResizableDecorator applied to {type(self._wrapped_widget).__name__}")
-        logger.debug(f"Resizable Hook draw function: {self._wrapped_widget.draw_func}")
         logger.debug(f"Resize strategy: {self.current_resize_strategy}")
     
     def can_resize_at_position(self, x, y, width, height):
@@ -259,21 +258,9 @@ class ResizableDecorator(WidgetDecorator):
     
     def _hook_draw_function(self):
         """Hook绘制函数，在原绘制完成后添加调整大小装饰"""
-        # 初始化装饰器绘制列表（如果不存在）
+        # 初始化装饰器绘制列表（如果不存在），由 BaseWidget.do_snapshot 在组件内容之后依次调用
         if not hasattr(self._wrapped_widget, '_decorator_draws'):
             self._wrapped_widget._decorator_draws = []
-            # 保存原始绘制函数
-            original_draw = self._wrapped_widget.draw_func
-            
-            def master_draw_func(widget, cr, width, height, user_data):
-                # 调用原始绘制
-                original_draw(widget, cr, width, height, user_data)
-                # 调用所有装饰器的绘制
-                for draw_func in widget._decorator_draws:
-                    draw_func(cr, width, height)
-            
-            # 设置主绘制函数
-            self._wrapped_widget.set_draw_func(master_draw_func, None)
         
         # 添加此装饰器的绘制函数到列表
         def resize_draw(cr, width, height):
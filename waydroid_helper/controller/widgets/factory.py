@@ -66,7 +66,7 @@ class WidgetFactory:
             return False
             
         # 检查是否继承了BaseWidget（通过检查方法签名）
-        if not hasattr(cls, 'draw_func'):
+        if not hasattr(cls, 'draw_static_content'):
             return False
             
         # 检查是否有__init__方法